@@ -2,10 +2,89 @@ import streamlit as st
 from langchain_pipeline import PostTransformer
 import os
 from dotenv import load_dotenv
-import threading
 import uuid
+from contextlib import closing
 from datetime import datetime
-from dataset_tools import load_and_analyze_dataset, prepare_for_fine_tuning
+from dataset_tools import DEFAULT_EXPORT_PATH, load_and_analyze_dataset, prepare_for_fine_tuning
+import resources
+from tracing import walk_trace
+
+
+def get_transformer():
+    """Return this session's transformer, backed by process-wide resources"""
+    if "transformer" not in st.session_state:
+        st.session_state.transformer = PostTransformer(
+            db_session=resources.get_scoped_session(),
+            hf_dataset_manager=resources.get_dataset_manager(),
+            response_cache=resources.get_response_cache(),
+            example_selector=resources.get_example_selector(),
+            db_stats=resources.get_db_stats())
+    return st.session_state.transformer
+
+
+def render_history(transformer, platform):
+    """Render one page of history; earlier page cursors are kept so we can go back"""
+    search = st.text_input("Search history", key="history_search").strip()
+    if "history_filter" not in st.session_state:
+        st.session_state.history_filter = None
+        st.session_state.history_cursors = [None]
+    if st.session_state.history_filter != (platform, search):
+        st.session_state.history_filter = (platform, search)
+        st.session_state.history_cursors = [None]
+    cursors = st.session_state.history_cursors
+
+    page = transformer.history_page(platform, cursor=cursors[-1], search=search or None)
+    if not page["rows"]:
+        st.write("No transformations yet." if not search else "No matching transformations.")
+
+    for row in page["rows"]:
+        full = None
+        if row["truncated"] and st.button("Show full text", key=f"history_full_{row['id']}"):
+            full = transformer.get_transformation(row["id"])
+        st.write("**Original:**")
+        st.text(full.original_text if full else row["original_preview"])
+        st.write("**Transformed:**")
+        st.text(full.transformed_text if full else row["transformed_preview"])
+        st.write(f"*Created at: {row['created_at']}*")
+        st.divider()
+
+    # Callbacks run before the next rerun, so paging costs a single query
+    newer, older = st.columns(2)
+    newer.button("← Newer", key="history_newer", disabled=len(cursors) == 1,
+                 on_click=cursors.pop)
+    older.button("Older →", key="history_older", disabled=page["next_cursor"] is None,
+                 on_click=cursors.append, args=(page["next_cursor"],))
+
+
+def render_diagnostics(trace_buffer):
+    """Per-stage timings and token usage from the in-memory trace buffer"""
+    summary = trace_buffer.summary()
+    if not summary:
+        st.write("No requests traced yet.")
+        return
+
+    st.dataframe([{
+        "stage": name,
+        "count": stage["count"],
+        "errors": stage["errors"],
+        "p50 ms": round(stage["p50"] * 1000, 1),
+        "p95 ms": round(stage["p95"] * 1000, 1),
+        "max ms": round(stage["max"] * 1000, 1),
+        "tokens": stage.get("total_tokens"),
+    } for name, stage in summary.items()], hide_index=True)
+
+    st.write("**Recent requests**")
+    for spans in trace_buffer.traces(limit=5):
+        # Indent each span under its parent
+        lines = []
+        for depth, span in walk_trace(spans):
+            attributes = ", ".join(f"{key}={value}" for key, value in span.attributes.items())
+            error = f" ERROR {span.error}" if span.error else ""
+            lines.append(f"{'  ' * depth}{span.name} "
+                         f"{span.duration * 1000:.1f}ms {attributes}{error}")
+        st.code("\n".join(lines), language=None)
+
+    st.button("Clear traces", key="clear_traces", on_click=trace_buffer.clear)
 
 
 def main():
@@ -24,8 +103,10 @@ def main():
     st.title("✨ Social Sculptor")
     st.subheader("Transform your writing into engaging social media posts")
 
-    # Initialize the transformer
-    transformer = PostTransformer()
+    # Reuse the session's transformer; the engine, dataset manager and LLM
+    # clients behind it are built once per process
+    transformer = get_transformer()
+    trace_buffer = resources.setup_tracing()
 
     # Initialize platform in session state if not present
     if "platform" not in st.session_state:
@@ -62,6 +143,16 @@ def main():
             value=0.88,
             step=0.01)
 
+        # Identical requests are served from the response cache unless
+        # the user asks for a fresh sample
+        fresh_sample = st.checkbox(
+            "Always generate a fresh version",
+            value=False,
+            help="Skip the response cache and ask the AI again, even for text you have already transformed.")
+        cache_stats = resources.get_response_cache().stats()
+        st.caption(f"Cache hit ratio: {cache_stats['hit_ratio']:.0%} · "
+                   f"saved {cache_stats['saved_seconds']:.1f}s")
+
         st.divider()
         st.subheader("Training Examples")
 
@@ -89,13 +180,15 @@ def main():
                 st.error("Please enter some text for the example!")
             else:
                 try:
-                    transformer.add_example(new_example)
-                    st.session_state.clear_text = True
-                    st.session_state.show_success = True
-                    try:
-                        st.rerun()
-                    except Exception:
-                        pass  # Ignore rerun exception during testing
+                    if transformer.add_example(new_example):
+                        st.session_state.clear_text = True
+                        st.session_state.show_success = True
+                        try:
+                            st.rerun()
+                        except Exception:
+                            pass  # Ignore rerun exception during testing
+                    else:
+                        st.info("This example is already saved.")
                 except Exception as e:
                     st.error(f"Failed to add example: {str(e)}")
 
@@ -103,16 +196,13 @@ def main():
         if st.session_state.show_success:
             st.success("Example added successfully!")
 
-        example_model = transformer.PLATFORM_MODELS[platform][0]
-        all_examples = transformer.db_session.query(example_model).all()
-        top5_examples = transformer.db_session.query(example_model).order_by(
-            example_model.created_at.desc()).limit(5).all()
-        st.write(f"Total examples for {platform}: **{len(all_examples)}**")
+        # COUNT(*) and a short prefix of the newest rows, cached until the next write
+        st.write(f"Total examples for {platform}: **{transformer.count_examples(platform)}**")
         # Add this after the Add Example button (temporary for debugging)
         with st.expander("Preview Examples"):
-            for ex in top5_examples:
+            for preview in transformer.recent_example_previews(platform):
                 # Get first two lines of content
-                preview_lines = ex.content.split('\n')[:2]
+                preview_lines = preview.split('\n')[:2]
                 st.text('\n'.join(preview_lines))
                 st.divider()
 
@@ -139,18 +229,24 @@ def main():
 
         with st.spinner("Transforming your post..."):
             try:
-                transformed_post = transformer.transform_post(user_text, platform)
+                # Create a container to maintain state
+                result_container = st.container()
+
+                with result_container:
+                    st.subheader("Transformed Post:")
+                    output = st.empty()
+                    # Render tokens as they arrive; if Streamlit abandons this
+                    # run, closing the generator cancels the LLM request
+                    transformed_post = ""
+                    with closing(transformer.transform_post_stream(
+                            user_text, platform,
+                            bypass_cache=fresh_sample)) as stream:
+                        for chunk in stream:
+                            transformed_post += chunk
+                            output.code(transformed_post, language=None)
+
                 st.success("Your transformed post is ready!")
                 
-                # Always sync with Hugging Face in background (no spinner needed)
-                def sync_in_background():
-                    try:
-                        transformer.hf_dataset_manager.push_to_hub()
-                    except Exception as e:
-                        print(f"Auto-sync failed: {str(e)}")
-                # Run sync in background thread to avoid blocking UI
-                threading.Thread(target=sync_in_background).start()
-                
                 # Calculate dynamic height based on content length
                 # Assuming average of 50 characters per line, 20px per line
                 min_height = 150
@@ -159,11 +255,7 @@ def main():
                 calculated_height = min(
                     max(min_height, (content_length // 50) * 20), max_height)
 
-                # Create a container to maintain state
-                result_container = st.container()
-
                 with result_container:
-                    st.subheader("Transformed Post:")
                     # Add custom CSS to control height
                     st.markdown(f"""
                         <style>
@@ -182,41 +274,69 @@ def main():
                         </style>
                         """,
                                 unsafe_allow_html=True)
-                    st.code(transformed_post, language=None)
+                    output.code(transformed_post, language=None)
 
                 # Save the transformation
                 metadata = {
                     "id": str(uuid.uuid4()),
                     "model": transformer.llm.model_name if transformer.llm else "unknown",
                     "temperature": transformer.llm.temperature if transformer.llm else 0.0,
-                    "example_count": len(transformer.examples),
+                    "example_count": transformer.example_count,
                     "platform": transformer.current_platform,
                     "timestamp": datetime.now().isoformat(),
                     "character_count_original": len(user_text),
                     "character_count_transformed": len(transformed_post),
                     "word_count_original": len(user_text.split()),
                     "word_count_transformed": len(transformed_post.split()),
-                    "session_id": str(uuid.uuid4())  # To group transformations from same session
+                    "session_id": str(uuid.uuid4()),  # To group transformations from same session
+                    "time_to_first_token": transformer.last_generation_stats["time_to_first_token"]
                 }
-                transformer.save_transformation(user_text, transformed_post, metadata)
+                # Identical repeats are not saved (or synced) twice
+                if transformer.save_transformation(user_text, transformed_post, metadata):
+                    # Always sync with Hugging Face in background (no spinner needed).
+                    # The shared worker coalesces requests into one debounced push.
+                    resources.get_sync_worker().request_sync()
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
 
-    # Update transformation history to use platform-specific table
+    # One source text as every platform's post, generated concurrently
+    if st.button("Transform for all platforms", disabled=not api_key):
+        if not user_text:
+            st.warning("Please enter some text to transform!")
+            return
+
+        with st.spinner("Transforming your post for every platform..."):
+            try:
+                posts = transformer.transform_all(user_text, bypass_cache=fresh_sample)
+                for tab, post in zip(st.tabs(list(posts)), posts.values()):
+                    with tab:
+                        st.code(post, language=None)
+                st.success("Your posts are ready!")
+
+                metadata = {
+                    "timestamp": datetime.now().isoformat(),
+                    "character_count_original": len(user_text),
+                    "word_count_original": len(user_text.split()),
+                    "session_id": str(uuid.uuid4()),
+                }
+                # All platforms are saved in one transaction
+                saved_count = transformer.save_all(user_text, posts, metadata)
+                if saved_count:
+                    resources.get_sync_worker().request_sync(dirty_rows=saved_count)
+            except Exception as e:
+                st.error(f"An error occurred: {str(e)}")
+
+    # History is only queried while it is switched on
     with st.expander("Transformation History"):
-        transformation_model = transformer.PLATFORM_MODELS[platform][1]
-        transformations = transformer.db_session.query(
-            transformation_model).order_by(
-                transformation_model.created_at.desc()).limit(10).all()
-
-        for t in transformations:
-            st.write("**Original:**")
-            st.text(t.original_text)
-            st.write("**Transformed:**")
-            st.text(t.transformed_text)
-            st.write(f"*Created at: {t.created_at}*")
-            st.divider()
-    
+        if st.toggle("Show history", key="show_history"):
+            render_history(transformer, platform)
+
+    # Only offered when TRACE_SINKS keeps spans in memory
+    if trace_buffer is not None:
+        with st.expander("Diagnostics"):
+            if st.toggle("Show timings", key="show_diagnostics"):
+                render_diagnostics(trace_buffer)
+
     # Check if dashboard should be shown
     if "show_dashboard" in st.session_state and st.session_state.show_dashboard:
         # Show the dashboard in a new tab/section
@@ -255,20 +375,33 @@ def show_dataset_dashboard():
                             st.metric("Average Original Length", f"{platform_stats['avg_original_length']:.1f} chars")
                         with col2:
                             st.metric("Average Transformed Length", f"{platform_stats['avg_transformed_length']:.1f} chars")
+                        lengths = platform_stats["transformed_length"]
+                        words = platform_stats["transformed_words"]
+                        st.caption(
+                            f"Transformed length p50/p90/p99: {lengths['p50']:.0f} / {lengths['p90']:.0f} / "
+                            f"{lengths['p99']:.0f} chars · {words['mean']:.1f} words and "
+                            f"{platform_stats['transformed_emoji']['mean']:.1f} emoji on average")
+                        if platform_stats["models"]:
+                            st.caption("Models: " + ", ".join(
+                                f"{model} ({count})" for model, count in platform_stats["models"].items()))
                 
                 # Add option to export for fine-tuning
                 if st.button("Prepare for Fine-Tuning"):
                     with st.spinner("Preparing data for fine-tuning..."):
-                        fine_tuning_data = prepare_for_fine_tuning(dataset)
-                        st.success(f"Fine-tuning data prepared! ({len(fine_tuning_data)} examples)")
+                        summary = prepare_for_fine_tuning(dataset, output=DEFAULT_EXPORT_PATH)
+                        st.success(f"Fine-tuning data prepared! ({summary['examples']} examples)")
                         st.download_button(
                             "Download Fine-Tuning Data",
-                            data=open("fine_tuning_data.jsonl", "rb"),
-                            file_name="fine_tuning_data.jsonl"
+                            data=open(DEFAULT_EXPORT_PATH, "rb"),
+                            file_name=os.path.basename(DEFAULT_EXPORT_PATH)
                         )
             except Exception as e:
                 st.error(f"Failed to load dataset: {str(e)}")
 
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Each rerun runs on its own script thread; hand its connection back
+        resources.remove_session()
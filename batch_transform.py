@@ -0,0 +1,120 @@
+"""Bulk-transform posts from a JSONL or CSV file.
+
+Each input record needs a `text` field and a `platform` field (LinkedIn,
+Twitter or Instagram); --platform supplies a default for records without one.
+Results are written to the database in batches as they complete and can also
+be streamed to a JSONL file.
+
+Usage:
+    python batch_transform.py jobs.jsonl --concurrency 8 --rpm 500 --tpm 200000
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+import resources
+from langchain_pipeline import PostTransformer
+from rate_limiter import RateLimiter
+
+
+def read_jobs(path, default_platform=None):
+    """Yield (text, platform) tuples from a JSONL or CSV file without loading it whole"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        for record in records:
+            text = record.get("text")
+            if not text or not text.strip():
+                continue
+            yield text, record.get("platform") or default_platform
+
+
+def run_batch(transformer, jobs, concurrency=4, rate_limiter=None,
+              batch_size=100, output=None):
+    """Transform jobs, saving successful results in batches; returns summary counts"""
+    started = time.perf_counter()
+    succeeded = failed = 0
+    batch = []
+    for result in transformer.transform_many(jobs, concurrency=concurrency,
+                                             rate_limiter=rate_limiter):
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+        if result["error"]:
+            failed += 1
+            print(f"Job {result['index']} failed: {result['error']}", file=sys.stderr)
+            continue
+        succeeded += 1
+        batch.append(result)
+        if len(batch) >= batch_size:
+            transformer.save_transformations(batch)
+            batch = []
+    if batch:
+        transformer.save_transformations(batch)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "succeeded": succeeded,
+        "failed": failed,
+        "seconds": elapsed,
+        "jobs_per_second": (succeeded + failed) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Bulk-transform posts from a JSONL or CSV file")
+    parser.add_argument("input", help="JSONL or CSV file with text and platform fields")
+    parser.add_argument("--platform", choices=PostTransformer.PLATFORMS,
+                        help="Platform for records that do not name one")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=int, default=None, help="Max requests per minute")
+    parser.add_argument("--tpm", type=int, default=None, help="Max prompt tokens per minute")
+    parser.add_argument("--batch-size", type=int, default=100,
+                        help="Rows per database insert")
+    parser.add_argument("--temperature", type=float, default=0.88)
+    parser.add_argument("--output", help="Also write every result to this JSONL file")
+    parser.add_argument("--sync", action="store_true",
+                        help="Push the Hugging Face dataset when done")
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key:
+        parser.error("OPENAI_API_KEY is not set")
+
+    transformer = PostTransformer(
+        db_session=resources.get_session_factory()(),
+        hf_dataset_manager=resources.get_dataset_manager())
+    transformer.set_api_key(api_key, args.temperature)
+    rate_limiter = None
+    if args.rpm or args.tpm:
+        rate_limiter = RateLimiter(requests_per_minute=args.rpm,
+                                   tokens_per_minute=args.tpm)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    try:
+        summary = run_batch(transformer,
+                            read_jobs(args.input, args.platform),
+                            concurrency=args.concurrency,
+                            rate_limiter=rate_limiter,
+                            batch_size=args.batch_size,
+                            output=output)
+    finally:
+        if output is not None:
+            output.close()
+
+    print(f"Transformed {summary['succeeded']} posts ({summary['failed']} failed) "
+          f"in {summary['seconds']:.1f}s, {summary['jobs_per_second']:.2f} jobs/s")
+
+    if args.sync:
+        transformer.hf_dataset_manager.push_to_hub()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark HuggingFaceDatasetManager.add_transformation.
+
+Compares the buffered append path against the old implementation, which
+rebuilt the whole split with Dataset.from_dict on every row (O(N^2) overall).
+The old path is run on fewer rows by default because it is so slow; compare
+the per-row cost.
+
+Usage:
+    python benchmarks/bench_append.py --rows 100000 --legacy-rows 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datasets import Dataset
+
+from huggingface_dataset import HuggingFaceDatasetManager
+
+
+def legacy_add_transformation(dataset_dict, platform, original_text, transformed_text):
+    """The pre-buffer implementation: copy every column and rebuild the split"""
+    current_dataset = dataset_dict[platform]
+    dataset_dict[platform] = Dataset.from_dict({
+        "original_text": current_dataset["original_text"] + [original_text],
+        "transformed_text": current_dataset["transformed_text"] + [transformed_text],
+        "metadata": current_dataset["metadata"] + [json.dumps({"platform": platform})]
+    })
+
+
+def run_legacy(rows):
+    dataset_dict = HuggingFaceDatasetManager._empty_dataset_dict()
+    start = time.perf_counter()
+    for i in range(rows):
+        legacy_add_transformation(dataset_dict, "linkedin", f"original {i}", f"transformed {i}")
+    return time.perf_counter() - start
+
+
+def run_buffered(rows):
+    manager = HuggingFaceDatasetManager(token="", repo_name="", lazy=True)
+    manager.dataset_dict = HuggingFaceDatasetManager._empty_dataset_dict()
+    start = time.perf_counter()
+    for i in range(rows):
+        manager.add_transformation("LinkedIn", f"original {i}", f"transformed {i}")
+    append_seconds = time.perf_counter() - start
+    flush_start = time.perf_counter()
+    manager.flush()
+    flush_seconds = time.perf_counter() - flush_start
+    assert len(manager.dataset_dict["linkedin"]) == rows
+    return append_seconds, flush_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--legacy-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    legacy_seconds = run_legacy(args.legacy_rows)
+    append_seconds, flush_seconds = run_buffered(args.rows)
+    buffered_seconds = append_seconds + flush_seconds
+
+    print(f"legacy   {args.legacy_rows:>8} rows  {legacy_seconds:8.2f} s  "
+          f"{legacy_seconds / args.legacy_rows * 1e6:10.1f} us/row")
+    print(f"buffered {args.rows:>8} rows  {buffered_seconds:8.2f} s  "
+          f"{buffered_seconds / args.rows * 1e6:10.1f} us/row  "
+          f"(flush {flush_seconds * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
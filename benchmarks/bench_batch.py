@@ -0,0 +1,48 @@
+"""Benchmark transform_many throughput against a local fake LLM.
+
+The fake model (FakeChatModel) sleeps for --latency seconds per call to stand
+in for the network round trip, so the numbers show how well concurrency hides
+latency.
+
+Usage:
+    python benchmarks/bench_batch.py --jobs 200 --latency 0.2 --concurrency 1 8 32
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from batch_transform import run_batch
+from database import create_session_factory
+from langchain_pipeline import FakeChatModel, PostTransformer
+from huggingface_dataset import HuggingFaceDatasetManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_batch_")
+    session_factory = create_session_factory(f"sqlite:///{db_dir}/bench.db")
+    platforms = PostTransformer.PLATFORMS
+
+    for concurrency in args.concurrency:
+        jobs = ((f"Blog paragraph {i} about shipping software", platforms[i % 3])
+                for i in range(args.jobs))
+        manager = HuggingFaceDatasetManager(token="", repo_name="", lazy=True)
+        manager.dataset_dict = HuggingFaceDatasetManager._empty_dataset_dict()
+        transformer = PostTransformer(db_session=session_factory(),
+                                      hf_dataset_manager=manager)
+        transformer.llm = FakeChatModel(latency=args.latency)
+        summary = run_batch(transformer, jobs, concurrency=concurrency)
+        print(f"concurrency {concurrency:>3}: {summary['succeeded']} jobs in "
+              f"{summary['seconds']:6.2f}s  {summary['jobs_per_second']:8.1f} jobs/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark dataset statistics: per-row Python loops vs Arrow compute kernels.
+
+Builds a local datasets.Dataset of --rows transformations (with JSON
+metadata, as pushed by the app) and times the old per-row averages, the
+same statistics as compute_platform_stats (length, word and emoji
+distributions plus parsed metadata) computed with Python loops, and
+compute_platform_stats itself, which runs on the Arrow buffers.
+
+Usage:
+    python benchmarks/bench_dataset_stats.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datasets import Dataset
+
+from dataset_tools import arrow_table, compute_platform_stats
+
+EMOJI = re.compile("[\U0001F000-\U0001FAFF\u2600-\u27BF\u2B00-\u2BFF]")
+
+
+def build_dataset(rows):
+    metadata = [json.dumps({"id": str(i), "model": "gpt-4o-mini" if i % 3 else "gpt-4o",
+                            "temperature": 0.7, "example_count": 3,
+                            "timestamp": f"2025-01-01T00:00:{i % 60:02d}"})
+                for i in range(rows)]
+    return Dataset.from_dict({
+        "original_text": [f"Original post number {i} about shipping things" for i in range(rows)],
+        "transformed_text": [f"Post {i}: we shipped it 🚀 #launch" for i in range(rows)],
+        "metadata": metadata,
+    })
+
+
+def python_stats(platform_data):
+    """What load_and_analyze_dataset used to do"""
+    return {
+        "total_examples": len(platform_data),
+        "avg_original_length": sum(len(text) for text in platform_data["original_text"]) / len(platform_data),
+        "avg_transformed_length": sum(len(text) for text in platform_data["transformed_text"]) / len(platform_data),
+    }
+
+
+def python_full_stats(platform_data):
+    """The same statistics as compute_platform_stats, one Python object per value"""
+    stats = {}
+    for column in ("original_text", "transformed_text"):
+        texts = platform_data[column]
+        for name, values in (("length", [len(text) for text in texts]),
+                             ("words", [len(text.split()) for text in texts]),
+                             ("emoji", [len(EMOJI.findall(text)) for text in texts])):
+            stats[f"{column}_{name}"] = (statistics.mean(values),
+                                         statistics.quantiles(values, n=100)[49::40])
+    metadata = [json.loads(raw or "{}") for raw in platform_data["metadata"]]
+    models = {}
+    for item in metadata:
+        if item.get("model"):
+            models[item["model"]] = models.get(item["model"], 0) + 1
+    stats["models"] = models
+    temperatures = [item["temperature"] for item in metadata if "temperature" in item]
+    stats["avg_temperature"] = statistics.mean(temperatures)
+    timestamps = [item["timestamp"] for item in metadata if "timestamp" in item]
+    stats["timestamps"] = (min(timestamps), max(timestamps))
+    return stats
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    dataset = build_dataset(args.rows)
+    print(f"{args.rows} rows")
+
+    old, python_seconds = timed(python_stats, dataset)
+    print(f"  python loops, two averages (old):  {python_seconds:.2f}s")
+    _, full_seconds = timed(python_full_stats, dataset)
+    print(f"  python loops, full statistics:     {full_seconds:.2f}s")
+    new, arrow_seconds = timed(lambda: compute_platform_stats(arrow_table(dataset)))
+    print(f"  arrow compute, full statistics:    {arrow_seconds:.2f}s "
+          f"({full_seconds / arrow_seconds:.1f}x faster than python)")
+    assert abs(old["avg_transformed_length"] - new["avg_transformed_length"]) < 1e-6
+
+
+if __name__ == "__main__":
+    main()
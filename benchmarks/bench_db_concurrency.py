@@ -0,0 +1,83 @@
+"""Stress the database with concurrent writers and readers.
+
+Each of --threads threads repeatedly saves a transformation and reads the
+latest history page through a thread-local session, the way concurrent
+Streamlit sessions do. Runs once against a default engine (rollback journal,
+no busy timeout) and once against create_db_engine (WAL, synchronous=NORMAL,
+busy timeout, pooled connections), reporting throughput and lock errors.
+
+Usage:
+    python benchmarks/bench_db_concurrency.py --threads 16 --ops 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from database import Base, PLATFORMS, Transformation, create_db_engine
+
+
+def worker(Session, worker_id, ops, errors, lock):
+    platform = PLATFORMS[worker_id % len(PLATFORMS)]
+    try:
+        for i in range(ops):
+            try:
+                Session.add(Transformation(id=str(uuid.uuid4()), platform=platform,
+                                           original_text=f"Original {worker_id}-{i}",
+                                           transformed_text=f"Post {worker_id}-{i}",
+                                           meta={}))
+                Session.commit()
+                Session.query(Transformation).filter(
+                    Transformation.platform == platform).order_by(
+                        Transformation.created_at.desc()).limit(10).all()
+            except Exception as e:
+                Session.rollback()
+                with lock:
+                    errors.append(type(e).__name__)
+    finally:
+        Session.remove()
+
+
+def run(label, engine, threads, ops):
+    Base.metadata.create_all(engine)
+    Session = scoped_session(sessionmaker(bind=engine))
+    errors = []
+    lock = threading.Lock()
+    workers = [threading.Thread(target=worker, args=(Session, i, ops, errors, lock))
+               for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done = threads * ops - len(errors)
+    print(f"{label:<8} {done:6d} write+read ops in {elapsed:6.2f}s "
+          f"{done / elapsed:9.1f} ops/s  {len(errors):5d} errors")
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="Operations per thread")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_db_concurrency_")
+    # Closest thing to the old init_db() that threads can share at all
+    before = create_engine(f"sqlite:///{db_dir}/before.db",
+                           connect_args={"check_same_thread": False, "timeout": 0})
+    run("before", before, args.threads, args.ops)
+    run("after", create_db_engine(f"sqlite:///{db_dir}/after.db"), args.threads, args.ops)
+
+
+if __name__ == "__main__":
+    main()
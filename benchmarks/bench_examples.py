@@ -0,0 +1,54 @@
+"""Benchmark few-shot example selection latency as the example table grows.
+
+Usage:
+    python benchmarks/bench_examples.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from example_selector import ExampleIndex
+
+
+def make_vocabulary(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def make_post(vocabulary, weights, rng):
+    return " ".join(rng.choices(vocabulary, weights=weights, k=rng.randint(20, 60)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(20000, rng)
+    # Zipf-like word frequencies, like real text
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    queries = [make_post(vocabulary, weights, rng) for _ in range(args.queries)]
+
+    index = ExampleIndex()
+    for size in sorted(args.sizes):
+        start = time.perf_counter()
+        while len(index) < size:
+            index.add(make_post(vocabulary, weights, rng))
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            index.select(query)
+        per_query_ms = (time.perf_counter() - start) / len(queries) * 1000
+        print(f"{size:>8} examples: select {per_query_ms:6.2f} ms/query "
+              f"(incremental indexing {build_seconds:6.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark the fine-tuning export: per-row column indexing vs streamed record batches.
+
+The old prepare_for_fine_tuning indexed platform_data["original_text"][i]
+inside its loop, pulling the whole column on every row (O(N^2)), and kept
+every example in a list before writing. It is timed on --old-rows; the
+streaming exporter is timed on --rows (plain, gzipped, and with metadata
+filters, dedupe, a validation split and a token limit in the same pass),
+and its peak Python memory measured.
+
+Usage:
+    python benchmarks/bench_export.py --rows 1000000 --old-rows 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datasets import Dataset, DatasetDict
+
+from dataset_tools import FineTuningFilter, export_fine_tuning_data
+
+
+def build_dataset(rows):
+    return DatasetDict({"linkedin": Dataset.from_dict({
+        "original_text": [f"Original post number {i} about shipping things" for i in range(rows)],
+        "transformed_text": [f"Post {i}: we shipped it 🚀 #launch" for i in range(rows)],
+        "metadata": [json.dumps({"model": "gpt-4o-mini" if i % 4 else "gpt-4o", "temperature": 0.7,
+                                 "timestamp": "2025-01-01T12:00:00"}) for i in range(rows)],
+    })})
+
+
+def old_prepare_for_fine_tuning(dataset, path):
+    """The exporter as it was, writing to path"""
+    fine_tuning_data = []
+    for platform in dataset.keys():
+        platform_data = dataset[platform]
+        for i in range(len(platform_data)):
+            fine_tuning_data.append({"messages": [
+                {"role": "system", "content": f"You are a content optimizer for {platform}"},
+                {"role": "user", "content": platform_data["original_text"][i]},
+                {"role": "assistant", "content": platform_data["transformed_text"][i]}]})
+    with open(path, "w") as f:
+        for example in fine_tuning_data:
+            f.write(json.dumps(example) + "\n")
+    return fine_tuning_data
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def peak_memory(function, *args):
+    """Peak Python allocations of a separate (slower, traced) run"""
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--old-rows", type=int, default=2000,
+                        help="Rows for the old quadratic exporter")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "fine_tuning_data.jsonl")
+
+        elapsed = timed(old_prepare_for_fine_tuning, build_dataset(args.old_rows), path)
+        print(f"old exporter, {args.old_rows} rows: {elapsed:.2f}s "
+              f"({args.old_rows / elapsed:.0f} rows/s)")
+
+        dataset = build_dataset(args.rows)
+        for label, output in (("streaming", path), ("streaming, gzip", path + ".gz")):
+            elapsed = timed(export_fine_tuning_data, dataset, output)
+            print(f"{label}, {args.rows} rows: {elapsed:.2f}s ({args.rows / elapsed:.0f} rows/s)")
+        filters = FineTuningFilter(models=["gpt-4o-mini"], max_temperature=1.0,
+                                   max_tokens=512, val_fraction=0.1)
+        elapsed = timed(export_fine_tuning_data, dataset, path, False, None, 10000, filters)
+        print(f"streaming, filtered + split + token limit, {args.rows} rows: {elapsed:.2f}s "
+              f"({args.rows / elapsed:.0f} rows/s)")
+        peak = peak_memory(export_fine_tuning_data, dataset, path)
+        print(f"streaming peak Python memory: {peak / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark generating all three platform posts: sequential calls vs transform_all.
+
+Points a PostTransformer at a local mock OpenAI server that waits --latency
+seconds per request, then times three sequential transform_post calls plus
+three save_transformation commits against transform_all plus one save_all.
+
+Usage:
+    python benchmarks/bench_fan_out.py --latency 0.5 --rounds 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import create_session_factory
+from huggingface_dataset import HuggingFaceDatasetManager
+from langchain_pipeline import PostTransformer
+from llm_clients import LLMClientRegistry
+from mock_openai_server import MockOpenAIServer
+
+
+def sequential(transformer, text):
+    for platform in transformer.PLATFORMS:
+        transformer.set_platform(platform)
+        post = transformer.transform_post(text, platform, bypass_cache=True)
+        transformer.save_transformation(text, post)
+
+
+def fan_out(transformer, text):
+    transformer.save_all(text, transformer.transform_all(text, bypass_cache=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    db_dir = tempfile.mkdtemp(prefix="bench_fan_out_")
+    session_factory = create_session_factory(f"sqlite:///{db_dir}/bench.db")
+    with MockOpenAIServer(latency=args.latency) as server:
+        registry = LLMClientRegistry(base_url=server.base_url)
+        manager = HuggingFaceDatasetManager(token="", repo_name="", lazy=True)
+        manager.dataset_dict = HuggingFaceDatasetManager._empty_dataset_dict()
+        transformer = PostTransformer(db_session=session_factory(), hf_dataset_manager=manager)
+        transformer.llm = registry.get("sk-mock", 0.7)
+
+        for label, run in (("sequential", sequential), ("transform_all", fan_out)):
+            timings = []
+            for i in range(args.rounds):
+                start = time.perf_counter()
+                run(transformer, f"{label} round {i}: we shipped the new editor today")
+                timings.append(time.perf_counter() - start)
+            print(f"{label:<14} mean {statistics.mean(timings):.2f}s per text "
+                  f"(one call: {args.latency:.2f}s)")
+        registry.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark history paging: keyset cursors vs LIMIT/OFFSET.
+
+Seeds --rows LinkedIn transformations and times fetching a page at several
+depths, once with history.history_page (keyset on created_at, id) and once
+with the equivalent OFFSET query that loads full rows.
+
+Usage:
+    python benchmarks/bench_history.py --rows 1000000 --depths 0 1000 100000 900000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+
+from database import Transformation, create_session_factory
+from history import history_page
+
+
+def seed(session, rows, chunk=50000):
+    start = datetime(2024, 1, 1)
+    body = "Shipping a new feature today after weeks of testing with customers. " * 8
+    for offset in range(0, rows, chunk):
+        session.execute(insert(Transformation), [
+            {"id": str(uuid.uuid4()), "platform": "LinkedIn", "original_text": f"{i} {body}",
+             "transformed_text": f"{i} {body}", "meta": {},
+             "created_at": start + timedelta(seconds=i)}
+            for i in range(offset, min(offset + chunk, rows))])
+    session.commit()
+
+
+def offset_page(session, depth, limit=10):
+    return session.query(Transformation).filter(
+        Transformation.platform == "LinkedIn").order_by(
+            Transformation.created_at.desc(), Transformation.id.desc()
+        ).offset(depth).limit(limit).all()
+
+
+def timed(fn, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1000, 100000, 900000])
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_history_")
+    session = create_session_factory(f"sqlite:///{db_dir}/bench.db")()
+    print(f"Seeding {args.rows} rows...")
+    seed(session, args.rows)
+
+    for depth in args.depths:
+        if depth >= args.rows:
+            continue
+        cursor = None
+        if depth:
+            # The cursor a user would hold after paging down to this depth
+            row = offset_page(session, depth - 1, limit=1)[0]
+            cursor = (row.created_at, row.id)
+        session.expunge_all()
+        keyset = timed(lambda: history_page(session, "LinkedIn", cursor=cursor))
+        offset = timed(lambda: offset_page(session, depth))
+        print(f"depth {depth:>9}: keyset {keyset:8.2f} ms   offset {offset:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the bulk example importer.
+
+Writes --rows examples (with --dup-ratio of them repeated) to a temporary
+JSONL file, imports them into a fresh SQLite database with import_examples,
+and compares against the old approach of one ORM add() per example
+(timed on --orm-rows rows and extrapolated).
+
+Usage:
+    python benchmarks/bench_import.py --rows 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import PLATFORMS, Example, create_db_engine, create_session_factory, prepare_database
+from import_examples import import_examples, read_examples
+
+
+def write_input(path, rows, dup_ratio):
+    unique = max(1, int(rows * (1 - dup_ratio)))
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            n = i % unique
+            f.write(json.dumps({"platform": PLATFORMS[n % 3],
+                                "content": f"Example post {n}: shipped a feature our customers asked for."}) + "\n")
+
+
+def orm_import(session, path, limit):
+    start = time.perf_counter()
+    for i, (platform, content) in enumerate(read_examples(path)):
+        if i == limit:
+            break
+        session.add(Example(id=str(uuid.uuid4()), platform=platform, content=content))
+        session.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--dup-ratio", type=float, default=0.1)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--orm-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_import_")
+    path = os.path.join(work_dir, "examples.jsonl")
+    write_input(path, args.rows, args.dup_ratio)
+
+    session = create_session_factory(f"sqlite:///{work_dir}/orm.db")()
+    seconds = orm_import(session, path, args.orm_rows)
+    print(f"before (ORM add per row): {args.orm_rows / seconds:10.0f} rows/s, "
+          f"~{args.rows * seconds / args.orm_rows:8.0f}s for {args.rows} rows")
+
+    engine = prepare_database(create_db_engine(f"sqlite:///{work_dir}/bulk.db"))
+    summary = import_examples(engine, read_examples(path), batch_size=args.batch_size)
+    print(f"after (bulk importer):    {summary['rows_per_second']:10.0f} rows/s, "
+          f"{summary['seconds']:9.1f}s for {summary['read']} rows "
+          f"({summary['inserted']} inserted, {summary['duplicates']} duplicates)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark LLM client reuse against a local mock OpenAI-compatible server.
+
+Simulates --reruns Streamlit reruns, each sending one request and cycling
+the temperature slider through --temperatures values, with three ways of
+getting the chat model:
+
+  per-rerun     a new ChatOpenAI on every rerun (the original app)
+  per-settings  one ChatOpenAI per (key, model, temperature), each with its
+                own connection pool (the previous resources.get_llm)
+  registry      LLMClientRegistry: one chat model per settings, all on one
+                shared keep-alive pool
+
+and reports the TCP connections the server accepted and the mean time per
+rerun. The mock server is plain HTTP on loopback, so this understates what
+a new connection costs against api.openai.com (TCP + TLS handshakes).
+
+Usage:
+    python benchmarks/bench_llm_clients.py --reruns 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_community.chat_models import ChatOpenAI
+from langchain_core.messages import HumanMessage
+
+from llm_clients import LLMClientRegistry
+from mock_openai_server import MockOpenAIServer
+
+API_KEY = "sk-mock"
+
+
+def run(label, get_llm, reruns, temperatures):
+    with MockOpenAIServer() as server:
+        timings = []
+        for i in range(reruns):
+            start = time.perf_counter()
+            llm = get_llm(server.base_url, temperatures[i % len(temperatures)])
+            llm.invoke([HumanMessage(f"Rerun {i}")])
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{label:<13} {server.connections:>5} connections for {server.requests} requests, "
+              f"mean {statistics.mean(timings):.2f} ms, p50 {statistics.median(timings):.2f} ms per rerun")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--temperatures", type=int, default=3,
+                        help="Distinct temperature settings cycled through")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    temperatures = [round(0.1 + 0.2 * i, 1) for i in range(args.temperatures)]
+
+    run("per-rerun", lambda base_url, temperature: ChatOpenAI(
+        openai_api_key=API_KEY, openai_api_base=base_url, temperature=temperature),
+        args.reruns, temperatures)
+
+    cached = {}
+
+    def per_settings(base_url, temperature):
+        if temperature not in cached:
+            cached[temperature] = ChatOpenAI(openai_api_key=API_KEY, openai_api_base=base_url,
+                                             temperature=temperature)
+        return cached[temperature]
+
+    run("per-settings", per_settings, args.reruns, temperatures)
+
+    registries = {}
+
+    def registry(base_url, temperature):
+        if base_url not in registries:
+            registries[base_url] = LLMClientRegistry(base_url=base_url)
+        return registries[base_url].get(API_KEY, temperature)
+
+    run("registry", registry, args.reruns, temperatures)
+
+
+if __name__ == "__main__":
+    main()
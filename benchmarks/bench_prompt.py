@@ -0,0 +1,47 @@
+"""Micro-benchmark of per-call prompt assembly.
+
+"before" rebuilds ChatPromptTemplate.from_messages from the system prompt
+f-string on every call, as transform_post used to. "after" formats the
+precompiled template from the prompt registry.
+
+Usage:
+    python benchmarks/bench_prompt.py --calls 2000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.prompts import ChatPromptTemplate
+
+from prompts import PROMPTS, SYSTEM_PROMPT
+
+USER_TEXT = "We just shipped our new onboarding flow after three months of user research. " * 5
+
+
+def assemble_before(platform="LinkedIn"):
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", SYSTEM_PROMPT.replace("{platform}", platform)),
+        ("user", USER_TEXT)])
+    return prompt.format_messages()
+
+
+def assemble_after(platform="LinkedIn"):
+    return PROMPTS.get(platform).format_messages(USER_TEXT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    assert [m.content for m in assemble_before()] == [m.content for m in assemble_after()]
+    for label, fn in (("before", assemble_before), ("after", assemble_after)):
+        seconds = min(timeit.repeat(fn, number=args.calls, repeat=3))
+        print(f"{label:<8} {seconds / args.calls * 1e6:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
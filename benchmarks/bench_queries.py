@@ -0,0 +1,94 @@
+"""Benchmark history queries on the legacy per-platform tables vs the unified tables.
+
+Seeds --rows transformations per platform into both the legacy
+<platform>_transformations tables (no index on created_at) and the unified
+transformations table (indexed on platform, created_at), then times the app's
+"latest 10 for a platform" history query and a cross-platform count.
+
+Usage:
+    python benchmarks/bench_queries.py --rows 200000 --repeat 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, LEGACY_MODELS, LegacyBase, PLATFORMS, Transformation
+
+
+def seed(session, rows, chunk=50000):
+    start = datetime(2024, 1, 1)
+    for platform in PLATFORMS:
+        legacy_model = LEGACY_MODELS[platform][1]
+        for offset in range(0, rows, chunk):
+            values = [{"id": str(uuid.uuid4()), "original_text": f"Original post {i}",
+                       "transformed_text": f"{platform} post {i}",
+                       "created_at": start + timedelta(seconds=i)}
+                      for i in range(offset, min(offset + chunk, rows))]
+            session.execute(insert(legacy_model), values)
+            session.execute(insert(Transformation),
+                            [dict(value, id=str(uuid.uuid4()), platform=platform,
+                                  meta={}) for value in values])
+    session.commit()
+
+
+def legacy_history(session, platform):
+    model = LEGACY_MODELS[platform][1]
+    return session.query(model).order_by(model.created_at.desc()).limit(10).all()
+
+
+def unified_history(session, platform):
+    return session.query(Transformation).filter(
+        Transformation.platform == platform).order_by(
+            Transformation.created_at.desc()).limit(10).all()
+
+
+def legacy_total(session):
+    return sum(session.execute(select(func.count()).select_from(models[1])).scalar_one()
+               for models in LEGACY_MODELS.values())
+
+
+def unified_total(session):
+    return session.execute(select(func.count()).select_from(Transformation)).scalar_one()
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000, help="Rows per platform")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_queries_")
+    # Plain create_all so the legacy rows are not migrated away
+    engine = create_engine(f"sqlite:///{db_dir}/bench.db")
+    Base.metadata.create_all(engine)
+    LegacyBase.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    print(f"Seeding {args.rows} rows per platform...")
+    seed(session, args.rows)
+
+    for platform in PLATFORMS:
+        before = timed(lambda: legacy_history(session, platform), args.repeat)
+        after = timed(lambda: unified_history(session, platform), args.repeat)
+        print(f"history {platform:<10} legacy {before:8.2f} ms  unified {after:8.3f} ms")
+    print(f"total count          legacy {timed(lambda: legacy_total(session), args.repeat):8.2f} ms"
+          f"  unified {timed(lambda: unified_total(session), args.repeat):8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark the per-rerun cost of getting a ready-to-use PostTransformer.
+
+"before" mimics the old app.main(), which built a fresh PostTransformer (new
+engine, create_all, new dataset manager, new ChatOpenAI) on every rerun.
+"after" uses the process-wide resources and a per-session handle.
+
+Usage:
+    python benchmarks/bench_rerun.py --reruns 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_community.chat_models import ChatOpenAI
+
+import resources
+from langchain_pipeline import PostTransformer
+from llm_clients import DEFAULT_MODEL
+
+
+def rerun_before(api_key):
+    transformer = PostTransformer()
+    transformer.set_platform("LinkedIn")
+    # The old set_api_key built a new client (and connection pool) every time
+    transformer.llm = ChatOpenAI(openai_api_key=api_key, temperature=0.88, model=DEFAULT_MODEL)
+    return transformer
+
+
+def rerun_after(session_state, api_key):
+    if "transformer" not in session_state:
+        session_state["transformer"] = PostTransformer(
+            db_session=resources.get_session_factory()(),
+            hf_dataset_manager=resources.get_dataset_manager())
+    transformer = session_state["transformer"]
+    transformer.set_platform("LinkedIn")
+    transformer.set_api_key(api_key, 0.88)
+    return transformer
+
+
+def measure(fn, reruns):
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    print(f"{label:<8} mean {statistics.mean(timings):8.2f} ms   "
+          f"median {statistics.median(timings):8.2f} ms   "
+          f"max {max(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--api-key", default="sk-benchmark")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_rerun_")
+    os.chdir(workdir)
+    print(f"Working directory: {workdir}")
+
+    def before():
+        # The old code path had no process-wide caching at all
+        resources.reset()
+        rerun_before(args.api_key)
+
+    resources.reset()
+    session_state = {}
+
+    def after():
+        rerun_after(session_state, args.api_key)
+
+    report("before", measure(before, args.reruns))
+    report("after", measure(after, args.reruns))
+
+
+if __name__ == "__main__":
+    main()
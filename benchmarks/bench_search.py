@@ -0,0 +1,84 @@
+"""Benchmark full-text search over stored transformations.
+
+Seeds --rows transformations built from a random vocabulary (a few common
+words, many rare ones) through the FTS5 sync triggers, then times ranked
+searches with search_index.search (after merging the index, as
+`python search_index.py optimize` does) against an unindexed LIKE scan.
+
+Usage:
+    python benchmarks/bench_search.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+
+from database import PLATFORMS, Transformation, create_session_factory
+from search_index import _like_search, optimize_search_index, search
+
+COMMON = ["team", "launch", "customers", "today", "product", "growth"]
+RARE = [f"term{i}" for i in range(20000)]
+
+
+def post(rng):
+    words = rng.choices(COMMON, k=6) + rng.choices(RARE, k=10)
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def seed(session, rows, chunk=20000):
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    for offset in range(0, rows, chunk):
+        session.execute(insert(Transformation), [
+            {"id": str(uuid.uuid4()), "platform": PLATFORMS[i % 3],
+             "original_text": post(rng), "transformed_text": post(rng), "meta": {},
+             "created_at": start + timedelta(seconds=i)}
+            for i in range(offset, min(offset + chunk, rows))])
+        session.commit()
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-like", action="store_true", help="Don't time the LIKE scan")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_search_")
+    session = create_session_factory(f"sqlite:///{db_dir}/bench.db")()
+    print(f"Seeding {args.rows} rows...")
+    start = time.perf_counter()
+    seed(session, args.rows)
+    print(f"seeded and indexed in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    optimize_search_index(session.get_bind())
+    print(f"optimized in {time.perf_counter() - start:.1f}s")
+
+    for query in ["term123", "term77 term4242", "term123*", "launch term500"]:
+        fts = timed(lambda: search(session, query, platform="LinkedIn"), args.repeat)
+        line = f"{query:<18} fts {fts:8.2f} ms"
+        if not args.skip_like:
+            like = timed(lambda: _like_search(session, query, "transformations",
+                                              "LinkedIn", 20), 1)
+            line += f"   like {like:9.2f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark the sidebar's example count and preview queries.
+
+Seeds a temporary SQLite database with --rows LinkedIn examples, then times
+the old approach (query(...).all() to count, plus a full-row preview query)
+against the cached COUNT(*) / column-limited queries in db_stats.py.
+
+Usage:
+    python benchmarks/bench_sidebar.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import insert
+
+from database import Example, create_session_factory
+from db_stats import DatabaseStats
+
+
+def seed(session, rows, chunk=50000):
+    start = datetime(2024, 1, 1)
+    body = "Shipping a new feature today after weeks of testing with customers. " * 4
+    for offset in range(0, rows, chunk):
+        session.execute(insert(Example), [
+            {"id": str(uuid.uuid4()), "platform": "LinkedIn", "content": f"{i} {body}",
+             "created_at": start + timedelta(seconds=i)}
+            for i in range(offset, min(offset + chunk, rows))])
+    session.commit()
+
+
+def render_before(session):
+    all_examples = session.query(Example).filter(Example.platform == "LinkedIn").all()
+    top5 = session.query(Example).filter(Example.platform == "LinkedIn").order_by(
+        Example.created_at.desc()).limit(5).all()
+    return len(all_examples), [ex.content for ex in top5]
+
+
+def render_after(session, stats):
+    return (stats.count(session, Example, platform="LinkedIn"),
+            stats.recent_previews(session, Example, platform="LinkedIn"))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_sidebar_")
+    session = create_session_factory(f"sqlite:///{db_dir}/bench.db")()
+    print(f"Seeding {args.rows} rows...")
+    seed(session, args.rows)
+
+    stats = DatabaseStats()
+    print(f"before (.all())          {timed(lambda: render_before(session)):10.1f} ms")
+    session.expunge_all()
+    print(f"after, cold cache        {timed(lambda: render_after(session, stats)):10.1f} ms")
+    print(f"after, warm cache        {timed(lambda: render_after(session, stats)):10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark HuggingFaceDatasetManager start-up time, eager vs lazy.
+
+A local directory laid out like a Hub dataset repo (data/<split>-*.parquet)
+stands in for the real repository, so the numbers reflect dataset size rather
+than network latency.
+
+Usage:
+    python benchmarks/bench_startup.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datasets import Dataset
+
+from huggingface_dataset import HuggingFaceDatasetManager
+
+PLATFORMS = ["linkedin", "twitter", "instagram"]
+
+
+def build_standin_repo(rows):
+    """Write a local dataset repo with `rows` rows per platform split"""
+    repo_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    os.makedirs(os.path.join(repo_dir, "data"))
+    for platform in PLATFORMS:
+        Dataset.from_dict({
+            "original_text": [f"Original post {i} for {platform}" for i in range(rows)],
+            "transformed_text": [f"Transformed post {i} for {platform} 🚀" for i in range(rows)],
+            "metadata": ["{}"] * rows,
+        }).to_parquet(os.path.join(repo_dir, "data", f"{platform}-00000-of-00001.parquet"))
+    return repo_dir
+
+
+def time_startup(repo_dir, lazy):
+    start = time.perf_counter()
+    manager = HuggingFaceDatasetManager(token="", repo_name=repo_dir, lazy=lazy)
+    elapsed = (time.perf_counter() - start) * 1000
+    return manager, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    repo_dir = build_standin_repo(args.rows)
+    print(f"Stand-in dataset: {repo_dir} ({args.rows} rows per split)")
+
+    _, eager_ms = time_startup(repo_dir, lazy=False)
+    manager, lazy_ms = time_startup(repo_dir, lazy=True)
+    start = time.perf_counter()
+    manager.dataset_dict
+    first_use_ms = (time.perf_counter() - start) * 1000
+
+    print(f"eager init        {eager_ms:10.2f} ms")
+    print(f"lazy init         {lazy_ms:10.2f} ms")
+    print(f"lazy first use    {first_use_ms:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Save and compare pytest-benchmark baselines for the regression suite.
+
+`save NAME` runs the suite in this directory and stores the results as
+baselines/NAME.json. `compare BASELINE [CANDIDATE]` compares two result
+files benchmark by benchmark (running the suite for the candidate when it
+is omitted), prints a table and exits with status 1 if any benchmark got
+slower than the baseline by more than --threshold, or 2 if a results file
+does not exist.
+
+Usage:
+    python benchmarks/perf/baseline.py save main
+    python benchmarks/perf/baseline.py compare main --threshold 0.15
+    python benchmarks/perf/baseline.py compare main branch.json --stat min
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PERF_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(PERF_DIR, "baselines")
+STATS = ("min", "median", "mean")
+
+
+def baseline_path(name):
+    """A baseline name or a path to a results file"""
+    if os.path.exists(name) or name.endswith(".json"):
+        return name
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def run_suite(output, sizes=None, pytest_args=()):
+    """Run the suite, writing pytest-benchmark JSON to output; returns pytest's exit code"""
+    command = [sys.executable, "-m", "pytest", PERF_DIR, "-q", f"--benchmark-json={output}"]
+    if sizes:
+        command.append(f"--perf-sizes={sizes}")
+    return subprocess.call(command + list(pytest_args))
+
+
+def load_results(path, stat="median"):
+    """Map each benchmark's full name to its `stat` in seconds"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {bench["fullname"]: bench["stats"][stat] for bench in data["benchmarks"]}
+
+
+def compare_results(baseline, candidate, threshold=0.15):
+    """Compare two {name: seconds} maps
+
+    Returns one row per benchmark in either map: (name, baseline, candidate,
+    change, status), where change is candidate / baseline - 1 and status is
+    "regression" when change exceeds threshold, "improved" when it is below
+    -threshold, "new" or "missing" when only one side has it, else "ok".
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(candidate)):
+        before, after = baseline.get(name), candidate.get(name)
+        if before is None or after is None:
+            rows.append((name, before, after, None, "new" if before is None else "missing"))
+            continue
+        change = after / before - 1 if before else 0.0
+        if change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append((name, before, after, change, status))
+    return rows
+
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    if value < 1e-3:
+        return f"{value * 1e6:.1f}us"
+    if value < 1:
+        return f"{value * 1e3:.2f}ms"
+    return f"{value:.3f}s"
+
+
+def print_comparison(rows, stat):
+    width = max([len(row[0]) for row in rows] + [len("benchmark")])
+    print(f"{'benchmark':<{width}}  {stat + ' before':>14}{stat + ' after':>14}{'change':>10}  status")
+    for name, before, after, change, status in rows:
+        change_text = "-" if change is None else f"{change:+.1%}"
+        print(f"{name:<{width}}  {format_seconds(before):>14}{format_seconds(after):>14}"
+              f"{change_text:>10}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    save = commands.add_parser("save", help="Run the suite and store the results as a baseline")
+    save.add_argument("name", help="Baseline name, stored as baselines/NAME.json")
+    save.add_argument("--sizes", help="Row counts to benchmark, e.g. 100,1000,10000")
+
+    compare = commands.add_parser("compare", help="Fail if a benchmark regressed against a baseline")
+    compare.add_argument("baseline", help="Baseline name or results file")
+    compare.add_argument("candidate", nargs="?",
+                         help="Results file to check (runs the suite when omitted)")
+    compare.add_argument("--threshold", type=float, default=0.15,
+                         help="Allowed slowdown as a fraction of the baseline (default 0.15)")
+    compare.add_argument("--stat", choices=STATS, default="median")
+    compare.add_argument("--sizes", help="Row counts to benchmark when running the suite")
+    args = parser.parse_args()
+
+    if args.command == "save":
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        output = baseline_path(args.name)
+        status = run_suite(output, args.sizes)
+        if status == 0:
+            print(f"Saved baseline {output}")
+        sys.exit(status)
+
+    baseline = baseline_path(args.baseline)
+    for path in (baseline, args.candidate):
+        # Fail before spending minutes on a run that cannot be compared
+        if path is not None and not os.path.exists(path):
+            print(f"No results file at {path}; save one with: "
+                  f"python {os.path.relpath(__file__)} save NAME", file=sys.stderr)
+            sys.exit(2)
+
+    temp_dir = None
+    candidate = args.candidate
+    if candidate is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix="perf_")
+        candidate = os.path.join(temp_dir.name, "candidate.json")
+        status = run_suite(candidate, args.sizes)
+        if status != 0:
+            sys.exit(status)
+    try:
+        rows = compare_results(load_results(baseline, args.stat),
+                               load_results(candidate, args.stat), args.threshold)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    print_comparison(rows, args.stat)
+    regressions = [row[0] for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Fixtures for the pytest-benchmark regression suite (see baseline.py).
+
+Every benchmark taking a `size` argument runs once per data size, set with
+--perf-sizes (default 100,1000,10000 rows).
+"""
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from datasets import Dataset, DatasetDict
+from sqlalchemy import insert
+
+from database import Example, Transformation, content_hash, create_session_factory
+from db_stats import DatabaseStats
+from example_selector import ExampleSelector
+from huggingface_dataset import HuggingFaceDatasetManager
+from langchain_pipeline import PostTransformer
+
+DEFAULT_SIZES = "100,1000,10000"
+DATASET_SPLITS = ("linkedin", "twitter", "instagram")
+
+
+def pytest_addoption(parser):
+    parser.addoption("--perf-sizes", default=DEFAULT_SIZES,
+                     help="Comma-separated row counts each sized benchmark runs at")
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("--perf-sizes").split(",")]
+        metafunc.parametrize("size", sizes)
+
+
+def post_text(i):
+    return (f"Post {i}: we shipped the new editor today. It saves drafts automatically, "
+            f"works offline and loads twice as fast. 🚀")
+
+
+def seed_database(engine, rows, platform="LinkedIn", chunk=5000):
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, chunk):
+            batch = range(offset, min(offset + chunk, rows))
+            conn.execute(insert(Example), [
+                {"id": str(uuid.uuid4()), "platform": platform, "content": post_text(i),
+                 "content_hash": content_hash(post_text(i)),
+                 "created_at": start + timedelta(seconds=i)} for i in batch])
+            conn.execute(insert(Transformation), [
+                {"id": str(uuid.uuid4()), "platform": platform, "original_text": post_text(i),
+                 "transformed_text": post_text(i).upper(), "meta": {},
+                 "content_hash": content_hash(post_text(i), post_text(i).upper()),
+                 "created_at": start + timedelta(seconds=i)} for i in batch])
+
+
+@pytest.fixture
+def db_url(tmp_path, size):
+    """A SQLite database file holding `size` examples and transformations"""
+    url = f"sqlite:///{tmp_path / 'perf.db'}"
+    session_factory = create_session_factory(url)
+    seed_database(session_factory.kw["bind"], size)
+    session_factory.kw["bind"].dispose()
+    return url
+
+
+def local_dataset_manager(rows=0):
+    manager = HuggingFaceDatasetManager(token="", repo_name="", lazy=True)
+    manager.dataset_dict = (platform_dataset(rows) if rows
+                            else HuggingFaceDatasetManager._empty_dataset_dict())
+    return manager
+
+
+@pytest.fixture
+def transformer(db_url):
+    """A PostTransformer on the seeded database with LinkedIn selected"""
+    session_factory = create_session_factory(db_url)
+    session = session_factory()
+    transformer = PostTransformer(db_session=session, hf_dataset_manager=local_dataset_manager(),
+                                  example_selector=ExampleSelector(), db_stats=DatabaseStats())
+    transformer.set_platform("LinkedIn")
+    yield transformer
+    session.close()
+    session_factory.kw["bind"].dispose()
+
+
+def platform_dataset(rows):
+    """A DatasetDict shaped like the Hub dataset, `rows` rows per platform"""
+    metadata = [f'{{"model": "gpt-4o-mini", "temperature": 0.7, '
+                f'"timestamp": "2025-01-01T00:00:{i % 60:02d}"}}' for i in range(rows)]
+    return DatasetDict({split: Dataset.from_dict({
+        "original_text": [post_text(i) for i in range(rows)],
+        "transformed_text": [post_text(i).upper() for i in range(rows)],
+        "metadata": metadata,
+    }) for split in DATASET_SPLITS})
+
+
+@pytest.fixture
+def dataset(size):
+    return platform_dataset(size)
+
+
+@pytest.fixture
+def dataset_dir(tmp_path, dataset):
+    """The dataset laid out as on the Hub, so load_dataset() can read it locally"""
+    os.makedirs(tmp_path / "data")
+    for split, rows in dataset.items():
+        rows.to_parquet(str(tmp_path / "data" / f"{split}-00000-of-00001.parquet"))
+    return str(tmp_path)
@@ -0,0 +1,40 @@
+import itertools
+
+from database import create_session_factory
+from conftest import post_text
+
+
+def test_init_db(benchmark, db_url):
+    """Startup against an existing database: engine, create_all, migrations, index checks"""
+    def start():
+        create_session_factory(db_url).kw["bind"].dispose()
+
+    benchmark.pedantic(start, rounds=5, warmup_rounds=1)
+
+
+def test_add_example(benchmark, transformer, size):
+    texts = (f"New example {i}" for i in itertools.count())
+    benchmark(lambda: transformer.add_example(next(texts)))
+
+
+def test_load_examples(benchmark, transformer, size):
+    examples = benchmark(transformer._load_examples, "LinkedIn")
+    assert len(examples) == size
+
+
+def test_save_transformation(benchmark, transformer, size):
+    counter = itertools.count(size)
+
+    def save():
+        i = next(counter)
+        assert transformer.save_transformation(post_text(i), post_text(i).upper())
+
+    benchmark(save)
+
+
+def test_count_examples(benchmark, transformer, size):
+    def count():
+        transformer.db_stats.invalidate()
+        return transformer.count_examples("LinkedIn")
+
+    assert benchmark(count) == size
@@ -0,0 +1,40 @@
+import itertools
+
+from conftest import local_dataset_manager, post_text
+from dataset_tools import load_and_analyze_dataset, prepare_for_fine_tuning
+
+
+def test_hf_add_transformation(benchmark, size):
+    manager = local_dataset_manager(size)
+    counter = itertools.count()
+
+    def add():
+        i = next(counter)
+        manager.add_transformation("LinkedIn", post_text(i), post_text(i).upper(), {"model": "gpt-4o-mini"})
+
+    benchmark(add)
+
+
+def test_hf_flush(benchmark, size):
+    """Merging 100 buffered rows into a split of `size` rows"""
+    manager = local_dataset_manager(size)
+    counter = itertools.count()
+
+    def buffer_rows():
+        for _ in range(100):
+            i = next(counter)
+            manager.add_transformation("LinkedIn", post_text(i), post_text(i).upper())
+
+    benchmark.pedantic(manager.flush, setup=buffer_rows, rounds=10)
+
+
+def test_load_and_analyze_dataset(benchmark, dataset_dir, size):
+    _, stats = benchmark.pedantic(load_and_analyze_dataset, args=(dataset_dir,), rounds=5,
+                                  warmup_rounds=1)
+    assert stats["linkedin"]["total_examples"] == size
+
+
+def test_prepare_for_fine_tuning(benchmark, dataset, tmp_path, size):
+    output = str(tmp_path / "fine_tuning_data.jsonl")
+    summary = benchmark(prepare_for_fine_tuning, dataset, output=output)
+    assert summary["examples"] == 3 * size
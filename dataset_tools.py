@@ -1,42 +1,442 @@
 from datasets import load_dataset
+import gzip
+import hashlib
+import io
 import json
+import os
+from contextlib import ExitStack
+from datetime import datetime, timezone
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pa_json
+from huggingface_dataset import LOAD_VERIFICATION_MODE
+
+TEXT_COLUMNS = ["original_text", "transformed_text"]
+PERCENTILES = [0.5, 0.9, 0.99]
+
+# Typed view of the JSON metadata column; unknown keys are ignored
+METADATA_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("model", pa.string()),
+    ("temperature", pa.float64()),
+    ("example_count", pa.int64()),
+    ("prompt_id", pa.string()),
+    ("platform", pa.string()),
+    ("timestamp", pa.timestamp("us")),
+    ("time_to_first_token", pa.float64()),
+])
+
+# Emoji and pictographs (RE2 syntax, evaluated inside Arrow)
+EMOJI_PATTERN = (r"[\x{1F000}-\x{1FAFF}\x{2600}-\x{27BF}\x{2B00}-\x{2BFF}"
+                 r"\x{1F1E6}-\x{1F1FF}]")
+
+
+def arrow_table(platform_data):
+    """The Arrow table behind a datasets.Dataset, without converting rows to Python"""
+    return platform_data.with_format("arrow")[:]
+
+
+def _coerce(value, arrow_type):
+    """value as the Python type for arrow_type, or None if it does not fit"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        if pa.types.is_string(arrow_type):
+            return value if isinstance(value, str) else None
+        if pa.types.is_floating(arrow_type):
+            return float(value)
+        if pa.types.is_integer(arrow_type):
+            number = float(value)
+            return int(number) if number.is_integer() else None
+        if pa.types.is_timestamp(arrow_type) and isinstance(value, str):
+            parsed = datetime.fromisoformat(value)
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return None
+
+
+def _parse_metadata_rows(column):
+    """Row-by-row fallback for parse_metadata
+
+    Values that do not match METADATA_SCHEMA (e.g. a temperature stored as
+    a string by an older writer) are coerced where possible and nulled
+    otherwise; unparseable rows become all nulls.
+    """
+    rows = []
+    for text in column.to_pylist():
+        try:
+            row = json.loads(text or "{}")
+        except ValueError:
+            row = {}
+        rows.append(row if isinstance(row, dict) else {})
+    return pa.table({field.name: pa.array([_coerce(row.get(field.name), field.type) for row in rows],
+                                          type=field.type)
+                     for field in METADATA_SCHEMA}, schema=METADATA_SCHEMA)
+
+
+def parse_metadata(column):
+    """Parse a column of JSON metadata strings into a typed Arrow table in one pass
+
+    Empty strings (the dummy rows that establish the schema) parse as nulls.
+    If any row does not fit METADATA_SCHEMA the column is parsed row by row
+    instead, so one bad row cannot fail the whole dataset.
+    """
+    column = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    column = column.cast(pa.string())
+    if len(column) == 0:
+        return METADATA_SCHEMA.empty_table()
+    column = pc.if_else(pc.equal(pc.fill_null(column, ""), ""), "{}", column)
+    # One newline-delimited JSON document, assembled in Arrow memory
+    lines = pc.binary_join_element_wise(column, "", "\n")
+    _, offsets_buffer, data_buffer = lines.buffers()
+    offsets = pa.Array.from_buffers(pa.int32(), len(lines) + 1, [None, offsets_buffer],
+                                    offset=lines.offset)
+    data = data_buffer[offsets[0].as_py():offsets[-1].as_py()]
+    try:
+        return pa_json.read_json(
+            pa.BufferReader(data),
+            parse_options=pa_json.ParseOptions(explicit_schema=METADATA_SCHEMA,
+                                               unexpected_field_behavior="ignore"))
+    except pa.ArrowInvalid:
+        return _parse_metadata_rows(column)
+
+
+def word_counts(values):
+    """Whitespace-separated words per string"""
+    trimmed = pc.utf8_trim_whitespace(values)
+    counts = pc.list_value_length(pc.utf8_split_whitespace(trimmed))
+    # Splitting "" still yields one (empty) word
+    return pc.if_else(pc.equal(trimmed, ""), 0, counts)
+
+
+def _distribution(values):
+    """Mean and percentiles of an integer array"""
+    if len(values) == 0:
+        return {"mean": 0.0, "total": 0, **{f"p{int(q * 100)}": 0.0 for q in PERCENTILES}}
+    quantiles = pc.quantile(values, q=PERCENTILES).to_pylist()
+    return {
+        "mean": pc.mean(values).as_py(),
+        "total": pc.sum(values).as_py(),
+        **{f"p{int(q * 100)}": value for q, value in zip(PERCENTILES, quantiles)},
+    }
+
+
+def compute_platform_stats(table):
+    """Length, word and emoji distributions plus parsed metadata summaries for one split
+
+    Everything runs as Arrow compute kernels over the column buffers.
+    """
+    stats = {"total_examples": table.num_rows}
+    for column in TEXT_COLUMNS:
+        # Columns of an empty split come back as Arrow nulls
+        values = table[column].cast(pa.string())
+        name = column.split("_")[0]
+        lengths = pc.utf8_length(values)
+        stats[f"{name}_length"] = _distribution(lengths)
+        stats[f"{name}_words"] = _distribution(word_counts(values))
+        stats[f"{name}_emoji"] = _distribution(pc.count_substring_regex(values, EMOJI_PATTERN))
+        stats[f"avg_{column.replace('_text', '')}_length"] = stats[f"{name}_length"]["mean"]
+
+    metadata = parse_metadata(table["metadata"])
+    models = pc.value_counts(pc.drop_null(metadata["model"])).to_pylist()
+    stats["models"] = {item["values"]: item["counts"] for item in models}
+    stats["avg_temperature"] = pc.mean(metadata["temperature"]).as_py()
+    stats["first_timestamp"] = pc.min(metadata["timestamp"]).as_py()
+    stats["last_timestamp"] = pc.max(metadata["timestamp"]).as_py()
+    return stats
+
 
 def load_and_analyze_dataset(repo_name):
     """Load and analyze the dataset from Hugging Face Hub"""
-    dataset = load_dataset(repo_name)
-    
-    stats = {}
-    for platform in dataset.keys():
-        platform_data = dataset[platform]
-        stats[platform] = {
-            "total_examples": len(platform_data),
-            "avg_original_length": sum(len(text) for text in platform_data["original_text"]) / len(platform_data) if len(platform_data) > 0 else 0,
-            "avg_transformed_length": sum(len(text) for text in platform_data["transformed_text"]) / len(platform_data) if len(platform_data) > 0 else 0
-        }
-    
+    dataset = load_dataset(repo_name, verification_mode=LOAD_VERIFICATION_MODE)
+    stats = {platform: compute_platform_stats(arrow_table(dataset[platform]))
+             for platform in dataset.keys()}
     return dataset, stats
 
-def prepare_for_fine_tuning(dataset, output_format="jsonl"):
-    """Prepare dataset for fine-tuning in various formats"""
-    fine_tuning_data = []
-    
-    for platform in dataset.keys():
-        platform_data = dataset[platform]
-        for i in range(len(platform_data)):
-            # Format depends on the model you'll be fine-tuning
-            example = {
-                "messages": [
-                    {"role": "system", "content": f"You are a content optimizer for {platform}"},
-                    {"role": "user", "content": platform_data["original_text"][i]},
-                    {"role": "assistant", "content": platform_data["transformed_text"][i]}
-                ]
-            }
-            fine_tuning_data.append(example)
-    
-    # Save in the specified format
-    if output_format == "jsonl":
-        with open("fine_tuning_data.jsonl", "w") as f:
-            for example in fine_tuning_data:
-                f.write(json.dumps(example) + "\n")
-    
-    return fine_tuning_data
+DEFAULT_EXPORT_PATH = "fine_tuning_data.jsonl"
+EXPORT_BATCH_SIZE = 10000
+DEFAULT_ENCODING = "cl100k_base"
+# Per-message framing tokens of a three-message chat example, plus the reply primer
+CHAT_OVERHEAD_TOKENS = 3 * 4 + 3
+
+
+def iter_record_batches(platform_data, batch_size=EXPORT_BATCH_SIZE):
+    """Arrow tables of at most batch_size rows (honours select/shuffle on the dataset)"""
+    return platform_data.with_format("arrow").iter(batch_size=batch_size)
+
+
+def _chat_line_parts(platform):
+    """Fixed parts of a chat example's JSON line, so each row only encodes its two texts"""
+    system = json.dumps(f"You are a content optimizer for {platform}")
+    return ('{"messages": [{"role": "system", "content": ' + system + '}, '
+            '{"role": "user", "content": ',
+            '}, {"role": "assistant", "content": ',
+            '}]}\n')
+
+
+def fine_tuning_lines(platform, originals, transformed):
+    """JSONL lines (chat format) for parallel lists of original and transformed posts"""
+    head, middle, tail = _chat_line_parts(platform)
+    return [f"{head}{json.dumps(original)}{middle}{json.dumps(post)}{tail}"
+            for original, post in zip(originals, transformed)]
+
+
+def load_token_counter(encoding_name=DEFAULT_ENCODING):
+    """Function mapping an Arrow string array to per-string token counts
+
+    Uses tiktoken's local BPE when it is installed, otherwise the same
+    four-characters-per-token estimate as the rest of the app.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return lambda texts: pc.add(pc.divide(pc.utf8_length(texts), 4), 1)
+    encoding = tiktoken.get_encoding(encoding_name)
+    return lambda texts: pa.array(
+        [len(tokens) for tokens in encoding.encode_ordinary_batch(texts.to_pylist())],
+        pa.int64())
+
+
+def _true_count(mask):
+    return pc.sum(mask).as_py() or 0
+
+
+class FineTuningFilter:
+    """Which rows of a dataset go into a fine-tuning export, and how they are split
+
+    Rows with an empty original or transformed text (including the dummy
+    rows that establish a split's schema) are always dropped. models, min/max_temperature and since/until (datetimes)
+    filter on the parsed metadata; rows missing a field that is filtered on
+    are dropped. max_tokens drops examples whose chat messages are longer.
+    val_fraction of the rows go to the validation split, picked by a hash of
+    their text keyed with seed, so a row lands in the same split on every
+    run. With dedupe=True repeats of an earlier row are dropped too. That
+    keeps a 64-bit hash per exported row of the platform being written, so
+    memory grows with the dataset (O(rows)) instead of staying bounded by the
+    batch size; rows saved through the app are already unique per platform,
+    so it is only needed for datasets written some other way.
+    """
+
+    def __init__(self, models=None, min_temperature=None, max_temperature=None, since=None,
+                 until=None, max_tokens=None, val_fraction=0.0, seed="", token_counter=None,
+                 dedupe=False):
+        if not 0.0 <= val_fraction < 1.0:
+            raise ValueError("val_fraction must be in [0, 1)")
+        self.models = list(models) if models is not None else None
+        self.min_temperature = min_temperature
+        self.max_temperature = max_temperature
+        self.since = since
+        self.until = until
+        self.max_tokens = max_tokens
+        self.val_fraction = val_fraction
+        self.seed = seed.encode("utf-8")[:64]
+        self.count_tokens = token_counter
+        self.dedupe = dedupe
+        if max_tokens is not None and token_counter is None:
+            self.count_tokens = load_token_counter()
+
+    def _metadata_conditions(self, batch):
+        conditions = []
+        if any(value is not None for value in (self.models, self.min_temperature,
+                                               self.max_temperature, self.since, self.until)):
+            metadata = parse_metadata(batch["metadata"])
+            if self.models is not None:
+                conditions.append(pc.is_in(metadata["model"], pa.array(self.models, pa.string())))
+            if self.min_temperature is not None:
+                conditions.append(pc.greater_equal(metadata["temperature"], self.min_temperature))
+            if self.max_temperature is not None:
+                conditions.append(pc.less_equal(metadata["temperature"], self.max_temperature))
+            if self.since is not None:
+                conditions.append(pc.greater_equal(metadata["timestamp"], pa.scalar(self.since, pa.timestamp("us"))))
+            if self.until is not None:
+                conditions.append(pc.less(metadata["timestamp"], pa.scalar(self.until, pa.timestamp("us"))))
+        return conditions
+
+    def _token_counts(self, platform, originals, transformed):
+        system = pa.array([f"You are a content optimizer for {platform}"])
+        overhead = CHAT_OVERHEAD_TOKENS + self.count_tokens(system)[0].as_py()
+        return pc.add(pc.add(self.count_tokens(originals), self.count_tokens(transformed)), overhead)
+
+    def apply(self, platform, batch, seen, skipped):
+        """(train, validation) rows kept from one record batch, each as (originals, transformed)
+
+        seen holds the hashes of the platform's rows kept so far and is
+        updated (None skips dedupe); the rows dropped are added, by reason,
+        to the skipped counts.
+        """
+        originals = batch["original_text"].cast(pa.string())
+        transformed = batch["transformed_text"].cast(pa.string())
+        keep = pc.fill_null(pc.and_(
+            pc.greater(pc.utf8_length(pc.utf8_trim_whitespace(originals)), 0),
+            pc.greater(pc.utf8_length(pc.utf8_trim_whitespace(transformed)), 0)), False)
+        skipped["empty"] += len(batch) - _true_count(keep)
+
+        for condition in self._metadata_conditions(batch):
+            narrowed = pc.and_(keep, pc.fill_null(condition, False))
+            skipped["filtered"] += _true_count(keep) - _true_count(narrowed)
+            keep = narrowed
+
+        originals = originals.filter(keep)
+        transformed = transformed.filter(keep)
+        if self.max_tokens is not None and len(originals):
+            fits = pc.less_equal(self._token_counts(platform, originals, transformed), self.max_tokens)
+            skipped["too_long"] += len(originals) - _true_count(fits)
+            originals = originals.filter(fits)
+            transformed = transformed.filter(fits)
+
+        train, validation = ([], []), ([], [])
+        threshold = self.val_fraction * 2 ** 64
+        for original, post in zip(originals.to_pylist(), transformed.to_pylist()):
+            # Python's string hash is only stable within a process, which is all dedupe needs
+            if seen is not None:
+                key = hash((original, post))
+                if key in seen:
+                    skipped["duplicates"] += 1
+                    continue
+                seen.add(key)
+            split = train
+            if threshold:
+                digest = hashlib.blake2b(f"{original}\x00{post}".encode("utf-8"),
+                                         digest_size=8, key=self.seed).digest()
+                if int.from_bytes(digest, "big") < threshold:
+                    split = validation
+            split[0].append(original)
+            split[1].append(post)
+        return train, validation
+
+
+class JsonlWriter:
+    """Writes lines to a path or file object, optionally gzip-compressed or split into shards
+
+    With shard_size, every shard_size lines start a new file named
+    <stem>-00000.jsonl, <stem>-00001.jsonl, ... next to path. Paths ending
+    in .gz are compressed even without compress=True.
+    """
+
+    def __init__(self, output, compress=False, shard_size=None):
+        self.to_path = isinstance(output, (str, os.PathLike))
+        if shard_size is not None and not self.to_path:
+            raise ValueError("Sharded exports need an output path, not a file object")
+        self.output = os.fspath(output) if self.to_path else output
+        self.compress = compress or (self.to_path and self.output.endswith(".gz"))
+        self.shard_size = shard_size
+        self.files = []
+        self.lines = 0
+        self.bytes = 0
+        self._handle = None
+        self._shard_lines = 0
+
+    def _shard_path(self, index):
+        stem = self.output[:-3] if self.output.endswith(".gz") else self.output
+        stem = stem[:-6] if stem.endswith(".jsonl") else stem
+        return f"{stem}-{index:05d}.jsonl" + (".gz" if self.compress else "")
+
+    def _open(self):
+        if not self.to_path:
+            if self.compress:
+                return gzip.GzipFile(fileobj=self.output, mode="wb")
+            return self.output
+        path = self.output if self.shard_size is None else self._shard_path(len(self.files))
+        self.files.append(path)
+        return gzip.open(path, "wb") if self.compress else open(path, "wb")
+
+    def _close(self):
+        # Caller-owned file objects stay open
+        if self._handle is not None and (self.to_path or self.compress):
+            self._handle.close()
+        self._handle = None
+
+    def write(self, lines):
+        while lines:
+            if self._handle is None:
+                self._handle = self._open()
+                self._shard_lines = 0
+            chunk = lines
+            if self.shard_size is not None:
+                chunk = lines[:self.shard_size - self._shard_lines]
+            text = "".join(chunk)
+            data = text.encode("utf-8")
+            self._handle.write(text if isinstance(self._handle, io.TextIOBase) else data)
+            self.lines += len(chunk)
+            self.bytes += len(data)
+            self._shard_lines += len(chunk)
+            lines = lines[len(chunk):]
+            if self.shard_size is not None and self._shard_lines >= self.shard_size:
+                self._close()
+
+    def close(self):
+        if self.to_path and not self.files:
+            # An empty export still leaves its (empty) file behind
+            self._handle = self._open()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def validation_path(path):
+    """Where the validation split of an export to path goes: data.jsonl -> data.val.jsonl"""
+    stem, suffix = path, ""
+    for extension in (".gz", ".jsonl"):
+        if stem.endswith(extension):
+            stem, suffix = stem[:-len(extension)], extension + suffix
+    return f"{stem}.val{suffix or '.jsonl'}"
+
+
+def export_fine_tuning_data(dataset, output=DEFAULT_EXPORT_PATH, compress=False, shard_size=None,
+                            batch_size=EXPORT_BATCH_SIZE, filters=None, val_output=None):
+    """Stream every split of dataset to chat-format JSONL, one record batch at a time
+
+    output is a path or a (text or binary) file object. Only batch_size rows
+    are held in memory at once (plus a hash per row of the current platform
+    when filters.dedupe is set). filters, a FineTuningFilter, selects and splits rows in
+    the same pass; the validation split goes to val_output (by default
+    validation_path(output)). Returns summary counts: examples written,
+    per-platform and validation examples, rows skipped by reason, bytes
+    written (uncompressed) and the files created.
+    """
+    filters = filters or FineTuningFilter()
+    summary = {"examples": 0, "platforms": {}, "validation_examples": 0, "bytes": 0, "files": [],
+               "skipped": {"empty": 0, "filtered": 0, "duplicates": 0, "too_long": 0}}
+    if filters.val_fraction and val_output is None:
+        if not isinstance(output, (str, os.PathLike)):
+            raise ValueError("Pass val_output when exporting a validation split to a file object")
+        val_output = validation_path(os.fspath(output))
+
+    with ExitStack() as stack:
+        writer = stack.enter_context(JsonlWriter(output, compress=compress, shard_size=shard_size))
+        val_writer = None
+        if filters.val_fraction:
+            val_writer = stack.enter_context(
+                JsonlWriter(val_output, compress=compress, shard_size=shard_size))
+        for platform in dataset.keys():
+            written = writer.lines + (val_writer.lines if val_writer else 0)
+            seen = set() if filters.dedupe else None
+            for batch in iter_record_batches(dataset[platform], batch_size):
+                train, validation = filters.apply(platform, batch, seen, summary["skipped"])
+                writer.write(fine_tuning_lines(platform, *train))
+                if val_writer is not None:
+                    val_writer.write(fine_tuning_lines(platform, *validation))
+            summary["platforms"][platform] = (
+                writer.lines + (val_writer.lines if val_writer else 0) - written)
+
+    for part in (writer, val_writer):
+        if part is not None:
+            summary["examples"] += part.lines
+            summary["bytes"] += part.bytes
+            summary["files"] += part.files
+    summary["validation_examples"] = val_writer.lines if val_writer else 0
+    return summary
+
+
+def prepare_for_fine_tuning(dataset, output_format="jsonl", output=DEFAULT_EXPORT_PATH, filters=None):
+    """Prepare dataset for fine-tuning in various formats; returns summary counts"""
+    if output_format != "jsonl":
+        raise ValueError(f"Unsupported fine-tuning format: {output_format}")
+    return export_fine_tuning_data(dataset, output, filters=filters)
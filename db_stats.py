@@ -0,0 +1,78 @@
+"""Cheap statistics over the tables in database.py for the sidebar.
+
+Counts come from COUNT(*) and previews select only a prefix of the content
+column, so no ORM objects or full post bodies are loaded. Results are cached
+per table (and platform) and dropped whenever PostTransformer writes to that table; a short
+TTL covers writes made by other processes (e.g. the bulk CLI tools).
+"""
+import threading
+import time
+
+from sqlalchemy import func, select
+
+PREVIEW_CHARS = 200
+
+
+class DatabaseStats:
+    def __init__(self, ttl_seconds=30.0):
+        self.ttl_seconds = ttl_seconds
+        self._cache = {}
+        self._lock = threading.Lock()
+        # Bumped by invalidate(): per table, and for everything at once
+        self._generations = {}
+        self._generation = 0
+
+    def _generation_of(self, table):
+        return self._generation, self._generations.get(table, 0)
+
+    def _cached(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry[1] < self.ttl_seconds:
+                return entry[0]
+            generation = self._generation_of(key[0])
+        value = compute()
+        with self._lock:
+            # A write invalidated the table while compute ran; the value may be stale
+            if self._generation_of(key[0]) == generation:
+                self._cache[key] = (value, now)
+        return value
+
+    @staticmethod
+    def _filtered(query, model, platform):
+        if platform is not None:
+            query = query.where(model.platform == platform)
+        return query
+
+    def count(self, session, model, platform=None):
+        """Number of rows in model's table, optionally for one platform"""
+        query = self._filtered(select(func.count()).select_from(model), model, platform)
+        return self._cached(
+            (model.__tablename__, platform, "count"),
+            lambda: session.execute(query).scalar_one())
+
+    def recent_previews(self, session, model, platform=None, limit=5, column="content",
+                        chars=PREVIEW_CHARS):
+        """The first `chars` characters of the `limit` most recent rows"""
+        def compute():
+            text_column = getattr(model, column)
+            query = self._filtered(select(func.substr(text_column, 1, chars)), model, platform)
+            rows = session.execute(
+                query.order_by(model.created_at.desc()).limit(limit))
+            return [preview for (preview,) in rows]
+
+        return self._cached(
+            (model.__tablename__, platform, "recent", column, limit, chars), compute)
+
+    def invalidate(self, model=None):
+        """Drop cached values for one model's table, or for every table"""
+        with self._lock:
+            if model is None:
+                self._generation += 1
+                self._cache.clear()
+                return
+            table = model.__tablename__
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for key in [key for key in self._cache if key[0] == table]:
+                del self._cache[key]
@@ -0,0 +1,76 @@
+"""One-off deduplication of stored examples and transformations.
+
+Hashes any rows stored without a content_hash, keeps the oldest row of each
+(platform, content_hash) and deletes the rest. The app does this on its own
+the first time it opens an older database; run this to see what was removed
+and, with --vacuum, to give the freed pages back to the filesystem.
+
+Usage:
+    python dedupe.py --vacuum
+"""
+import argparse
+import os
+
+from sqlalchemy import text
+
+from database import (HASHED_COLUMNS, Base, create_db_engine, dedupe_table,
+                      migrate_legacy_tables, upgrade_schema)
+from search_index import ensure_search_index, rebuild_search_index
+
+
+def database_file_size(engine):
+    """Size in bytes of a SQLite database file, after checkpointing its WAL"""
+    if engine.dialect.name != "sqlite" or not engine.url.database:
+        return None
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    return os.path.getsize(engine.url.database)
+
+
+def vacuum(engine):
+    """Rewrite the database file without its free pages"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+    # VACUUM may renumber rowids, which the full-text index points at
+    rebuild_search_index(engine)
+
+
+def dedupe(engine):
+    """Remove duplicates from both tables; returns per-table rows and bytes removed"""
+    Base.metadata.create_all(engine)
+    ensure_search_index(engine)
+    migrate_legacy_tables(engine)
+    report = upgrade_schema(engine, check_hashes=True)
+    with engine.begin() as conn:
+        for model in HASHED_COLUMNS:
+            rows, size = dedupe_table(conn, model)
+            counts = report[model.__tablename__]
+            counts["removed"] += rows
+            counts["bytes_reclaimed"] += size
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove duplicate examples and transformations")
+    parser.add_argument("--db-url", help="Database URL (defaults to DATABASE_URL or the local SQLite file)")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="VACUUM a SQLite database afterwards to shrink the file")
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.db_url)
+    size_before = database_file_size(engine)
+    report = dedupe(engine)
+    for table, counts in report.items():
+        print(f"{table}: hashed {counts['hashed']} rows, removed {counts['removed']} "
+              f"duplicates ({counts['bytes_reclaimed']} bytes of text)")
+
+    if args.vacuum and engine.dialect.name == "sqlite":
+        vacuum(engine)
+        size_after = database_file_size(engine)
+        if size_before is not None:
+            print(f"Database file: {size_before} -> {size_after} bytes "
+                  f"({size_before - size_after} reclaimed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Few-shot example selection over the stored training examples.
+
+Each platform gets an incremental TF-IDF inverted index. Selection only walks
+the posting lists of the query's most informative terms, and each list is
+capped, so picking examples costs about the same whether a platform has a
+hundred stored examples or a hundred thousand.
+"""
+import hashlib
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9']+")
+DEFAULT_K = 3
+DEFAULT_TOKEN_BUDGET = 600
+DEFAULT_REFRESH_SECONDS = 30.0
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+class ExampleIndex:
+    """Incremental TF-IDF index of one platform's examples"""
+
+    def __init__(self, max_query_terms=12, max_postings_per_term=256):
+        self.max_query_terms = max_query_terms
+        self.max_postings_per_term = max_postings_per_term
+        self.texts = []
+        self._term_weights = []
+        self._postings = defaultdict(list)
+        self._hashes = set()
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, text):
+        """Index one example; returns False for an exact duplicate"""
+        digest = hashlib.sha1(text.encode("utf-8")).digest()
+        if digest in self._hashes:
+            return False
+        self._hashes.add(digest)
+
+        doc_id = len(self.texts)
+        counts = Counter(tokenize(text))
+        # Sublinear tf, length-normalised so long examples don't dominate
+        weights = {term: 1 + math.log(count) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        self.texts.append(text)
+        self._term_weights.append({term: weight / norm for term, weight in weights.items()})
+        for term in weights:
+            self._postings[term].append(doc_id)
+        return True
+
+    def _idf(self, term):
+        return math.log((1 + len(self.texts)) / (1 + len(self._postings[term]))) + 1
+
+    def select(self, query, k=DEFAULT_K, token_budget=DEFAULT_TOKEN_BUDGET):
+        """Return up to k examples most similar to query that fit in token_budget"""
+        if not self.texts or k <= 0:
+            return []
+
+        query_terms = [term for term in set(tokenize(query)) if term in self._postings]
+        # Rarest terms carry the most signal; only score with the top few
+        query_terms.sort(key=lambda term: len(self._postings[term]))
+        query_terms = query_terms[:self.max_query_terms]
+
+        scores = defaultdict(float)
+        for term in query_terms:
+            idf = self._idf(term)
+            # Only the newest postings are scored; older ones past the cap are skipped
+            for doc_id in self._postings[term][-self.max_postings_per_term:]:
+                scores[doc_id] += idf * idf * self._term_weights[doc_id][term]
+
+        # A few spare candidates in case the best ones blow the token budget
+        ranked = heapq.nlargest(max(4 * k, 20), scores.items(),
+                                key=lambda item: (item[1], item[0]))
+        selected = []
+        used_tokens = 0
+        for doc_id, _ in ranked:
+            cost = estimate_tokens(self.texts[doc_id])
+            if used_tokens + cost > token_budget:
+                continue
+            selected.append(self.texts[doc_id])
+            used_tokens += cost
+            if len(selected) == k:
+                break
+        return selected
+
+
+class ExampleSelector:
+    """Thread-safe per-platform example indexes, loaded once and updated in place
+
+    Examples written by other processes (import_examples, dedupe) are picked
+    up by passing a version_fn to ensure_loaded: at most every
+    refresh_seconds it is compared with the version the index was built
+    from, and the index is rebuilt when they differ.
+    """
+
+    def __init__(self, k=DEFAULT_K, token_budget=DEFAULT_TOKEN_BUDGET,
+                 refresh_seconds=DEFAULT_REFRESH_SECONDS):
+        self.k = k
+        self.token_budget = token_budget
+        self.refresh_seconds = refresh_seconds
+        self._indexes = {}
+        # platform -> (version the index matches, monotonic time it was checked)
+        self._versions = {}
+        self._lock = threading.RLock()
+
+    def is_loaded(self, platform):
+        return platform in self._indexes
+
+    def ensure_loaded(self, platform, load_fn, version_fn=None):
+        """Build the platform's index from load_fn() (an iterable of texts) on first use
+
+        With version_fn, an index whose version is more than refresh_seconds
+        old is checked against version_fn() and rebuilt if the stored
+        examples changed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            index = self._indexes.get(platform)
+            version = None
+            if index is not None:
+                if version_fn is None:
+                    return index
+                known_version, checked_at = self._versions.get(platform, (None, now))
+                if now - checked_at < self.refresh_seconds:
+                    return index
+                version = version_fn()
+                if version == known_version:
+                    self._versions[platform] = (version, now)
+                    return index
+            elif version_fn is not None:
+                version = version_fn()
+            index = ExampleIndex()
+            for text in load_fn():
+                index.add(text)
+            self._indexes[platform] = index
+            self._versions[platform] = (version, now)
+            return index
+
+    def add(self, platform, text, version=None):
+        """Add a new example to an already loaded index
+
+        version is the store's version including the new example, so the
+        next refresh check does not rebuild the index for it.
+        """
+        with self._lock:
+            index = self._indexes.get(platform)
+            if index is not None:
+                index.add(text)
+                if version is not None:
+                    self._versions[platform] = (version, time.monotonic())
+
+    def invalidate(self, platform=None):
+        """Drop one platform's index (or all of them); it is rebuilt on next use"""
+        with self._lock:
+            if platform is None:
+                self._indexes.clear()
+                self._versions.clear()
+            else:
+                self._indexes.pop(platform, None)
+                self._versions.pop(platform, None)
+
+    def examples(self, platform):
+        with self._lock:
+            index = self._indexes.get(platform)
+            return list(index.texts) if index is not None else []
+
+    def count(self, platform):
+        with self._lock:
+            index = self._indexes.get(platform)
+            return len(index) if index is not None else 0
+
+    def select(self, platform, query, k=None, token_budget=None):
+        with self._lock:
+            index = self._indexes.get(platform)
+            if index is None:
+                return []
+            return index.select(query,
+                                k=self.k if k is None else k,
+                                token_budget=self.token_budget if token_budget is None else token_budget)
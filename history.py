@@ -0,0 +1,87 @@
+"""Keyset-paginated transformation history.
+
+Pages are ordered newest first on (created_at, id) and continue from the
+last row of the previous page instead of using OFFSET, so page N costs the
+same as page 1 no matter how many rows a platform has. Searches on SQLite
+go through the full-text index (see search_index.py), so they only sort the
+matching rows instead of scanning the table. Rows only carry a prefix of the
+two text columns; the full texts of one row are loaded on demand with
+get_transformation.
+"""
+from sqlalchemy import and_, func, literal_column, or_, select
+
+import search_index
+from database import Transformation
+
+DEFAULT_PAGE_SIZE = 10
+PREVIEW_CHARS = 500
+
+
+def _like_pattern(search):
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def history_page(session, platform, cursor=None, limit=DEFAULT_PAGE_SIZE, search=None,
+                 preview_chars=PREVIEW_CHARS):
+    """Return one page of a platform's transformations, newest first
+
+    cursor is the next_cursor of the previous page (None for the first page).
+    search keeps rows where either text column has every word of it (as a
+    word prefix) on SQLite, or contains it as a substring elsewhere.
+    Returns {"rows": [...], "next_cursor": cursor or None}; each row has id,
+    created_at, original_preview, transformed_preview and truncated.
+    """
+    query = select(
+        Transformation.id,
+        Transformation.created_at,
+        func.substr(Transformation.original_text, 1, preview_chars),
+        func.substr(Transformation.transformed_text, 1, preview_chars),
+        (func.length(Transformation.original_text) > preview_chars) |
+        (func.length(Transformation.transformed_text) > preview_chars),
+    )
+
+    match = search_index.to_match_query(search, prefix=True) if search else ""
+    if match and search_index.is_supported(session.get_bind()):
+        # Start from the index's matches and sort only those; the unary +
+        # stops SQLite from walking the platform's rows in the
+        # (platform, created_at, id) index and probing each one instead
+        query = query.where(
+            literal_column("+transformations.platform") == platform,
+            literal_column("transformations.rowid").in_(
+                search_index.matching_rowids("transformations", match)))
+    else:
+        query = query.where(Transformation.platform == platform)
+        if search:
+            pattern = _like_pattern(search)
+            query = query.where(or_(Transformation.original_text.ilike(pattern, escape="\\"),
+                                    Transformation.transformed_text.ilike(pattern, escape="\\")))
+
+    if cursor is not None:
+        created_at, last_id = cursor
+        # Written so the created_at bound can use the (platform, created_at, id) index
+        query = query.where(and_(
+            Transformation.created_at <= created_at,
+            or_(Transformation.created_at < created_at, Transformation.id < last_id)))
+
+    # One extra row tells us whether there is another page
+    query = query.order_by(Transformation.created_at.desc(),
+                           Transformation.id.desc()).limit(limit + 1)
+    rows = [{
+        "id": row_id,
+        "created_at": created_at,
+        "original_preview": original,
+        "transformed_preview": transformed,
+        "truncated": bool(truncated),
+    } for row_id, created_at, original, transformed, truncated in session.execute(query)]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return {"rows": rows, "next_cursor": next_cursor}
+
+
+def get_transformation(session, transformation_id):
+    """Load one transformation with its full texts and metadata"""
+    return session.get(Transformation, transformation_id)
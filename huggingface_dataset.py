@@ -1,54 +1,185 @@
-from datasets import Dataset, DatasetDict
-from huggingface_hub import HfApi, login
+from datasets import Dataset, DatasetDict, concatenate_datasets
+from datasets.table import InMemoryTable
+from huggingface_hub import CommitOperationAdd, HfApi, login
+from huggingface_hub.utils import RepositoryNotFoundError
+import io
 import os
+import re
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
 import json
+import threading
+
+from tracing import tracer
+
+COLUMNS = ["original_text", "transformed_text", "metadata"]
+ARROW_SCHEMA = pa.schema([(column, pa.string()) for column in COLUMNS])
+DEFAULT_BATCH_SIZE = 1024
+DEFAULT_SYNC_STATE_PATH = ".hf_sync_state.json"
+# Incremental shards are not counted in the split sizes a full push writes
+# to the dataset card, so those sizes must not be verified on load
+LOAD_VERIFICATION_MODE = "no_checks"
+INCREMENTAL_SHARD_PATTERN = re.compile(r"^data/(?P<split>[^/]+)-00000-of-00001-incr-(?P<number>\d+)\.parquet$")
+
+
+class AppendBuffer:
+    """Append-only columnar buffer for one platform split
+
+    Rows accumulate in plain column lists and are sealed into Arrow record
+    batches every `batch_size` rows, so appends are amortized O(1) and the
+    existing dataset is never copied until the buffer is drained.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._batches = []
+        self._columns = {column: [] for column in COLUMNS}
+        self._sealed_rows = 0
+
+    def __len__(self):
+        return self._sealed_rows + len(self._columns["original_text"])
+
+    def append(self, original_text, transformed_text, metadata_str):
+        self._columns["original_text"].append(original_text)
+        self._columns["transformed_text"].append(transformed_text)
+        self._columns["metadata"].append(metadata_str)
+        if len(self._columns["original_text"]) >= self.batch_size:
+            self._seal()
+
+    def _seal(self):
+        """Turn the open column lists into an Arrow record batch"""
+        rows = len(self._columns["original_text"])
+        if not rows:
+            return
+        self._batches.append(
+            pa.RecordBatch.from_pydict(self._columns, schema=ARROW_SCHEMA))
+        self._sealed_rows += rows
+        self._columns = {column: [] for column in COLUMNS}
+
+    def drain(self):
+        """Return every buffered row as one Arrow table and empty the buffer"""
+        self._seal()
+        table = pa.Table.from_batches(self._batches, schema=ARROW_SCHEMA)
+        self._batches = []
+        self._sealed_rows = 0
+        return table
+
 
 class HuggingFaceDatasetManager:
-    def __init__(self, token=None, repo_name=None):
+    def __init__(self, token=None, repo_name=None, lazy=False,
+                 batch_size=DEFAULT_BATCH_SIZE, incremental=False,
+                 sync_state_path=None, api=None):
+        """Set up the manager
+
+        With lazy=True nothing touches the Hub (no login, no load_dataset)
+        until the dataset is first needed by add_transformation or push_to_hub.
+        With incremental=True push_to_hub only uploads rows added since the
+        last successful push, tracked in a local sync state file.
+        """
         self.token = token or os.getenv("HUGGINGFACE_TOKEN")
         self.repo_name = repo_name or os.getenv("DATASET_REPO_NAME")
-        self.api = HfApi()
+        self.api = api or HfApi()
+        self.lazy = lazy
+        self.incremental = incremental
+        self.sync_state_path = sync_state_path or os.getenv("HF_SYNC_STATE_PATH", DEFAULT_SYNC_STATE_PATH)
+        self._repo_created = False
+        self._logged_in = False
+        self._dataset_dict = None
+        # Rows per split as loaded from the Hub, i.e. already pushed
+        self._loaded_rows = {}
+        self._load_lock = threading.Lock()
+        # Per-platform append buffers, merged into the datasets on flush
+        self.batch_size = batch_size
+        self._buffers = {}
+        self._buffer_lock = threading.RLock()
         
-        if self.token:
+        if not lazy:
+            # Create/load dataset structure
+            self._ensure_loaded()
+
+    @property
+    def dataset_dict(self):
+        """The platform DatasetDict, loaded on first access, with buffered rows merged in"""
+        self.flush()
+        return self._dataset_dict
+
+    @dataset_dict.setter
+    def dataset_dict(self, value):
+        self._dataset_dict = value
+
+    @property
+    def is_loaded(self):
+        return self._dataset_dict is not None
+
+    def _login(self):
+        """Log in to the Hub once per manager"""
+        if self.token and not self._logged_in:
             login(token=self.token)
-            
-        # Create/load dataset structure
-        self.dataset_dict = self._init_dataset()
+            self._logged_in = True
+
+    def _ensure_loaded(self):
+        """Log in and load the dataset if that has not happened yet"""
+        if self._dataset_dict is None:
+            with self._load_lock:
+                if self._dataset_dict is None:
+                    with tracer.span("hf_load", repo=self.repo_name):
+                        self._login()
+                        dataset_dict = self._init_dataset()
+                        self._loaded_rows = {split: len(dataset_dict[split]) for split in dataset_dict}
+                        self._dataset_dict = dataset_dict
+        return self._dataset_dict
     
+    @staticmethod
+    def _empty_dataset_dict():
+        """Build an empty DatasetDict with one split per platform"""
+        # Ensure all datasets have the same feature structure with non-null values
+        empty_dataset = {
+            "original_text": [], 
+            "transformed_text": [], 
+            "metadata": []
+        }
+        
+        return DatasetDict({
+            "linkedin": Dataset.from_dict(empty_dataset),
+            "twitter": Dataset.from_dict(empty_dataset),
+            "instagram": Dataset.from_dict(empty_dataset)
+        })
+
     def _init_dataset(self):
-        """Initialize or load existing dataset"""
+        """Load the existing dataset, or start an empty one if the repo has none
+
+        Only a missing repo (or one without data files) falls back to an
+        empty dataset; other errors propagate, as starting empty would hide
+        rows that are already on the Hub.
+        """
+        if not self.repo_name:
+            return self._empty_dataset_dict()
+        from datasets import load_dataset
         try:
-            # Try to load existing dataset
-            from datasets import load_dataset
-            dataset_dict = load_dataset(self.repo_name)
-            return dataset_dict
-        except Exception:
-            # Create new dataset structure if not exists
-            # Ensure all datasets have the same feature structure with non-null values
-            empty_dataset = {
-                "original_text": [], 
-                "transformed_text": [], 
-                "metadata": []
-            }
-            
-            return DatasetDict({
-                "linkedin": Dataset.from_dict(empty_dataset),
-                "twitter": Dataset.from_dict(empty_dataset),
-                "instagram": Dataset.from_dict(empty_dataset)
-            })
+            return load_dataset(self.repo_name, verification_mode=LOAD_VERIFICATION_MODE)
+        except FileNotFoundError:
+            # DatasetNotFoundError and EmptyDatasetError are FileNotFoundErrors
+            return self._empty_dataset_dict()
+
+    @property
+    def pending_rows(self):
+        """Number of appended rows not yet merged into dataset_dict"""
+        return sum(len(buffer) for buffer in self._buffers.values())
     
     def add_transformation(self, platform, original_text, transformed_text, metadata=None):
-        """Add a transformation to the dataset"""
+        """Add a transformation to the dataset
+
+        Rows go into a per-platform append buffer, so this is amortized O(1).
+        They are merged into the Arrow-backed datasets on flush() or push.
+        """
         platform = platform.lower()
-        if platform not in self.dataset_dict:
+        if platform not in self._ensure_loaded():
             raise ValueError(f"Unknown platform: {platform}")
             
-        # Prepare metadata
-        if metadata is None:
-            metadata = {}
-            
+        # Prepare metadata (a copy: the caller's dict may be stored elsewhere)
+        metadata = dict(metadata or {})
         metadata.update({
             "timestamp": datetime.now().isoformat(),
             "platform": platform,
@@ -57,49 +188,183 @@ class HuggingFaceDatasetManager:
         # Convert metadata to string for storage
         metadata_str = json.dumps(metadata)
         
-        # Get existing data
-        current_dataset = self.dataset_dict[platform]
-        
-        # Create new dataset with the added example
-        new_dataset = Dataset.from_dict({
-            "original_text": current_dataset["original_text"] + [original_text],
-            "transformed_text": current_dataset["transformed_text"] + [transformed_text],
-            "metadata": current_dataset["metadata"] + [metadata_str]
-        })
-        
-        # Update the dataset
-        self.dataset_dict[platform] = new_dataset
-        
-        # Ensure all platforms have the same feature structure
-        # This is important when one platform has data but others don't
-        for other_platform in self.dataset_dict:
-            if other_platform != platform and len(self.dataset_dict[other_platform]) == 0:
-                # Initialize empty platform datasets with at least one dummy row to establish types
-                self.dataset_dict[other_platform] = Dataset.from_dict({
-                    "original_text": [""],  # Empty string instead of null
-                    "transformed_text": [""],
-                    "metadata": ["{}"]
-                })
+        with self._buffer_lock:
+            buffer = self._buffers.get(platform)
+            if buffer is None:
+                buffer = self._buffers[platform] = AppendBuffer(self.batch_size)
+            buffer.append(original_text, transformed_text, metadata_str)
+
+    def flush(self):
+        """Merge buffered rows into dataset_dict and return the number merged"""
+        dataset_dict = self._ensure_loaded()
+        with self._buffer_lock:
+            if not self.pending_rows:
+                return 0
+            with tracer.span("hf_flush", rows=self.pending_rows):
+                merged = 0
+                for platform, buffer in self._buffers.items():
+                    if not len(buffer):
+                        continue
+                    merged += len(buffer)
+                    new_rows = Dataset(InMemoryTable(buffer.drain()))
+                    current_dataset = dataset_dict[platform]
+                    if len(current_dataset):
+                        new_rows = concatenate_datasets([current_dataset, new_rows])
+                    dataset_dict[platform] = new_rows
+
+                # Ensure all platforms have the same feature structure
+                # This is important when one platform has data but others don't
+                for platform in dataset_dict:
+                    if len(dataset_dict[platform]) == 0:
+                        # Initialize empty platform datasets with at least one dummy row to establish types
+                        dataset_dict[platform] = Dataset.from_dict({
+                            "original_text": [""],  # Empty string instead of null
+                            "transformed_text": [""],
+                            "metadata": ["{}"]
+                        })
+            return merged
         
-    def push_to_hub(self):
-        """Push the dataset to Hugging Face Hub"""
+    def _check_push_config(self):
         if not self.token:
             raise ValueError("Hugging Face token is required to push to hub. Set HUGGINGFACE_TOKEN in your environment.")
         
         if not self.repo_name:
             raise ValueError("Repository name is required to push to hub. Set DATASET_REPO_NAME in your environment.")
+
+    def _snapshot(self):
+        """Flush buffered rows and return a stable copy of the split mapping"""
+        with self._buffer_lock:
+            return DatasetDict(dict(self.dataset_dict))
+
+    def _load_sync_state(self):
+        """Return {split: pushed row count} for this repo from the state file"""
+        try:
+            with open(self.sync_state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+        return state.get(self.repo_name, {})
+
+    def _save_sync_state(self, splits):
+        """Record the high-water mark per split; written atomically"""
+        try:
+            with open(self.sync_state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            state = {}
+        state[self.repo_name] = splits
+        tmp_path = f"{self.sync_state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.sync_state_path)
+        
+    def _incremental_shard_numbers(self):
+        """{split: highest incremental shard number} among the repo's files"""
+        try:
+            files = self.api.list_repo_files(self.repo_name, repo_type="dataset", token=self.token)
+        except RepositoryNotFoundError:
+            return {}
+        numbers = {}
+        for path in files:
+            match = INCREMENTAL_SHARD_PATTERN.match(path)
+            if match:
+                split = match.group("split")
+                numbers[split] = max(numbers.get(split, 0), int(match.group("number")))
+        return numbers
+
+    def push_to_hub(self):
+        """Push the dataset to Hugging Face Hub"""
+        if self.incremental:
+            return self.push_incremental()
+
+        self._check_push_config()
         
         # Ensure we're logged in
-        login(token=self.token)
+        self._login()
         
         try:
-            # Push the dataset to the hub
-            self.dataset_dict.push_to_hub(
-                self.repo_name,
-                private=False,
-                token=self.token
-            )
+            # Push the dataset to the hub (the snapshot flushes pending rows)
+            snapshot = self._snapshot()
+            with tracer.span("hf_push", mode="full",
+                             rows=sum(len(snapshot[split]) for split in snapshot)):
+                snapshot.push_to_hub(
+                    self.repo_name,
+                    private=False,
+                    token=self.token
+                )
+            # A full push replaces every shard, so the high-water mark is the full size
+            self._save_sync_state({
+                split: {"rows": len(snapshot[split]), "shards": 0}
+                for split in snapshot
+            })
             return True
         except Exception as e:
             print(f"Error pushing to Hugging Face Hub: {str(e)}")
             raise
+
+    def push_incremental(self):
+        """Upload only rows added since the last successful push
+
+        New rows of each split are written as one Parquet shard named
+        data/<split>-00000-of-00001-incr-<n>.parquet, which load_dataset picks
+        up alongside the existing shards. All shards go in a single commit and
+        the local high-water mark only moves once that commit succeeds.
+        Without a sync state file (e.g. on a new host) the rows loaded from the
+        Hub count as pushed, and shard numbers always continue after the
+        highest one in the repo, so nothing is uploaded or overwritten twice.
+        Returns {split: rows uploaded}.
+        """
+        self._check_push_config()
+        self._login()
+
+        snapshot = self._snapshot()
+        state = self._load_sync_state()
+        new_state = dict(state)
+        operations = []
+        uploaded = {}
+        shard_numbers = None
+        for split in snapshot:
+            split_state = state.get(split, {"rows": self._loaded_rows.get(split, 0), "shards": 0})
+            pushed_rows = split_state["rows"]
+            total_rows = len(snapshot[split])
+            if total_rows < pushed_rows:
+                raise ValueError(
+                    f"The {split} split has {total_rows} rows but {pushed_rows} were already "
+                    f"pushed to {self.repo_name}; the local dataset does not match the Hub")
+            if total_rows == pushed_rows:
+                continue
+
+            new_rows = snapshot[split].with_format("arrow")[pushed_rows:total_rows]
+            if shard_numbers is None:
+                shard_numbers = self._incremental_shard_numbers()
+            shard_number = max(split_state["shards"], shard_numbers.get(split, 0)) + 1
+            buffer = io.BytesIO()
+            pq.write_table(new_rows, buffer)
+            operations.append(CommitOperationAdd(
+                path_in_repo=f"data/{split}-00000-of-00001-incr-{shard_number:06d}.parquet",
+                path_or_fileobj=buffer.getvalue()))
+            new_state[split] = {"rows": total_rows, "shards": shard_number}
+            uploaded[split] = total_rows - pushed_rows
+
+        if not operations:
+            return uploaded
+
+        try:
+            with tracer.span("hf_push", mode="incremental", rows=sum(uploaded.values()),
+                             files=len(operations)):
+                if not self._repo_created:
+                    self.api.create_repo(self.repo_name, repo_type="dataset",
+                                         private=False, exist_ok=True, token=self.token)
+                    self._repo_created = True
+                self.api.create_commit(
+                    repo_id=self.repo_name,
+                    repo_type="dataset",
+                    operations=operations,
+                    commit_message=f"Add {sum(uploaded.values())} new rows",
+                    token=self.token)
+        except Exception as e:
+            print(f"Error pushing to Hugging Face Hub: {str(e)}")
+            raise
+
+        self._save_sync_state(new_state)
+        return uploaded
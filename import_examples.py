@@ -0,0 +1,132 @@
+"""Bulk-import training examples from text, JSONL or CSV files.
+
+Text files hold one example per paragraph (examples separated by blank
+lines) and are imported for --platform. JSONL and CSV records need a
+`content` (or `text`) field and may name their own `platform`. Files are
+streamed and rows are written with chunked Core inserts, one transaction
+per batch, with each batch full-text indexed in one statement. Examples
+already stored or repeated in the input are skipped by the insert itself
+(ON CONFLICT DO NOTHING on the unique content hash), so memory stays
+bounded by the batch size however large the file is.
+
+Usage:
+    python import_examples.py data/examples.txt --platform LinkedIn
+    python import_examples.py examples.jsonl --batch-size 20000
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+
+from database import (PLATFORMS, Example, content_hash, create_db_engine,
+                      insert_ignoring_duplicates, prepare_database)
+from search_index import deferred_indexing
+
+DEFAULT_BATCH_SIZE = 10000
+
+
+def read_text_examples(f):
+    """Yield blank-line separated paragraphs one at a time"""
+    lines = []
+    for line in f:
+        if line.strip():
+            lines.append(line.rstrip("\n"))
+        elif lines:
+            yield "\n".join(lines)
+            lines = []
+    if lines:
+        yield "\n".join(lines)
+
+
+def read_examples(path, default_platform=None):
+    """Yield (platform, content) tuples from a text, JSONL or CSV file without loading it whole"""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            records = csv.DictReader(f)
+        elif path.endswith((".jsonl", ".json")):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = ({"content": text} for text in read_text_examples(f))
+        for record in records:
+            content = record.get("content") or record.get("text")
+            if not content or not content.strip():
+                continue
+            yield record.get("platform") or default_platform, content.strip()
+
+
+def import_examples(engine, examples, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Insert new examples in batches; returns summary counts
+
+    examples is an iterable of (platform, content). Unknown platforms and
+    duplicates (already stored, or earlier in the input) are skipped; the
+    database skips stored ones, so only SQLite and PostgreSQL tolerate them.
+    progress, if given, is called with the running summary after each batch.
+    """
+    started = time.perf_counter()
+    summary = {"read": 0, "inserted": 0, "duplicates": 0, "invalid": 0}
+
+    def write(batch):
+        with engine.begin() as conn, deferred_indexing(conn, "examples"):
+            result = conn.execute(insert_ignoring_duplicates(Example, conn.dialect.name),
+                                  list(batch.values()))
+        # Conflicting rows are skipped and not counted
+        inserted = result.rowcount if result.rowcount >= 0 else len(batch)
+        summary["inserted"] += inserted
+        summary["duplicates"] += len(batch) - inserted
+        if progress is not None:
+            progress(dict(summary, seconds=time.perf_counter() - started))
+
+    # Keyed by (platform, hash) so repeats within a batch are dropped up front
+    batch = {}
+    for platform, content in examples:
+        summary["read"] += 1
+        if platform not in PLATFORMS:
+            summary["invalid"] += 1
+            continue
+        key = (platform, content_hash(content))
+        if key in batch:
+            summary["duplicates"] += 1
+            continue
+        batch[key] = {"id": str(uuid.uuid4()), "platform": platform, "content": content,
+                      "content_hash": key[1], "created_at": datetime.utcnow()}
+        if len(batch) >= batch_size:
+            write(batch)
+            batch = {}
+    if batch:
+        write(batch)
+
+    elapsed = time.perf_counter() - started
+    summary["seconds"] = elapsed
+    summary["rows_per_second"] = summary["read"] / elapsed if elapsed > 0 else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import examples from a text, JSONL or CSV file")
+    parser.add_argument("input", help="Text (blank-line separated), JSONL or CSV file")
+    parser.add_argument("--platform", choices=PLATFORMS,
+                        help="Platform for text files and records that do not name one")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per insert transaction")
+    parser.add_argument("--db-url", help="Database URL (defaults to DATABASE_URL or the local SQLite file)")
+    args = parser.parse_args()
+
+    engine = prepare_database(create_db_engine(args.db_url))
+
+    def progress(summary):
+        print(f"\r{summary['inserted']} inserted, {summary['duplicates']} duplicates "
+              f"({summary['read'] / summary['seconds']:.0f} rows/s)", end="", file=sys.stderr)
+
+    summary = import_examples(engine, read_examples(args.input, args.platform),
+                              batch_size=args.batch_size, progress=progress)
+    print(file=sys.stderr)
+    print(f"Imported {summary['inserted']} examples ({summary['duplicates']} duplicates, "
+          f"{summary['invalid']} without a valid platform) in {summary['seconds']:.1f}s, "
+          f"{summary['rows_per_second']:.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
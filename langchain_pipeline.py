@@ -1,146 +1,764 @@
+import asyncio
+import contextvars
+import hashlib
 import os
-from langchain_community.chat_models import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from database import init_db, LinkedInExample, TwitterExample, InstagramExample, LinkedInTransformation, TwitterTransformation, InstagramTransformation
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Optional
+from pydantic import PrivateAttr
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from database import (init_db, PLATFORMS, Example, Transformation, content_hash,
+                      insert_ignoring_duplicates)
 import uuid
 from huggingface_dataset import HuggingFaceDatasetManager
+import resources
+from prompts import PROMPTS
+from example_selector import ExampleSelector
+from db_stats import DatabaseStats
+import history
+import search_index
+from tracing import tracer
+
+# Completion tokens a rate-limited call reserves when the model sets no
+# max_tokens; a long LinkedIn post is about this size
+EXPECTED_COMPLETION_TOKENS = 512
+
+
+class FakeLLMError(RuntimeError):
+    """A failure injected by FakeChatModel"""
+
+
+FAKE_CALLS_TO_ACTION = (
+    "What would you add?",
+    "Share this with someone who needs it.",
+    "Let me know what you think below.",
+    "Save this for later.",
+)
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic local chat model for tests, demos and load tests
+
+    The reply depends only on the messages: the user's text, sentence by
+    sentence, plus a call to action picked by hashing the prompt. latency
+    is the wait before the first token and tokens_per_second paces the
+    rest (None sends them all at once). A seeded random draw fails
+    error_rate of the calls with FakeLLMError. Responses carry
+    usage_metadata like real providers, with tokens estimated at four
+    characters each.
+    """
+    latency: float = 0.0
+    tokens_per_second: Optional[float] = None
+    error_rate: float = 0.0
+    seed: int = 0
+    model_name: str = "fake-chat"
+    temperature: float = 0.0
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self):
+        return "fake-chat"
+
+    def reply(self, messages):
+        """The text this model answers messages with"""
+        text = messages[-1].content if messages else ""
+        digest = hashlib.sha256("\x00".join(m.content for m in messages).encode("utf-8")).digest()
+        sentences = [part.strip() for part in text.replace("\n", " ").split(". ") if part.strip()]
+        body = "\n\n".join(sentences) or text
+        return f"{body}\n\n{FAKE_CALLS_TO_ACTION[digest[0] % len(FAKE_CALLS_TO_ACTION)]}"
+
+    def _tokens(self, reply):
+        words = reply.split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    def _usage(self, messages, tokens):
+        input_tokens = sum(len(m.content) for m in messages) // 4 + 1
+        return {"input_tokens": input_tokens, "output_tokens": len(tokens),
+                "total_tokens": input_tokens + len(tokens)}
+
+    def _maybe_fail(self):
+        with self._lock:
+            failed = self.error_rate and self._rng.random() < self.error_rate
+        if failed:
+            raise FakeLLMError("Injected LLM failure")
+
+    def _token_delay(self):
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._maybe_fail()
+        reply = self.reply(messages)
+        tokens = self._tokens(reply)
+        time.sleep(self.latency + self._token_delay() * len(tokens))
+        message = AIMessage(content=reply, usage_metadata=self._usage(messages, tokens))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._maybe_fail()
+        tokens = self._tokens(self.reply(messages))
+        time.sleep(self.latency)
+        for token in tokens:
+            if self._token_delay():
+                time.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata=self._usage(messages, tokens)))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._maybe_fail()
+        tokens = self._tokens(self.reply(messages))
+        await asyncio.sleep(self.latency)
+        for token in tokens:
+            if self._token_delay():
+                await asyncio.sleep(self._token_delay())
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="", usage_metadata=self._usage(messages, tokens)))
+
+
+def token_usage(message):
+    """Token counts an LLM response reported: {input_tokens, output_tokens, total_tokens}
+
+    Chat models that fill usage_metadata (FakeChatModel, newer providers)
+    are read directly; langchain_community's ChatOpenAI passes OpenAI's
+    token_usage through response_metadata instead. Empty when the response
+    carries neither, e.g. most stream chunks.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return {key: usage.get(key) for key in ("input_tokens", "output_tokens", "total_tokens")}
+    usage = (getattr(message, "response_metadata", None) or {}).get("token_usage")
+    if usage:
+        return {"input_tokens": usage.get("prompt_tokens"),
+                "output_tokens": usage.get("completion_tokens"),
+                "total_tokens": usage.get("total_tokens")}
+    return {}
+
+
+def _openai_backend(api_key, temperature, **options):
+    return resources.get_llm(api_key, temperature, **options)
+
+
+def _fake_backend(api_key, temperature, **options):
+    return FakeChatModel(temperature=temperature, **options)
+
+
+# name -> factory(api_key, temperature, **options) returning a LangChain chat model
+LLM_BACKENDS = {"openai": _openai_backend, "fake": _fake_backend}
+
+
+def register_backend(name, factory):
+    """Make factory(api_key, temperature, **options) selectable as an LLM backend"""
+    LLM_BACKENDS[name] = factory
 
 
 class PostTransformer:
-    PLATFORM_MODELS = {
-        'LinkedIn': (LinkedInExample, LinkedInTransformation),
-        'Twitter': (TwitterExample, TwitterTransformation),
-        'Instagram': (InstagramExample, InstagramTransformation)
-    }
+    PLATFORMS = PLATFORMS
+
+    def __init__(self, db_session=None, hf_dataset_manager=None, response_cache=None,
+                 example_selector=None, db_stats=None):
+        """Create a transformer, optionally borrowing shared resources
 
-    def __init__(self):
+        The app passes in a session from the process-wide factory, the
+        shared dataset manager, response cache, example selector and stats
+        cache (see resources.py) so reruns stay cheap. Without a
+        response_cache every call hits the LLM.
+        """
         self.llm = None
-        self.db_session = init_db()
+        self.db_session = db_session if db_session is not None else init_db()
         self.current_platform = None
-        self.examples = []
+        self.example_selector = example_selector or ExampleSelector()
+        self.db_stats = db_stats or DatabaseStats()
+        self.last_generation_stats = None
+        self.response_cache = response_cache
+        self.prompts = PROMPTS
         # Initialize HF dataset manager
-        self.hf_dataset_manager = HuggingFaceDatasetManager()
+        if hf_dataset_manager is None:
+            hf_dataset_manager = HuggingFaceDatasetManager()
+        self.hf_dataset_manager = hf_dataset_manager
+
+    @property
+    def examples(self):
+        """Stored examples for the current platform"""
+        return self.example_selector.examples(self.current_platform)
+
+    @property
+    def example_count(self):
+        return self.example_selector.count(self.current_platform)
+
+    def count_examples(self, platform):
+        """Number of stored examples for a platform (COUNT(*), cached until the next write)"""
+        return self.db_stats.count(self.db_session, Example, platform=platform)
+
+    def recent_example_previews(self, platform, limit=5):
+        """Beginnings of the most recently added examples for a platform"""
+        return self.db_stats.recent_previews(
+            self.db_session, Example, platform=platform, limit=limit)
+
+    def history_page(self, platform, cursor=None, limit=history.DEFAULT_PAGE_SIZE, search=None):
+        """One page of saved transformations, newest first (see history.history_page)"""
+        return history.history_page(self.db_session, platform, cursor=cursor,
+                                    limit=limit, search=search)
+
+    def get_transformation(self, transformation_id):
+        """A saved transformation with its full texts"""
+        return history.get_transformation(self.db_session, transformation_id)
+
+    def search(self, query, platform=None, kind="transformations", limit=search_index.DEFAULT_LIMIT):
+        """Ranked keyword search over saved transformations (or examples)"""
+        return search_index.search(self.db_session, query, kind=kind,
+                                   platform=platform, limit=limit)
 
     def set_platform(self, platform):
-        """Update current platform and load relevant examples"""
+        """Update current platform and make sure its examples are indexed and current"""
         self.current_platform = platform
-        self.examples = self._load_examples()
+        self._ensure_examples_indexed(platform, refresh=True)
 
-    def _load_examples(self):
+    def _ensure_examples_indexed(self, platform, refresh=False):
+        """Index the platform's examples once; later additions update the index in place
+
+        refresh=True also rebuilds the index if the stored examples changed
+        behind it (e.g. through import_examples or dedupe), checked at most
+        every refresh_seconds. Both query the session, so worker threads only
+        ever find the index already loaded.
+        """
+        if platform in self.PLATFORMS and (refresh or not self.example_selector.is_loaded(platform)):
+            self.example_selector.ensure_loaded(
+                platform, lambda: self._load_examples(platform),
+                version_fn=lambda: self._examples_version(platform))
+
+    def _examples_version(self, platform):
+        """(row count, newest created_at) of the platform's stored examples"""
+        return tuple(self.db_session.query(func.count(), func.max(Example.created_at))
+                     .select_from(Example).filter(Example.platform == platform).one())
+
+    def _load_examples(self, platform=None):
         """Load platform-specific examples"""
-        if not self.current_platform:
+        platform = platform or self.current_platform
+        if not platform:
             return []
 
-        example_model = self.PLATFORM_MODELS[self.current_platform][0]
-        examples = self.db_session.query(example_model).all()
-        return [example.content for example in examples]
+        rows = (self.db_session.query(Example.content)
+                .filter(Example.platform == platform)
+                .yield_per(1000))
+        return [content for (content,) in rows]
+
+    def _already_stored(self, model, platform, row_hash):
+        return self.db_session.query(model.id).filter(
+            model.platform == platform, model.content_hash == row_hash).first() is not None
 
     def add_example(self, content):
-        """Add new example to platform-specific table"""
+        """Add new example for the current platform
+
+        Returns False (and stores nothing) if the platform already has this example.
+        """
         if not self.current_platform:
             raise ValueError("Please select a platform first!")
 
         if not content or not content.strip():
             raise ValueError("Example content cannot be empty!")
 
+        content = content.strip()
         try:
-            example_model = self.PLATFORM_MODELS[self.current_platform][0]
-            example = example_model(id=str(uuid.uuid4()),
-                                    content=content.strip())
+            example = Example(id=str(uuid.uuid4()),
+                              platform=self.current_platform,
+                              content=content,
+                              content_hash=content_hash(content))
             self.db_session.add(example)
             self.db_session.commit()
-            self.examples = self._load_examples()
-            return True
         except Exception as e:
             self.db_session.rollback()
+            if isinstance(e, IntegrityError) and self._already_stored(
+                    Example, self.current_platform, content_hash(content)):
+                return False
             raise Exception(f"Error adding example: {str(e)}")
 
-    def save_transformation(self, original_text, transformed_text, metadata=None):
-        """Save transformation to platform-specific table and Hugging Face dataset"""
-        if not self.current_platform:
-            raise ValueError("Please select a platform first!")
+        self.db_stats.invalidate(Example)
+        # Update the index in place instead of reloading the whole table
+        self.example_selector.add(self.current_platform, content,
+                                  version=self._examples_version(self.current_platform))
+        return True
 
-        # Save to local database
-        transformation_model = self.PLATFORM_MODELS[self.current_platform][1]
-        transformation_id = str(uuid.uuid4())
-        transformation = transformation_model(
-            id=transformation_id,
-            original_text=original_text,
-            transformed_text=transformed_text)
-        self.db_session.add(transformation)
-        self.db_session.commit()
-        
-        # Save to Hugging Face dataset with metadata
-        if metadata is None:
-            metadata = {}
-        
+    def _generation_metadata(self, platform, transformation_id, metadata=None):
+        """Metadata stored with a transformation, locally and on the Hub"""
+        metadata = dict(metadata or {})
         metadata.update({
             "id": transformation_id,
             "model": self.llm.model_name if self.llm else "unknown",
             "temperature": self.llm.temperature if self.llm else 0.0,
-            "example_count": len(self.examples)
+            "example_count": self.example_selector.count(platform),
+            "prompt_id": self.prompts.prompt_id(platform)
         })
-        
-        try:
-            self.hf_dataset_manager.add_transformation(
+        return metadata
+
+    def save_transformation(self, original_text, transformed_text, metadata=None):
+        """Save transformation with its metadata to the database and Hugging Face dataset
+
+        Returns False (and stores nothing) if the identical transformation
+        is already saved for the platform.
+        """
+        if not self.current_platform:
+            raise ValueError("Please select a platform first!")
+
+        with tracer.span("save_transformation", platform=self.current_platform) as span:
+            transformation_id = str(uuid.uuid4())
+            metadata = self._generation_metadata(self.current_platform, transformation_id, metadata)
+            row_hash = content_hash(original_text, transformed_text)
+
+            # Save to local database
+            transformation = Transformation(
+                id=transformation_id,
                 platform=self.current_platform,
                 original_text=original_text,
                 transformed_text=transformed_text,
-                metadata=metadata
-            )
-        except Exception as e:
-            print(f"Warning: Failed to save to Hugging Face dataset: {str(e)}")
-
-    def set_api_key(
-            self,
-            api_key,
-            temperature=0.8):  # modified signature to include temperature
-        """Initialize the LLM with the provided API key and temperature"""
-        os.environ["OPENAI_API_KEY"] = api_key
-        self.llm = ChatOpenAI(temperature=temperature, model="gpt-4o-mini")
-
-    def transform_post(self, text, platform):
-        """Transform the input text into a platform-specific post"""
+                meta=metadata,
+                content_hash=row_hash)
+            with tracer.span("db_commit", rows=1):
+                self.db_session.add(transformation)
+                try:
+                    self.db_session.commit()
+                except IntegrityError:
+                    self.db_session.rollback()
+                    if self._already_stored(Transformation, self.current_platform, row_hash):
+                        span.set(duplicate=True)
+                        return False
+                    raise
+            self.db_stats.invalidate(Transformation)
+
+            try:
+                with tracer.span("hf_add", rows=1):
+                    self.hf_dataset_manager.add_transformation(
+                        platform=self.current_platform,
+                        original_text=original_text,
+                        transformed_text=transformed_text,
+                        metadata=metadata
+                    )
+            except Exception as e:
+                print(f"Warning: Failed to save to Hugging Face dataset: {str(e)}")
+            return True
+
+    def save_transformations(self, rows):
+        """Bulk-save transformations in a single transaction
+
+        rows is an iterable of dicts with platform, original_text,
+        transformed_text and optional metadata (the shape transform_many
+        yields). All rows are written with one executemany insert that
+        skips transformations already saved. Returns the number of rows
+        saved; only those are added to the Hugging Face dataset.
+        """
+        with tracer.span("save_transformations") as span:
+            saved_count = self._save_transformations(rows)
+            span.set(saved=saved_count)
+            return saved_count
+
+    def _save_transformations(self, rows):
+        values = []
+        dataset_rows = []
+        saved = set()
+        for row in rows:
+            transformation_id = str(uuid.uuid4())
+            metadata = self._generation_metadata(
+                row["platform"], transformation_id, row.get("metadata"))
+            row_hash = content_hash(row["original_text"], row["transformed_text"])
+            values.append({
+                "id": transformation_id,
+                "platform": row["platform"],
+                "original_text": row["original_text"],
+                "transformed_text": row["transformed_text"],
+                "meta": metadata,
+                "content_hash": row_hash,
+            })
+            dataset_rows.append((row, metadata, (row["platform"], row_hash)))
+
+        if values:
+            dialect_name = self.db_session.get_bind().dialect.name
+            statement = insert_ignoring_duplicates(Transformation, dialect_name)
+            with tracer.span("db_commit", rows=len(values)):
+                try:
+                    if dialect_name in ("sqlite", "postgresql"):
+                        # Skipped duplicates are simply missing from RETURNING
+                        saved = set(map(tuple, self.db_session.execute(
+                            statement.returning(Transformation.platform, Transformation.content_hash),
+                            values).all()))
+                    else:
+                        self.db_session.execute(statement, values)
+                        saved = {key for _, _, key in dataset_rows}
+                    self.db_session.commit()
+                except Exception:
+                    self.db_session.rollback()
+                    raise
+            self.db_stats.invalidate(Transformation)
+        saved_count = len(saved)
+        if not saved_count:
+            return 0
+
+        with tracer.span("hf_add", rows=saved_count):
+            for row, metadata, key in dataset_rows:
+                if key not in saved:
+                    continue
+                # Later repeats within the batch were skipped by the insert too
+                saved.discard(key)
+                try:
+                    self.hf_dataset_manager.add_transformation(
+                        platform=row["platform"],
+                        original_text=row["original_text"],
+                        transformed_text=row["transformed_text"],
+                        metadata=metadata
+                    )
+                except Exception as e:
+                    print(f"Warning: Failed to save to Hugging Face dataset: {str(e)}")
+        return saved_count
+
+    def save_all(self, original_text, posts, metadata=None):
+        """Save the posts transform_all returned, in one transaction
+
+        metadata is shared by every platform's row. Returns the number of
+        transformations saved (repeats of saved ones are skipped).
+        """
+        return self.save_transformations(
+            {"platform": platform, "original_text": original_text,
+             "transformed_text": post, "metadata": dict(metadata or {}, platform=platform)}
+            for platform, post in posts.items())
+
+    def set_api_key(self, api_key, temperature=0.8, backend=None, **options):
+        """Initialize the LLM with the provided API key and temperature
+
+        backend picks the chat model implementation from LLM_BACKENDS
+        ("openai" unless LLM_BACKEND says otherwise; "fake" runs locally);
+        options go to the backend's factory. The key goes to the client
+        only; the environment is left alone.
+        """
+        backend = backend or os.getenv("LLM_BACKEND", "openai")
+        if backend not in LLM_BACKENDS:
+            raise ValueError(f"Unknown LLM backend: {backend}")
+        # The openai backend reuses the process-wide client (and its warm
+        # connections) on every rerun
+        self.llm = LLM_BACKENDS[backend](api_key, temperature, **options)
+
+    def _build_messages(self, text, platform):
+        """Render the chat messages sent to the LLM from the precompiled prompt
+
+        The most relevant stored examples for the platform are included as
+        few-shot style references.
+        """
+        self._ensure_examples_indexed(platform)
+        examples = self.example_selector.select(platform, text)
+        return self.prompts.get(platform).format_messages(text, examples)
+
+    def _cache_key(self, messages, platform):
+        """Cache key for the rendered prompt, its prompt id and the current model settings"""
+        return self.response_cache.make_key(
+            messages,
+            prompt_id=self.prompts.prompt_id(platform),
+            model=getattr(self.llm, "model_name", None),
+            temperature=getattr(self.llm, "temperature", None))
+
+    def transform_post(self, text, platform, bypass_cache=False, rate_limiter=None):
+        """Transform the input text into a platform-specific post
+
+        Identical requests are answered from the response cache when one is
+        configured; bypass_cache=True forces a fresh sample (which then
+        replaces the cached one). An optional RateLimiter is charged for the
+        rendered prompt just before the LLM call, so cache hits cost nothing.
+        """
         if not self.llm:
             raise ValueError("Please set your OpenAI API key first!")
 
-        prompt = ChatPromptTemplate.from_messages([("system", f"""
-            You are a highly skilled and experienced social media content creator specializing in crafting engaging and impactful posts for {platform}. Your expertise lies in transforming user-provided text into optimized content that aligns with the best practices of {platform}.
+        with tracer.span("transform_post", platform=platform) as span:
+            with tracer.span("build_prompt"):
+                messages = self._build_messages(text, platform)
+            cache_key = None
+            if self.response_cache is not None:
+                with tracer.span("cache_lookup", bypass=bypass_cache) as cache_span:
+                    cache_key = self._cache_key(messages, platform)
+                    cached = None if bypass_cache else self.response_cache.get(cache_key)
+                    cache_span.set(hit=cached is not None)
+                if cached is not None:
+                    span.set(cached=True)
+                    return cached
 
-            Follow these guidelines meticulously:
-            1 Preserve the Original Message & Tone: Maintain the user's intent, ensuring that the core message and tone remain intact.
+            reserved = None
+            if rate_limiter is not None:
+                with tracer.span("rate_limit"):
+                    reserved = rate_limiter.acquire(
+                        self._estimate_tokens(messages) + self._expected_completion_tokens())
+            started = time.perf_counter()
+            with tracer.span("llm_call", model=getattr(self.llm, "model_name", None)) as llm_span:
+                response = self.llm(messages)
+                usage = token_usage(response)
+                llm_span.set(**usage)
+            if reserved is not None and usage.get("total_tokens") is not None:
+                rate_limiter.reconcile(reserved, usage["total_tokens"])
+            if cache_key is not None:
+                with tracer.span("cache_store"):
+                    self.response_cache.put(cache_key, response.content,
+                                            time.perf_counter() - started)
+            span.set(cached=False)
+            return response.content
 
-            2 Enhance Impact & Memorability: Refine the content to make it more engaging, persuasive, and shareable. Utilize compelling hooks, storytelling techniques, and audience-relevant language.
+    def transform_many(self, jobs, concurrency=4, rate_limiter=None, bypass_cache=False):
+        """Transform an iterable of (text, platform) jobs concurrently
 
-            3 Optimize for {platform} Best Practices: Structure the content according to what works best on {platform}, including sentence length, readability, and formatting that enhances engagement.
+        At most `concurrency` LLM calls run at once and jobs are pulled from
+        the iterable lazily, so large backfills stay bounded in memory. An
+        optional RateLimiter (see rate_limiter.py) caps requests and tokens
+        per minute. Result dicts are yielded as jobs complete, not in input
+        order; failed jobs carry an error message instead of raising.
+        """
+        if not self.llm:
+            raise ValueError("Please set your OpenAI API key first!")
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
 
-            4 Prioritize Content Quality & Relevance: Ensure that the post is well-structured, free of errors, and tailored to resonate with the target audience for {platform}. Incorporate strategic keywords to improve visibility and engagement.
+        # Index examples up front so worker threads never touch the session
+        for platform in self.PLATFORMS:
+            self._ensure_examples_indexed(platform, refresh=True)
 
-            5 Incorporate Relevant Emojis for {platform}: Use emojis sparingly and strategically to enhance readability and emotional appeal without overloading the content.
+        def run(index, text, platform):
+            result = {
+                "index": index,
+                "platform": platform,
+                "original_text": text,
+                "transformed_text": None,
+                "error": None,
+            }
+            started = time.perf_counter()
+            try:
+                if platform not in self.PLATFORMS:
+                    raise ValueError(f"Unknown platform: {platform}")
+                result["transformed_text"] = self.transform_post(
+                    text, platform, bypass_cache=bypass_cache, rate_limiter=rate_limiter)
+            except Exception as e:
+                result["error"] = str(e)
+            result["latency"] = time.perf_counter() - started
+            return result
 
-            6 Strictly Avoid Hashtags & Mentions: Do not include any hashtags or mentions in the response.
+        pending_jobs = enumerate(jobs)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            in_flight = set()
 
-            7 Remove Any Markdown Formatting: Ensure the final output contains no markdown elements such as asterisks, underscores, or other formatting symbols.
+            def submit_next():
+                for index, (text, platform) in pending_jobs:
+                    # Run in a copy of this context so the job's spans join the caller's trace
+                    in_flight.add(executor.submit(contextvars.copy_context().run,
+                                                  run, index, text, platform))
+                    return
 
-            8 Keep the Post Easy to Read & Understand: Write in a clear, engaging, and concise manner, making the content accessible to a broad audience.
+            for _ in range(concurrency):
+                submit_next()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    submit_next()
+                    yield future.result()
 
-            9 Adapt Content to Platform-Specific Trends: If applicable, subtly align the content with trending styles, formats, or themes relevant to {platform} while maintaining authenticity.
+    def transform_all(self, text, platforms=None, bypass_cache=False):
+        """Transform one text for several platforms at once (all of them by default)
 
-            10 Encourage Engagement & Action: Where appropriate, include a natural call-to-action (CTA) that encourages likes, comments, shares, or interactions.
+        The per-platform generations run concurrently, so this takes about
+        as long as the slowest single call. Returns {platform: post} in
+        platform order; raises if any platform failed.
+        """
+        platforms = list(platforms or self.PLATFORMS)
+        posts = {}
+        errors = []
+        with tracer.span("transform_all", platforms=len(platforms)) as span:
+            for result in self.transform_many(((text, platform) for platform in platforms),
+                                              concurrency=len(platforms), bypass_cache=bypass_cache):
+                if result["error"] is not None:
+                    errors.append(f"{result['platform']}: {result['error']}")
+                else:
+                    posts[result["platform"]] = result["transformed_text"]
+            span.set(errors=len(errors))
+        if errors:
+            raise Exception("Error transforming post: " + "; ".join(sorted(errors)))
+        return {platform: posts[platform] for platform in platforms}
 
-            11. Adapt Content length to Platform: Ensure the post length is optimized for {platform} to maximize engagement and readability.
+    def _estimate_tokens(self, messages):
+        """Rough size of rendered messages in tokens (about four characters per token)"""
+        return sum(len(message.content) for message in messages) // 4 + 1
+
+    def _expected_completion_tokens(self):
+        """Completion tokens to reserve before a call: the model's max_tokens, if it sets one"""
+        max_tokens = getattr(self.llm, "max_tokens", None)
+        return max_tokens if isinstance(max_tokens, int) else EXPECTED_COMPLETION_TOKENS
+
+    def transform_post_stream(self, text, platform, cancel_event=None, bypass_cache=False):
+        """Yield the transformed post piece by piece as the LLM produces it
+
+        Setting cancel_event (a threading.Event) or closing the generator
+        stops the generation and closes the underlying LLM stream. Timings
+        and token usage for the run end up in self.last_generation_stats. A
+        cached response is yielded as a single chunk; completed generations
+        are cached.
+        """
+        if not self.llm:
+            raise ValueError("Please set your OpenAI API key first!")
+
+        # The span stays open across yields, so it is never made current
+        span = tracer.start_span("transform_post_stream", platform=platform)
+        self.last_generation_stats = None
+        error = None
+        try:
+            yield from self._stream_post(text, platform, cancel_event, bypass_cache, span)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            stats = self.last_generation_stats or {}
+            span.set(cached=stats.get("cached"), cancelled=stats.get("cancelled"))
+            tracer.end_span(span, error=error)
+
+    def _stream_post(self, text, platform, cancel_event, bypass_cache, span):
+        with tracer.span("build_prompt", parent=span):
+            messages = self._build_messages(text, platform)
+        stats = self._start_generation_stats()
+        cache_key = None
+        if self.response_cache is not None:
+            with tracer.span("cache_lookup", parent=span, bypass=bypass_cache) as cache_span:
+                cache_key = self._cache_key(messages, platform)
+                cached = None if bypass_cache else self.response_cache.get(cache_key)
+                cache_span.set(hit=cached is not None)
+            if cached is not None:
+                stats["cached"] = True
+                self._record_chunk(stats)
+                stats["total_time"] = time.perf_counter() - stats["started_at"]
+                yield cached
+                return
+
+        parts = []
+        llm_span = tracer.start_span("llm_stream", parent=span,
+                                     model=getattr(self.llm, "model_name", None))
+        stream = self.llm.stream(messages)
+        error = None
+        try:
+            for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    stats["cancelled"] = True
+                    break
+                stats["usage"] = token_usage(chunk) or stats["usage"]
+                if not chunk.content:
+                    continue
+                self._record_chunk(stats)
+                parts.append(chunk.content)
+                yield chunk.content
+        except GeneratorExit:
+            stats["cancelled"] = True
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            stream.close()
+            stats["total_time"] = time.perf_counter() - stats["started_at"]
+            llm_span.set(time_to_first_token=stats["time_to_first_token"], chunks=stats["chunks"],
+                         **(stats["usage"] or {}))
+            tracer.end_span(llm_span, error=error)
+
+        if cache_key is not None and not stats["cancelled"]:
+            with tracer.span("cache_store", parent=span):
+                self.response_cache.put(cache_key, "".join(parts), stats["total_time"])
+
+    async def atransform_post_stream(self, text, platform, cancel_event=None, bypass_cache=False):
+        """Async version of transform_post_stream
+
+        Besides cancel_event, cancelling the consuming task or calling
+        aclose() on the generator abandons the request. The response cache
+        is used the same way.
+        """
+        if not self.llm:
+            raise ValueError("Please set your OpenAI API key first!")
+
+        span = tracer.start_span("atransform_post_stream", platform=platform)
+        self.last_generation_stats = None
+        error = None
+        try:
+            async for chunk in self._astream_post(text, platform, cancel_event, bypass_cache, span):
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            stats = self.last_generation_stats or {}
+            span.set(cached=stats.get("cached"), cancelled=stats.get("cancelled"))
+            tracer.end_span(span, error=error)
+
+    async def _astream_post(self, text, platform, cancel_event, bypass_cache, span):
+        with tracer.span("build_prompt", parent=span):
+            messages = self._build_messages(text, platform)
+        stats = self._start_generation_stats()
+        cache_key = None
+        if self.response_cache is not None:
+            with tracer.span("cache_lookup", parent=span, bypass=bypass_cache) as cache_span:
+                cache_key = self._cache_key(messages, platform)
+                cached = None if bypass_cache else self.response_cache.get(cache_key)
+                cache_span.set(hit=cached is not None)
+            if cached is not None:
+                stats["cached"] = True
+                self._record_chunk(stats)
+                stats["total_time"] = time.perf_counter() - stats["started_at"]
+                yield cached
+                return
+
+        parts = []
+        llm_span = tracer.start_span("llm_stream", parent=span,
+                                     model=getattr(self.llm, "model_name", None))
+        stream = self.llm.astream(messages)
+        error = None
+        try:
+            async for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    stats["cancelled"] = True
+                    break
+                stats["usage"] = token_usage(chunk) or stats["usage"]
+                if not chunk.content:
+                    continue
+                self._record_chunk(stats)
+                parts.append(chunk.content)
+                yield chunk.content
+        except (GeneratorExit, asyncio.CancelledError):
+            stats["cancelled"] = True
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            await stream.aclose()
+            stats["total_time"] = time.perf_counter() - stats["started_at"]
+            llm_span.set(time_to_first_token=stats["time_to_first_token"], chunks=stats["chunks"],
+                         **(stats["usage"] or {}))
+            tracer.end_span(llm_span, error=error)
 
-            Additional Instructions:
-            Do not add unnecessary fluff; keep the content concise yet powerful.
-            If the original text is too long, summarize it while keeping the core message intact.
-            If the text lacks clarity, improve its coherence without altering its meaning.
-            Transform the user's input into an engaging, impactful, and platform-optimized post that captures attention and encourages interaction.
+        if cache_key is not None and not stats["cancelled"]:
+            with tracer.span("cache_store", parent=span):
+                self.response_cache.put(cache_key, "".join(parts), stats["total_time"])
 
-            Take a deep breath and work on this problem step-by-step. 
-            You have the skills and creativity needed to excel in this task. 
-            Begin by analyzing the original text, identifying its strengths and weaknesses, and envisioning how it can be enhanced to resonate with the target audience on {platform}. 
-            Then, craft a compelling response that aligns with the best practices of {platform} and showcases your expertise in content creation.
-            """), ("user", text)])
+    def _start_generation_stats(self):
+        """Reset the per-generation metrics (time to first token, total time, chunks, tokens)"""
+        self.last_generation_stats = {
+            "started_at": time.perf_counter(),
+            "time_to_first_token": None,
+            "total_time": None,
+            "chunks": 0,
+            "cancelled": False,
+            "cached": False,
+            "usage": None,
+        }
+        return self.last_generation_stats
 
-        response = self.llm(prompt.format_messages())
-        return response.content
+    def _record_chunk(self, stats):
+        if stats["time_to_first_token"] is None:
+            stats["time_to_first_token"] = time.perf_counter() - stats["started_at"]
+        stats["chunks"] += 1
@@ -0,0 +1,81 @@
+"""Registry of chat model clients that share one pooled HTTP connection pool.
+
+A ChatOpenAI built the usual way creates its own OpenAI client and, with it,
+its own httpx connection pool, so every new model object pays TCP and TLS
+setup again. The registry hands out one chat model per (api key, model,
+temperature) and builds them all on a single keep-alive httpx.Client, so
+switching temperature or serving another session reuses warm connections.
+API keys are passed to the clients directly; the environment is never
+modified.
+"""
+import threading
+
+import httpx
+import openai
+from langchain_community.chat_models import ChatOpenAI
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+class LLMClientRegistry:
+    def __init__(self, base_url=None, max_connections=20, max_keepalive_connections=10,
+                 keepalive_expiry=60.0, timeout=60.0, max_retries=2):
+        """Configure the shared pool; base_url points at any OpenAI-compatible server
+
+        base_url=None uses the OpenAI default (or OPENAI_BASE_URL).
+        """
+        self.base_url = base_url
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._lock = threading.RLock()
+        self._http_client = None
+        self._openai_clients = {}
+        self._chat_models = {}
+
+    @property
+    def http_client(self):
+        """The httpx.Client every chat model sends its requests through"""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=self.limits, timeout=self.timeout)
+            return self._http_client
+
+    def _openai_client(self, api_key):
+        """One OpenAI client per key, all on the shared pool (call with the lock held)"""
+        client = self._openai_clients.get(api_key)
+        if client is None:
+            client = openai.OpenAI(api_key=api_key, base_url=self.base_url,
+                                   max_retries=self.max_retries, http_client=self.http_client)
+            self._openai_clients[api_key] = client
+        return client
+
+    def get(self, api_key, temperature, model=DEFAULT_MODEL):
+        """Return the chat model for these settings, building it on first use
+
+        Async calls (astream) use the model's own async client, as an
+        httpx.AsyncClient cannot be shared across event loops.
+        """
+        key = (api_key, model, temperature)
+        with self._lock:
+            llm = self._chat_models.get(key)
+            if llm is None:
+                llm = ChatOpenAI(openai_api_key=api_key, openai_api_base=self.base_url,
+                                 temperature=temperature, model=model,
+                                 client=self._openai_client(api_key).chat.completions)
+                self._chat_models[key] = llm
+            return llm
+
+    def __len__(self):
+        return len(self._chat_models)
+
+    def close(self):
+        """Close the pooled connections and forget every client"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._openai_clients.clear()
+            self._chat_models.clear()
@@ -0,0 +1,186 @@
+"""End-to-end load test with simulated users against the local fake LLM.
+
+Each simulated user runs in its own thread with its own database session,
+like a Streamlit session, and repeatedly streams a transformation
+(transform_post_stream), saves it (save_transformation, which also buffers
+the row for the Hugging Face dataset) and requests a sync from a shared
+SyncWorker. The worker's push merges the buffered rows locally and waits
+--push-latency seconds instead of uploading. The LLM is FakeChatModel with
+configurable latency, token rate and error injection, so no API key or
+network is needed.
+
+Reports p50/p95/p99 latency per stage and end to end, plus throughput.
+
+Usage:
+    python load_test.py --users 20 --requests 10 --latency 0.3 --tokens-per-second 80
+    python load_test.py --users 50 --error-rate 0.05 --json
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from database import create_session_factory
+from huggingface_dataset import HuggingFaceDatasetManager
+from langchain_pipeline import FakeChatModel, PostTransformer
+from db_stats import DatabaseStats
+from example_selector import ExampleSelector
+from sync_worker import SyncWorker
+from tracing import percentile
+
+STAGES = ("first_token", "transform", "save", "request")
+
+
+def summarize(values):
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95),
+            "p99": percentile(values, 99), "max": max(values) if values else None}
+
+
+def simulate_user(user_id, requests, transformer, sync_worker, timings, errors, lock):
+    """One user's session: stream, save and sync `requests` posts"""
+    platforms = transformer.PLATFORMS
+    for i in range(requests):
+        platform = platforms[(user_id + i) % len(platforms)]
+        text = (f"User {user_id}, update {i}: we shipped the new editor today. "
+                f"It saves drafts automatically and works offline.")
+        started = time.perf_counter()
+        try:
+            transformer.set_platform(platform)
+            parts = []
+            first_token = None
+            for chunk in transformer.transform_post_stream(text, platform):
+                if first_token is None:
+                    first_token = time.perf_counter() - started
+                parts.append(chunk)
+            transformed = time.perf_counter()
+            transformer.save_transformation(text, "".join(parts))
+            saved = time.perf_counter()
+            sync_worker.request_sync()
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            continue
+        finished = time.perf_counter()
+        with lock:
+            timings["first_token"].append(first_token or transformed - started)
+            timings["transform"].append(transformed - started)
+            timings["save"].append(saved - transformed)
+            timings["request"].append(finished - started)
+
+
+def run_load_test(users=10, requests=10, llm=None, db_url=None, push_latency=0.0,
+                  debounce_seconds=1.0, dirty_threshold=50):
+    """Run the simulated users to completion and return the report dict
+
+    llm defaults to a FakeChatModel with 0.2s latency and 100 tokens/s.
+    db_url defaults to a fresh SQLite file in a temporary directory.
+    """
+    llm = llm or FakeChatModel(latency=0.2, tokens_per_second=100)
+    temp_dir = None
+    if db_url is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix="load_test_")
+        db_url = f"sqlite:///{os.path.join(temp_dir.name, 'load_test.db')}"
+    session_factory = create_session_factory(db_url, pool_size=users)
+
+    manager = HuggingFaceDatasetManager(token="", repo_name="", lazy=True)
+    manager.dataset_dict = HuggingFaceDatasetManager._empty_dataset_dict()
+
+    def push():
+        manager.flush()
+        time.sleep(push_latency)
+
+    sync_worker = SyncWorker(push, debounce_seconds=debounce_seconds,
+                             dirty_threshold=dirty_threshold).start()
+    example_selector = ExampleSelector()
+    db_stats = DatabaseStats()
+
+    timings = {stage: [] for stage in STAGES}
+    errors = []
+    lock = threading.Lock()
+    threads = []
+    sessions = []
+    for user_id in range(users):
+        session = session_factory()
+        sessions.append(session)
+        transformer = PostTransformer(db_session=session, hf_dataset_manager=manager,
+                                      example_selector=example_selector, db_stats=db_stats)
+        transformer.llm = llm
+        threads.append(threading.Thread(
+            target=simulate_user, name=f"user-{user_id}",
+            args=(user_id, requests, transformer, sync_worker, timings, errors, lock)))
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    sync_worker.shutdown(flush=True)
+
+    for session in sessions:
+        session.close()
+    session_factory.kw["bind"].dispose()
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+    completed = len(timings["request"])
+    return {
+        "users": users,
+        "requests": users * requests,
+        "completed": completed,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "seconds": elapsed,
+        "throughput": completed / elapsed if elapsed > 0 else 0.0,
+        "latency": {stage: summarize(values) for stage, values in timings.items()},
+        "sync": sync_worker.stats(),
+    }
+
+
+def print_report(report):
+    print(f"{report['users']} users, {report['completed']}/{report['requests']} requests "
+          f"completed in {report['seconds']:.2f}s ({report['throughput']:.1f} requests/s), "
+          f"{report['errors']} errors")
+    print(f"{'stage':<12}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for stage, latency in report["latency"].items():
+        if latency["p50"] is None:
+            continue
+        print(f"{stage:<12}" + "".join(f"{latency[key] * 1000:>8.1f}ms"
+                                       for key in ("p50", "p95", "p99", "max")))
+    sync = report["sync"]
+    print(f"sync: {sync['pushes_requested']} requests coalesced into {sync['pushes_done']} pushes "
+          f"({sync['pushes_failed']} failed)")
+    for sample in report["error_samples"]:
+        print(f"  error: {sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the transform pipeline with a fake LLM")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=10, help="Transformations per user")
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0,
+                        help="Fake LLM token rate (0 for instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of LLM calls that fail")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--push-latency", type=float, default=0.5,
+                        help="Seconds each simulated Hub push takes")
+    parser.add_argument("--db-url", help="Database URL (defaults to a temporary SQLite file)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    llm = FakeChatModel(latency=args.latency, tokens_per_second=args.tokens_per_second or None,
+                        error_rate=args.error_rate, seed=args.seed)
+    report = run_load_test(args.users, args.requests, llm=llm, db_url=args.db_url,
+                           push_latency=args.push_latency)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
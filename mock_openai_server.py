@@ -0,0 +1,168 @@
+"""A local OpenAI-compatible chat completions server for tests and benchmarks.
+
+It answers POST /v1/chat/completions (streaming and not) with a canned
+reply after an optional delay, speaks HTTP/1.1 keep-alive and counts the
+TCP connections and requests it sees, so client connection reuse can be
+measured without calling OpenAI.
+
+Usage:
+    python mock_openai_server.py --port 8001 --latency 0.2
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 streamlit run app.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def echo_reply(messages):
+    """Default reply: a short, deterministic post derived from the last message"""
+    text = messages[-1]["content"] if messages else ""
+    return f"Mock post: {text[:80]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the body
+    # waits for the client's delayed ACK (~40 ms) on a reused connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.mock.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        mock = self.server.mock
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        mock.record_request()
+        if mock.latency:
+            time.sleep(mock.latency)
+        content = mock.reply(body.get("messages", []))
+        model = body.get("model", "mock-model")
+        usage = {"prompt_tokens": sum(len(m.get("content", "")) for m in body.get("messages", [])) // 4,
+                 "completion_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if body.get("stream"):
+            self._send_stream(model, content)
+        else:
+            self._send_json(200, {
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()),
+                "model": model, "usage": usage,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}]})
+
+    def _send_json(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, model, content):
+        # Chunked transfer encoding keeps the connection usable afterwards
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = content.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == 0 else " " + word
+            self._send_event({"id": "chatcmpl-mock", "object": "chat.completion.chunk",
+                              "created": int(time.time()), "model": model,
+                              "choices": [{"index": 0, "delta": {"content": piece},
+                                           "finish_reason": None}]})
+        self._send_event({"id": "chatcmpl-mock", "object": "chat.completion.chunk",
+                          "created": int(time.time()), "model": model,
+                          "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        self._send_chunk(b"data: [DONE]\n\n")
+        self._send_chunk(b"")
+
+    def _send_event(self, payload):
+        self._send_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _send_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class MockOpenAIServer:
+    """Run the mock server on a background thread
+
+    Use as a context manager; base_url is what OpenAI clients should be
+    pointed at. connections and requests count what the server has seen.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, reply=echo_reply):
+        self.latency = latency
+        self.reply = reply
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before replying")
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(args.host, args.port, latency=args.latency)
+    print(f"Serving a mock OpenAI API at {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
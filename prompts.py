@@ -0,0 +1,101 @@
+"""Precompiled, versioned prompt templates.
+
+Every platform's template is compiled once when this module is imported. The
+system message is fixed per platform and the user's text is bound as the
+`text` variable at call time, so braces in user input are never parsed as
+template fields. Bump PROMPT_VERSION whenever SYSTEM_PROMPT changes so cached
+responses and saved metadata can tell prompt revisions apart.
+"""
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages import SystemMessage
+
+PROMPT_VERSION = 2
+PLATFORMS = ("LinkedIn", "Twitter", "Instagram")
+
+EXAMPLES_HEADER = """Here are example posts for {platform} written in the user's own style. Match their voice, structure and length where it fits, but do not copy their content:"""
+
+SYSTEM_PROMPT = """
+            You are a highly skilled and experienced social media content creator specializing in crafting engaging and impactful posts for {platform}. Your expertise lies in transforming user-provided text into optimized content that aligns with the best practices of {platform}.
+
+            Follow these guidelines meticulously:
+            1 Preserve the Original Message & Tone: Maintain the user's intent, ensuring that the core message and tone remain intact.
+
+            2 Enhance Impact & Memorability: Refine the content to make it more engaging, persuasive, and shareable. Utilize compelling hooks, storytelling techniques, and audience-relevant language.
+
+            3 Optimize for {platform} Best Practices: Structure the content according to what works best on {platform}, including sentence length, readability, and formatting that enhances engagement.
+
+            4 Prioritize Content Quality & Relevance: Ensure that the post is well-structured, free of errors, and tailored to resonate with the target audience for {platform}. Incorporate strategic keywords to improve visibility and engagement.
+
+            5 Incorporate Relevant Emojis for {platform}: Use emojis sparingly and strategically to enhance readability and emotional appeal without overloading the content.
+
+            6 Strictly Avoid Hashtags & Mentions: Do not include any hashtags or mentions in the response.
+
+            7 Remove Any Markdown Formatting: Ensure the final output contains no markdown elements such as asterisks, underscores, or other formatting symbols.
+
+            8 Keep the Post Easy to Read & Understand: Write in a clear, engaging, and concise manner, making the content accessible to a broad audience.
+
+            9 Adapt Content to Platform-Specific Trends: If applicable, subtly align the content with trending styles, formats, or themes relevant to {platform} while maintaining authenticity.
+
+            10 Encourage Engagement & Action: Where appropriate, include a natural call-to-action (CTA) that encourages likes, comments, shares, or interactions.
+
+            11. Adapt Content length to Platform: Ensure the post length is optimized for {platform} to maximize engagement and readability.
+
+            Additional Instructions:
+            Do not add unnecessary fluff; keep the content concise yet powerful.
+            If the original text is too long, summarize it while keeping the core message intact.
+            If the text lacks clarity, improve its coherence without altering its meaning.
+            Transform the user's input into an engaging, impactful, and platform-optimized post that captures attention and encourages interaction.
+
+            Take a deep breath and work on this problem step-by-step. 
+            You have the skills and creativity needed to excel in this task. 
+            Begin by analyzing the original text, identifying its strengths and weaknesses, and envisioning how it can be enhanced to resonate with the target audience on {platform}. 
+            Then, craft a compelling response that aligns with the best practices of {platform} and showcases your expertise in content creation.
+            """
+
+
+class CompiledPrompt:
+    """A platform's compiled template and its prompt id"""
+
+    def __init__(self, platform, version=PROMPT_VERSION):
+        self.platform = platform
+        self.version = version
+        self.prompt_id = f"{platform.lower()}-v{version}"
+        # The system message is a ready-made message object, so formatting
+        # only has to fill in the user's text
+        self.examples_header = EXAMPLES_HEADER.replace("{platform}", platform)
+        self.template = ChatPromptTemplate.from_messages([
+            SystemMessage(content=SYSTEM_PROMPT.replace("{platform}", platform)),
+            MessagesPlaceholder("examples", optional=True),
+            ("user", "{text}"),
+        ])
+
+    def format_messages(self, text, examples=None):
+        """Render the messages for the user's text and optional few-shot examples"""
+        example_messages = []
+        if examples:
+            example_messages.append(SystemMessage(content="\n\n".join(
+                [self.examples_header] +
+                [f"Example {i}:\n{example}" for i, example in enumerate(examples, 1)])))
+        return self.template.format_messages(text=text, examples=example_messages)
+
+
+class PromptRegistry:
+    """Holds one CompiledPrompt per platform"""
+
+    def __init__(self, platforms=PLATFORMS, version=PROMPT_VERSION):
+        self.version = version
+        self._prompts = {platform: CompiledPrompt(platform, version) for platform in platforms}
+
+    def get(self, platform):
+        """Return the compiled prompt for a platform, compiling unknown ones on demand"""
+        prompt = self._prompts.get(platform)
+        if prompt is None:
+            prompt = self._prompts[platform] = CompiledPrompt(platform, self.version)
+        return prompt
+
+    def prompt_id(self, platform):
+        return self.get(platform).prompt_id
+
+
+# Compiled at import time, i.e. once per process
+PROMPTS = PromptRegistry()
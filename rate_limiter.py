@@ -0,0 +1,80 @@
+"""Thread-safe request and token rate limiting for LLM calls."""
+import threading
+import time
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests per minute and tokens per minute
+
+    Either limit may be None to leave it unbounded. Each bucket holds up to
+    one minute's allowance and refills continuously, so short bursts are
+    allowed while the per-minute average is respected. Token counts are
+    only known once a response arrives, so callers reserve an estimate with
+    acquire() and settle it with reconcile() afterwards.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, clock=time.monotonic, sleep=time.sleep):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._request_allowance = float(requests_per_minute or 0)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._updated_at = clock()
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed * self.requests_per_minute / 60.0)
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed * self.tokens_per_minute / 60.0)
+
+    def _wait_time(self, tokens):
+        """Seconds until one request of `tokens` tokens fits in both buckets"""
+        wait = 0.0
+        if self.requests_per_minute and self._request_allowance < 1:
+            wait = max(wait, (1 - self._request_allowance) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute and self._token_allowance < tokens:
+            wait = max(wait, (tokens - self._token_allowance) * 60.0 / self.tokens_per_minute)
+        return wait
+
+    def acquire(self, tokens=0):
+        """Block until one request using roughly `tokens` tokens may start
+
+        Returns the number of tokens reserved, to pass to reconcile().
+        """
+        if self.tokens_per_minute:
+            # A single request larger than a minute's budget still has to run
+            tokens = min(tokens, self.tokens_per_minute)
+        while True:
+            with self._lock:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self._request_allowance -= 1
+                    if self.tokens_per_minute:
+                        self._token_allowance -= tokens
+                    return tokens
+            self._sleep(wait)
+
+    def reconcile(self, reserved, used):
+        """Correct a reservation once the request's real token count is known
+
+        Unused tokens go back into the bucket; going over the reservation
+        takes the difference out of it, possibly below zero, which makes the
+        next requests wait longer.
+        """
+        if not self.tokens_per_minute:
+            return
+        with self._lock:
+            self._refill()
+            self._token_allowance = min(float(self.tokens_per_minute),
+                                        self._token_allowance + reserved - used)
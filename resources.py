@@ -0,0 +1,221 @@
+"""Process-wide shared resources.
+
+Streamlit re-runs app.py from the top on every interaction, so anything that
+is expensive to build (database engine, Hugging Face dataset manager, LLM
+clients) is created once per process here. Each browser session then gets its
+own lightweight PostTransformer handle that borrows these shared objects.
+"""
+import atexit
+import logging
+import os
+import threading
+
+from sqlalchemy.orm import scoped_session
+
+from database import create_session_factory
+from db_stats import DatabaseStats
+from example_selector import ExampleSelector
+from huggingface_dataset import HuggingFaceDatasetManager
+from llm_clients import DEFAULT_MODEL, LLMClientRegistry
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache
+from sync_worker import SyncWorker
+from tracing import DEFAULT_BUFFER_SIZE, LogSink, OpenTelemetrySink, RingBufferSink, tracer
+
+_lock = threading.RLock()
+_session_factory = None
+_scoped_session = None
+_dataset_manager = None
+_sync_worker = None
+_response_cache = None
+_example_selector = None
+_db_stats = None
+_llm_registry = None
+_tracing_configured = False
+_trace_sinks = []
+_trace_buffer = None
+
+
+def get_session_factory():
+    """Return the process-wide session factory, creating the engine on first use
+
+    DATABASE_URL selects the database (SQLite by default); DB_POOL_SIZE,
+    DB_BUSY_TIMEOUT_MS and SQLITE_SYNCHRONOUS tune the engine.
+    """
+    global _session_factory
+    with _lock:
+        if _session_factory is None:
+            _session_factory = create_session_factory(
+                pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+                busy_timeout_ms=int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000")),
+                synchronous=os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"))
+        return _session_factory
+
+
+def get_scoped_session():
+    """Return the process-wide thread-local session registry
+
+    It can be used wherever a Session is expected; every thread talks to its
+    own session. Call remove_session() when a thread is done with it.
+    """
+    global _scoped_session
+    with _lock:
+        if _scoped_session is None:
+            _scoped_session = scoped_session(get_session_factory())
+        return _scoped_session
+
+
+def remove_session():
+    """Close the calling thread's session and return its connection to the pool"""
+    if _scoped_session is not None:
+        _scoped_session.remove()
+
+
+def get_dataset_manager():
+    """Return the process-wide Hugging Face dataset manager"""
+    global _dataset_manager
+    with _lock:
+        if _dataset_manager is None:
+            # Lazy so that startup never waits on the Hub
+            _dataset_manager = HuggingFaceDatasetManager(
+                lazy=True,
+                incremental=os.getenv("HF_INCREMENTAL_SYNC", "").lower() in ("1", "true", "yes"))
+        return _dataset_manager
+
+
+def get_db_stats():
+    """Return the process-wide cache of table counts and previews"""
+    global _db_stats
+    with _lock:
+        if _db_stats is None:
+            _db_stats = DatabaseStats()
+        return _db_stats
+
+
+def get_example_selector():
+    """Return the process-wide few-shot example selector"""
+    global _example_selector
+    with _lock:
+        if _example_selector is None:
+            _example_selector = ExampleSelector()
+        return _example_selector
+
+
+def get_response_cache():
+    """Return the process-wide LLM response cache
+
+    RESPONSE_CACHE_PATH and RESPONSE_CACHE_TTL_SECONDS configure the SQLite
+    tier.
+    """
+    global _response_cache
+    with _lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(
+                path=os.getenv("RESPONSE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))))
+        return _response_cache
+
+
+def get_sync_worker():
+    """Return the process-wide Hub sync worker, flushed at interpreter exit
+
+    HF_SYNC_DEBOUNCE_SECONDS and HF_SYNC_DIRTY_THRESHOLD tune how pushes
+    are coalesced.
+    """
+    global _sync_worker
+    with _lock:
+        if _sync_worker is None:
+            _sync_worker = SyncWorker(
+                get_dataset_manager().push_to_hub,
+                debounce_seconds=float(os.getenv("HF_SYNC_DEBOUNCE_SECONDS", "30")),
+                dirty_threshold=int(os.getenv("HF_SYNC_DIRTY_THRESHOLD", "50")))
+            atexit.register(_sync_worker.shutdown)
+        return _sync_worker
+
+
+def get_llm_registry():
+    """Return the process-wide registry of chat models on one HTTP connection pool
+
+    OPENAI_BASE_URL points it at another OpenAI-compatible server and
+    LLM_MAX_CONNECTIONS sizes the pool.
+    """
+    global _llm_registry
+    with _lock:
+        if _llm_registry is None:
+            _llm_registry = LLMClientRegistry(
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")))
+        return _llm_registry
+
+
+def get_llm(api_key, temperature, model=DEFAULT_MODEL):
+    """Return a cached chat model for the given key, model and temperature"""
+    return get_llm_registry().get(api_key, temperature, model=model)
+
+
+def setup_tracing():
+    """Attach the trace sinks named in TRACE_SINKS to the process-wide tracer, once
+
+    TRACE_SINKS is a comma-separated list of "memory" (a ring buffer of the
+    last TRACE_BUFFER_SIZE spans, shown in the app's diagnostics panel),
+    "log" (the `tracing` logger) and "otel" (OpenTelemetry; needs the
+    opentelemetry packages). Tracing is off when it is unset. Returns the
+    ring buffer, or None without the "memory" sink.
+    """
+    global _tracing_configured, _trace_buffer
+    with _lock:
+        if _tracing_configured:
+            return _trace_buffer
+        _tracing_configured = True
+        for name in os.getenv("TRACE_SINKS", "").split(","):
+            name = name.strip().lower()
+            if not name:
+                continue
+            if name == "memory":
+                _trace_buffer = RingBufferSink(
+                    int(os.getenv("TRACE_BUFFER_SIZE", str(DEFAULT_BUFFER_SIZE))))
+                sink = _trace_buffer
+            elif name == "log":
+                logger = logging.getLogger("tracing")
+                if not logger.handlers:
+                    logger.addHandler(logging.StreamHandler())
+                    logger.setLevel(logging.INFO)
+                sink = LogSink(logger)
+            elif name == "otel":
+                try:
+                    sink = OpenTelemetrySink()
+                except ImportError as e:
+                    print(f"Warning: Tracing to OpenTelemetry is disabled: {str(e)}")
+                    continue
+            else:
+                print(f"Warning: Unknown trace sink: {name}")
+                continue
+            _trace_sinks.append(tracer.add_sink(sink))
+        return _trace_buffer
+
+
+def reset():
+    """Drop every cached resource (used by tests and benchmarks)"""
+    global _session_factory, _scoped_session, _dataset_manager, _sync_worker, _response_cache, _example_selector, _db_stats, _llm_registry, _tracing_configured, _trace_buffer
+    with _lock:
+        if _scoped_session is not None:
+            _scoped_session.remove()
+        _scoped_session = None
+        if _sync_worker is not None:
+            atexit.unregister(_sync_worker.shutdown)
+            _sync_worker.shutdown(flush=False, timeout=1.0)
+        _session_factory = None
+        _dataset_manager = None
+        _sync_worker = None
+        if _response_cache is not None:
+            _response_cache.close()
+        _response_cache = None
+        _example_selector = None
+        _db_stats = None
+        if _llm_registry is not None:
+            _llm_registry.close()
+        _llm_registry = None
+        for sink in _trace_sinks:
+            tracer.remove_sink(sink)
+        _trace_sinks.clear()
+        _trace_buffer = None
+        _tracing_configured = False
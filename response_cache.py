@@ -0,0 +1,158 @@
+"""Content-addressed cache for LLM responses.
+
+Entries are keyed by a hash of the fully rendered prompt and the model
+parameters, so the same text, platform, prompt, model and temperature map to
+the same key. Lookups hit a small in-memory LRU first and fall back to a
+SQLite table that survives restarts. Both tiers honour a TTL and a size bound.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = "response_cache.db"
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_memory_entries=256,
+                 max_disk_entries=10000, ttl_seconds=7 * 24 * 3600):
+        """Open (or create) the cache; path=None keeps only the memory tier"""
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, latency REAL NOT NULL, "
+                "created_at REAL NOT NULL, last_used REAL NOT NULL)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_responses_last_used ON responses (last_used)")
+            self._conn.commit()
+            self._disk_entries = self._conn.execute(
+                "SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(messages, **params):
+        """Hash rendered chat messages plus model parameters into a cache key"""
+        payload = json.dumps({
+            "messages": [[message.type, message.content] for message in messages],
+            "params": params,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key):
+        """Return the cached response text, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, latency, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    self.saved_seconds += latency
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, latency, created_at FROM responses WHERE key = ?",
+                    (key,)).fetchone()
+                if row is not None:
+                    value, latency, created_at = row
+                    if not self._expired(created_at, now):
+                        self._conn.execute(
+                            "UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, (value, latency, created_at))
+                        self.disk_hits += 1
+                        self.saved_seconds += latency
+                        return value
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self._disk_entries -= 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value, latency=0.0):
+        """Store a response along with how long it took to generate"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, (value, latency, now))
+            if self._conn is not None:
+                cursor = self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, latency, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?)", (key, value, latency, now, now))
+                # REPLACE reports one change even when overwriting, so the count can
+                # drift high; _evict_disk re-counts exactly
+                self._disk_entries += cursor.rowcount
+                if self._disk_entries > self.max_disk_entries:
+                    self._evict_disk()
+                self._conn.commit()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop expired rows, then the least recently used ones over the bound"""
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?",
+                               (time.time() - self.ttl_seconds,))
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,))
+            count -= excess
+        self._disk_entries = count
+
+    def stats(self):
+        """Hit/miss counts, hit ratio and generation time saved by hits"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "saved_seconds": self.saved_seconds,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+                self._disk_entries = 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,215 @@
+"""Full-text search over stored examples and transformations.
+
+On SQLite the examples and transformations tables each get an FTS5 index
+(external content, so the text is not stored twice) that triggers keep in
+sync on every insert, update and delete. Results are ranked with bm25. Other
+databases fall back to an unranked LIKE scan.
+
+VACUUM may renumber the rowids the index points at; run
+
+    python search_index.py rebuild
+
+afterwards (or whenever the index looks out of date). After bulk imports,
+`python search_index.py optimize` merges the index for faster queries.
+"""
+import argparse
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import DateTime, literal_column, or_, select, table, text
+
+from database import Example, Transformation, create_db_engine
+
+DEFAULT_LIMIT = 20
+
+# name -> (content table, indexed columns)
+FTS_TABLES = {
+    "examples": ("examples", ("content",)),
+    "transformations": ("transformations", ("original_text", "transformed_text")),
+}
+
+MODELS = {"examples": Example, "transformations": Transformation}
+
+QUERY_TOKEN = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def _fts_name(kind):
+    return f"{FTS_TABLES[kind][0]}_fts"
+
+
+def is_supported(bind):
+    return bind.dialect.name == "sqlite"
+
+
+def _insert_trigger_sql(kind):
+    table, columns = FTS_TABLES[kind]
+    fts = _fts_name(kind)
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    return (f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END")
+
+
+def ensure_search_index(engine):
+    """Create the FTS5 tables and sync triggers if missing; index existing rows once"""
+    if not is_supported(engine):
+        return
+    with engine.begin() as conn:
+        for kind, (table, columns) in FTS_TABLES.items():
+            fts = _fts_name(kind)
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": fts}).first()
+            column_list = ", ".join(columns)
+            new_values = ", ".join(f"new.{column}" for column in columns)
+            old_values = ", ".join(f"old.{column}" for column in columns)
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{column_list}, content='{table}', content_rowid='rowid', "
+                f"tokenize='unicode61 remove_diacritics 2')"))
+            conn.execute(text(_insert_trigger_sql(kind)))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column_list}) "
+                f"VALUES ('delete', old.rowid, {old_values}); END"))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column_list}) "
+                f"VALUES ('delete', old.rowid, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.rowid, {new_values}); END"))
+            if not exists:
+                # Rows written before the index existed
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+
+@contextmanager
+def deferred_indexing(conn, kind):
+    """Index rows inserted inside the block with one statement instead of row by row
+
+    Must run inside a transaction: the insert trigger is dropped and
+    recreated within it, so other writers (which SQLite serialises behind
+    this transaction) never see it missing.
+    """
+    if not is_supported(conn):
+        yield
+        return
+    table, columns = FTS_TABLES[kind]
+    fts = _fts_name(kind)
+    column_list = ", ".join(columns)
+    last_rowid = conn.execute(text(f"SELECT max(rowid) FROM {table}")).scalar() or 0
+    conn.execute(text(f"DROP TRIGGER IF EXISTS {fts}_ai"))
+    yield
+    conn.execute(text(
+        f"INSERT INTO {fts}(rowid, {column_list}) "
+        f"SELECT rowid, {column_list} FROM {table} WHERE rowid > :last_rowid"),
+        {"last_rowid": last_rowid})
+    conn.execute(text(_insert_trigger_sql(kind)))
+
+
+def optimize_search_index(engine):
+    """Merge the index segments left by many small writes (worth doing after bulk loads)"""
+    if not is_supported(engine):
+        return
+    with engine.begin() as conn:
+        for kind in FTS_TABLES:
+            fts = _fts_name(kind)
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('optimize')"))
+
+
+def rebuild_search_index(engine):
+    """Re-index every row from scratch and merge the index into one segment"""
+    if not is_supported(engine):
+        return
+    ensure_search_index(engine)
+    with engine.begin() as conn:
+        for kind in FTS_TABLES:
+            fts = _fts_name(kind)
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    optimize_search_index(engine)
+
+
+def to_match_query(query, prefix=False):
+    """Turn free text into an FTS5 query that ANDs its words
+
+    Words are quoted so user input can't inject FTS5 operators; a trailing
+    * is kept as a prefix search. prefix=True makes every word one.
+    """
+    terms = []
+    for token in QUERY_TOKEN.findall(query):
+        word = token.rstrip("*")
+        terms.append(f'"{word}"*' if prefix or token.endswith("*") else f'"{word}"')
+    return " ".join(terms)
+
+
+def matching_rowids(kind, match):
+    """SELECT of the rowids whose indexed text matches an FTS5 query (SQLite only)"""
+    fts = _fts_name(kind)
+    return (select(literal_column("rowid"))
+            .select_from(table(fts))
+            .where(text(f"{fts} MATCH :match").bindparams(match=match)))
+
+
+def search(session, query, kind="transformations", platform=None, limit=DEFAULT_LIMIT):
+    """Best-matching rows for query, best first
+
+    kind is "transformations" or "examples". Returns dicts with id,
+    platform, created_at, snippet and score (lower bm25 is better; None
+    without FTS).
+    """
+    match = to_match_query(query)
+    if not match:
+        return []
+    if not is_supported(session.get_bind()):
+        return _like_search(session, query, kind, platform, limit)
+
+    table = FTS_TABLES[kind][0]
+    fts = _fts_name(kind)
+    # Snippet from the column most likely to be shown: the post itself
+    snippet_column = len(FTS_TABLES[kind][1]) - 1
+    platform_filter = "AND t.platform = :platform" if platform else ""
+    rows = session.execute(text(
+        f"SELECT t.id, t.platform, t.created_at, "
+        f"snippet({fts}, {snippet_column}, '[', ']', '…', 16), bm25({fts}) AS score "
+        f"FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid "
+        f"WHERE {fts} MATCH :match {platform_filter} "
+        f"ORDER BY score LIMIT :limit").columns(created_at=DateTime),
+        {"match": match, "platform": platform, "limit": limit})
+    return [{"id": row_id, "platform": row_platform, "created_at": created_at,
+             "snippet": snippet, "score": score}
+            for row_id, row_platform, created_at, snippet, score in rows]
+
+
+def _like_search(session, query, kind, platform, limit):
+    model = MODELS[kind]
+    columns = [getattr(model, column) for column in FTS_TABLES[kind][1]]
+    statement = select(model.id, model.platform, model.created_at, columns[-1])
+    for word in QUERY_TOKEN.findall(query):
+        pattern = f"%{word.rstrip('*')}%"
+        statement = statement.where(or_(*[column.ilike(pattern) for column in columns]))
+    if platform:
+        statement = statement.where(model.platform == platform)
+    statement = statement.order_by(model.created_at.desc()).limit(limit)
+    return [{"id": row_id, "platform": row_platform, "created_at": created_at,
+             "snippet": body[:200], "score": None}
+            for row_id, row_platform, created_at, body in session.execute(statement)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the full-text search index")
+    parser.add_argument("command", choices=["rebuild", "optimize"])
+    parser.add_argument("--db-url", help="Database URL (defaults to DATABASE_URL or the local SQLite file)")
+    args = parser.parse_args()
+
+    engine = create_db_engine(args.db_url)
+    if not is_supported(engine):
+        parser.error("full-text search indexes are only maintained on SQLite")
+    if args.command == "rebuild":
+        rebuild_search_index(engine)
+        print("Search index rebuilt")
+    else:
+        optimize_search_index(engine)
+        print("Search index optimized")
+
+
+if __name__ == "__main__":
+    main()
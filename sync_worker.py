@@ -0,0 +1,201 @@
+"""Background worker that coalesces Hugging Face Hub pushes.
+
+Instead of starting a new thread (and a full upload) for every saved
+transformation, callers mark the dataset dirty with request_sync(). A single
+worker thread per process waits until either the debounce window has passed
+or enough dirty rows have piled up, then runs one push for all of them.
+"""
+import threading
+import time
+
+from tracing import tracer
+
+
+class SyncWorker:
+    def __init__(self, push_fn, debounce_seconds=30.0, dirty_threshold=50,
+                 max_retries=3, backoff_seconds=2.0, max_backoff_seconds=60.0):
+        """Create a worker around push_fn (e.g. HuggingFaceDatasetManager.push_to_hub)
+
+        A push happens debounce_seconds after the first pending request, or
+        as soon as dirty_threshold rows are pending, whichever comes first.
+        Failed pushes are retried with exponential backoff.
+        """
+        self.push_fn = push_fn
+        self.debounce_seconds = debounce_seconds
+        self.dirty_threshold = dirty_threshold
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._flush_requested = False
+        self._pushing = False
+        self._pending_requests = 0
+        self._dirty_rows = 0
+        self._first_dirty_at = None
+        self._rounds = 0
+        self._last_round_failed = False
+
+        # Counters
+        self.pushes_requested = 0
+        self.pushes_done = 0
+        self.pushes_failed = 0
+        self.pushes_avoided = 0
+
+    @property
+    def queue_depth(self):
+        """Sync requests waiting for the next push"""
+        with self._cond:
+            return self._pending_requests
+
+    def stats(self):
+        """Snapshot of the worker counters"""
+        with self._cond:
+            return {
+                "pushes_requested": self.pushes_requested,
+                "pushes_done": self.pushes_done,
+                "pushes_failed": self.pushes_failed,
+                "pushes_avoided": self.pushes_avoided,
+                "queue_depth": self._pending_requests,
+                "dirty_rows": self._dirty_rows,
+            }
+
+    def start(self):
+        """Start the worker thread if it is not running yet"""
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run,
+                                                name="hf-sync-worker",
+                                                daemon=True)
+                self._thread.start()
+        return self
+
+    def request_sync(self, dirty_rows=1):
+        """Mark rows as dirty; they are pushed with the next coalesced push"""
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Sync worker is shut down")
+            self.pushes_requested += 1
+            self._pending_requests += 1
+            self._dirty_rows += dirty_rows
+            if self._first_dirty_at is None:
+                self._first_dirty_at = time.monotonic()
+            self._cond.notify_all()
+        self.start()
+
+    def flush(self, timeout=None):
+        """Push pending rows now and wait for it
+
+        Returns True once nothing is pending, False if a push failed or the
+        timeout expired first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if not self._pending_requests and not self._pushing:
+                return True
+            start_round = self._rounds
+            self._flush_requested = True
+            self._cond.notify_all()
+        self.start()
+        with self._cond:
+            while self._pending_requests or self._pushing:
+                if self._rounds > start_round and self._last_round_failed:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return not (self._rounds > start_round and self._last_round_failed)
+
+    def shutdown(self, flush=True, timeout=30.0):
+        """Stop the worker, pushing any pending rows first when flush is True"""
+        if flush:
+            self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _push_due(self):
+        if not self._pending_requests:
+            return False
+        if self._flush_requested:
+            return True
+        if self._dirty_rows >= self.dirty_threshold:
+            return True
+        return time.monotonic() - self._first_dirty_at >= self.debounce_seconds
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    if self._push_due():
+                        break
+                    timeout = None
+                    if self._first_dirty_at is not None:
+                        timeout = max(0.0, self._first_dirty_at + self.debounce_seconds - time.monotonic())
+                    self._cond.wait(timeout)
+
+                # Take everything that is pending; new requests start a new window
+                requests = self._pending_requests
+                dirty_rows = self._dirty_rows
+                self._pending_requests = 0
+                self._dirty_rows = 0
+                self._first_dirty_at = None
+                self._flush_requested = False
+                self._pushing = True
+
+            with tracer.span("sync_push", requests=requests, dirty_rows=dirty_rows) as span:
+                succeeded = self._push_with_retries()
+                span.set(succeeded=bool(succeeded))
+
+            with self._cond:
+                self._pushing = False
+                self._rounds += 1
+                self._last_round_failed = not succeeded
+                if succeeded:
+                    self.pushes_done += 1
+                    self.pushes_avoided += requests - 1
+                else:
+                    self.pushes_failed += 1
+                    if succeeded is False and not self._stopping:
+                        # Keep the rows dirty so a later push picks them up
+                        self._pending_requests += requests
+                        self._dirty_rows += dirty_rows
+                        if self._first_dirty_at is None:
+                            self._first_dirty_at = time.monotonic()
+                self._cond.notify_all()
+
+    def _push_with_retries(self):
+        """Run push_fn with backoff
+
+        Returns True on success, False when retries ran out (rows stay dirty)
+        and None for configuration errors that no retry can fix.
+        """
+        delay = self.backoff_seconds
+        for attempt in range(self.max_retries + 1):
+            try:
+                with tracer.span("push_attempt", attempt=attempt + 1):
+                    self.push_fn()
+                return True
+            except ValueError as e:
+                # Missing token or repo name: retrying will not help
+                print(f"Auto-sync failed: {str(e)}")
+                return None
+            except Exception as e:
+                print(f"Auto-sync failed (attempt {attempt + 1}): {str(e)}")
+                if attempt == self.max_retries:
+                    return False
+                with self._cond:
+                    if self._stopping:
+                        return False
+                    self._cond.wait(delay)
+                delay = min(delay * 2, self.max_backoff_seconds)
+        return False
@@ -6,9 +6,24 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import test modules
-from test_database import TestDatabase
+from test_database import TestDatabase, TestEngineFactory
 from test_transformer import TestPostTransformer
 from test_app import TestApp
+from test_huggingface_dataset import TestHuggingFaceDatasetManager, TestIncrementalPush
+from test_sync_worker import TestSyncWorker
+from test_rate_limiter import TestRateLimiter
+from test_response_cache import TestResponseCache
+from test_example_selector import TestExampleIndex, TestExampleSelector
+from test_db_stats import TestDatabaseStats
+from test_history import TestHistory
+from test_search_index import TestSearchIndex
+from test_import_examples import TestImportExamples
+from test_dedupe import TestDedupe, TestUpsert
+from test_dataset_tools import TestDatasetStats, TestFineTuningExport, TestFineTuningFilter
+from test_llm_clients import TestLLMClientRegistry
+from test_load_test import TestFakeChatModel, TestLoadTest
+from test_perf_baseline import TestPerfBaseline
+from test_tracing import TestTracer, TestPipelineTracing
 
 if __name__ == '__main__':
     # Create a test suite
@@ -16,8 +31,31 @@ if __name__ == '__main__':
     
     # Add test cases
     test_suite.addTest(unittest.makeSuite(TestDatabase))
+    test_suite.addTest(unittest.makeSuite(TestEngineFactory))
     test_suite.addTest(unittest.makeSuite(TestPostTransformer))
     test_suite.addTest(unittest.makeSuite(TestApp))
+    test_suite.addTest(unittest.makeSuite(TestHuggingFaceDatasetManager))
+    test_suite.addTest(unittest.makeSuite(TestIncrementalPush))
+    test_suite.addTest(unittest.makeSuite(TestSyncWorker))
+    test_suite.addTest(unittest.makeSuite(TestRateLimiter))
+    test_suite.addTest(unittest.makeSuite(TestResponseCache))
+    test_suite.addTest(unittest.makeSuite(TestExampleIndex))
+    test_suite.addTest(unittest.makeSuite(TestExampleSelector))
+    test_suite.addTest(unittest.makeSuite(TestDatabaseStats))
+    test_suite.addTest(unittest.makeSuite(TestHistory))
+    test_suite.addTest(unittest.makeSuite(TestSearchIndex))
+    test_suite.addTest(unittest.makeSuite(TestImportExamples))
+    test_suite.addTest(unittest.makeSuite(TestDedupe))
+    test_suite.addTest(unittest.makeSuite(TestUpsert))
+    test_suite.addTest(unittest.makeSuite(TestDatasetStats))
+    test_suite.addTest(unittest.makeSuite(TestFineTuningExport))
+    test_suite.addTest(unittest.makeSuite(TestFineTuningFilter))
+    test_suite.addTest(unittest.makeSuite(TestLLMClientRegistry))
+    test_suite.addTest(unittest.makeSuite(TestFakeChatModel))
+    test_suite.addTest(unittest.makeSuite(TestLoadTest))
+    test_suite.addTest(unittest.makeSuite(TestPerfBaseline))
+    test_suite.addTest(unittest.makeSuite(TestTracer))
+    test_suite.addTest(unittest.makeSuite(TestPipelineTracing))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
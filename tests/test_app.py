@@ -9,6 +9,7 @@ sys.path.insert(0,
                 os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import main
+from tracing import RingBufferSink, Tracer
 
 
 # Mock session state needs to be updated to handle attribute-style access
@@ -18,7 +19,8 @@ class MockSessionState(dict):
     def __getattr__(self, key):
         if key in self:
             return self[key]
-        return None
+        # Like Streamlit's SessionState, missing keys are an error
+        raise AttributeError(f'st.session_state has no attribute "{key}"')
 
     def __setattr__(self, key, value):
         self[key] = value
@@ -37,6 +39,10 @@ class TestApp(unittest.TestCase):
         self.mock_transformer = MagicMock()
         self.mock_transformer_class.return_value = self.mock_transformer
 
+        # Mock the process-wide resources so no real engine or dataset is built
+        self.resources_patcher = patch('app.resources')
+        self.mock_resources = self.resources_patcher.start()
+
         # Mock session state with our custom class that supports attribute access
         self.mock_session_state = MockSessionState()
         self.mock_session_state[
@@ -57,9 +63,21 @@ class TestApp(unittest.TestCase):
         # Mock selectbox to return the platform string directly
         self.mock_st.selectbox.return_value = "LinkedIn"
 
+        # History stays switched off unless a test turns it on
+        self.mock_st.toggle.return_value = False
+        self.mock_st.columns.side_effect = lambda n: [MagicMock() for _ in range(n)]
+
+        # Cache statistics shown in the sidebar
+        self.mock_resources.get_response_cache.return_value.stats.return_value = {
+            "hit_ratio": 0.5, "saved_seconds": 1.5}
+
+        # Tracing is off unless a test turns it on
+        self.mock_resources.setup_tracing.return_value = None
+
     def tearDown(self):
         self.streamlit_patcher.stop()
         self.transformer_patcher.stop()
+        self.resources_patcher.stop()
         self.env_patcher.stop()
         self.dotenv_patcher.stop()
 
@@ -79,6 +97,75 @@ class TestApp(unittest.TestCase):
         # Verify transformer was initialized
         self.mock_transformer_class.assert_called_once()
 
+    def test_sidebar_uses_aggregate_queries(self):
+        self.mock_transformer.count_examples.return_value = 7
+        self.mock_transformer.recent_example_previews.return_value = [
+            "First line\nSecond line\nThird line"]
+
+        main()
+
+        self.mock_st.write.assert_any_call("Total examples for LinkedIn: **7**")
+        self.mock_st.text.assert_any_call("First line\nSecond line")
+        self.mock_transformer.count_examples.assert_called_with("LinkedIn")
+        self.mock_transformer.recent_example_previews.assert_called_with("LinkedIn")
+
+    def test_transformer_reused_across_reruns(self):
+        # Simulate two Streamlit reruns within the same browser session
+        main()
+        main()
+
+        # The session handle is built once and the shared resources are used
+        self.mock_transformer_class.assert_called_once()
+        self.mock_resources.get_dataset_manager.assert_called_once()
+        self.mock_resources.get_scoped_session.assert_called_once()
+        self.assertIs(self.mock_session_state["transformer"],
+                      self.mock_transformer)
+
+    def test_history_not_queried_until_shown(self):
+        main()
+        self.mock_transformer.history_page.assert_not_called()
+
+    def test_history_page_rendered_when_shown(self):
+        self.mock_st.toggle.return_value = True
+        self.mock_st.text_input.return_value = ""
+        self.mock_st.button.return_value = False
+        self.mock_transformer.history_page.return_value = {
+            "rows": [{"id": "t1", "created_at": "2025-01-01 00:00:00",
+                      "original_preview": "Original", "transformed_preview": "Post",
+                      "truncated": False}],
+            "next_cursor": None}
+
+        main()
+
+        self.mock_transformer.history_page.assert_called_once_with(
+            "LinkedIn", cursor=None, search=None)
+        self.mock_st.text.assert_any_call("Post")
+        self.mock_transformer.get_transformation.assert_not_called()
+
+    def test_diagnostics_hidden_without_trace_buffer(self):
+        main()
+        self.assertNotIn(call("Diagnostics"), self.mock_st.expander.call_args_list)
+
+    def test_diagnostics_rendered_from_trace_buffer(self):
+        trace_buffer = RingBufferSink()
+        tracer = Tracer([trace_buffer])
+        with tracer.span("transform_post"):
+            with tracer.span("llm_call", total_tokens=42):
+                pass
+        self.mock_resources.setup_tracing.return_value = trace_buffer
+        self.mock_st.toggle.side_effect = lambda label, key=None: key == "show_diagnostics"
+        self.mock_st.button.return_value = False
+
+        main()
+
+        self.mock_st.expander.assert_any_call("Diagnostics")
+        rows = self.mock_st.dataframe.call_args[0][0]
+        self.assertEqual({row["stage"]: row["tokens"] for row in rows},
+                         {"transform_post": None, "llm_call": 42})
+        trace_text = self.mock_st.code.call_args_list[-1][0][0]
+        self.assertTrue(trace_text.startswith("transform_post"))
+        self.assertIn("\n  llm_call", trace_text)
+
     def test_platform_selection(self):
         # Set up session state
         self.mock_session_state["platform"] = "LinkedIn"
@@ -97,8 +184,9 @@ class TestApp(unittest.TestCase):
         self.mock_st.text_area.side_effect = lambda *args, **kwargs: "Test input text" if kwargs.get(
             "key") is None else "Test example"
 
-        # Mock the transformer response
-        self.mock_transformer.transform_post.return_value = "Transformed text"
+        # Mock the streamed transformer response
+        self.mock_transformer.transform_post_stream.side_effect = lambda *args, **kwargs: (
+            chunk for chunk in ["Transformed ", "text"])
 
         # Mock the button to return True for "Transform ✨"
         self.mock_st.button.side_effect = lambda label, *args, **kwargs: True if label == "Transform ✨" else False
@@ -106,14 +194,43 @@ class TestApp(unittest.TestCase):
         # Run the app
         main()
 
-        # Verify transform_post was called with the right arguments
-        self.mock_transformer.transform_post.assert_called_with(
-            "Test input text", "LinkedIn")
+        # Verify the streaming transform was called with the right arguments
+        self.mock_transformer.transform_post_stream.assert_called_with(
+            "Test input text", "LinkedIn", bypass_cache=ANY)
+
+        # Verify the full post was rendered and saved
+        self.mock_st.empty.return_value.code.assert_called_with(
+            "Transformed text", language=None)
+        self.mock_transformer.save_transformation.assert_called_once_with(
+            "Test input text", "Transformed text", ANY)
 
         # Verify success message was shown
         self.mock_st.success.assert_called_with(
             "Your transformed post is ready!")
 
+        # Verify the Hub sync went to the shared worker instead of a new thread
+        self.mock_resources.get_sync_worker.return_value.request_sync.assert_called_once()
+
+    def test_transform_all_button_click(self):
+        self.mock_st.text_area.side_effect = lambda *args, **kwargs: "Test input text" if kwargs.get(
+            "key") is None else "Test example"
+        posts = {"LinkedIn": "Long post", "Twitter": "Short post", "Instagram": "Post 📸"}
+        self.mock_transformer.transform_all.return_value = posts
+        self.mock_transformer.save_all.return_value = 3
+        self.mock_st.tabs.side_effect = lambda labels: [MagicMock() for _ in labels]
+        self.mock_st.button.side_effect = lambda label, *args, **kwargs: label == "Transform for all platforms"
+
+        main()
+
+        self.mock_transformer.transform_all.assert_called_once_with("Test input text", bypass_cache=ANY)
+        self.mock_st.tabs.assert_called_once_with(["LinkedIn", "Twitter", "Instagram"])
+        self.mock_st.code.assert_any_call("Post 📸", language=None)
+        # Every platform saved together, then one background sync
+        self.mock_transformer.save_all.assert_called_once_with("Test input text", posts, ANY)
+        self.mock_transformer.save_transformation.assert_not_called()
+        self.mock_resources.get_sync_worker.return_value.request_sync.assert_called_once_with(
+            dirty_rows=3)
+
     def test_empty_input_warning(self):
         # Set up session state
         self.mock_session_state["platform"] = "LinkedIn"
@@ -131,8 +248,9 @@ class TestApp(unittest.TestCase):
         # Verify warning was shown for empty input
         self.mock_st.warning.assert_called_with(ANY)
 
-        # Verify transform_post was not called
+        # Verify no transform was started
         self.mock_transformer.transform_post.assert_not_called()
+        self.mock_transformer.transform_post_stream.assert_not_called()
 
     def test_add_example(self):
         # Set up session state
@@ -1,12 +1,15 @@
 import unittest
 import os
+import threading
 import uuid
 from datetime import datetime
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 
 from database import (
-    Base, LinkedInExample, TwitterExample, InstagramExample,
+    Base, LegacyBase, Example, Transformation, migrate_legacy_tables,
+    create_db_engine, create_scoped_session, create_session_factory,
+    LinkedInExample, TwitterExample, InstagramExample,
     LinkedInTransformation, TwitterTransformation, InstagramTransformation
 )
 
@@ -16,12 +19,15 @@ class TestDatabase(unittest.TestCase):
         self.test_db_path = "test_social_sculptor.db"
         self.engine = create_engine(f'sqlite:///{self.test_db_path}')
         Base.metadata.create_all(self.engine)
+        # An older database that still has the per-platform tables
+        LegacyBase.metadata.create_all(self.engine)
         self.Session = sessionmaker(bind=self.engine)
         self.session = self.Session()
     
     def tearDown(self):
         # Clean up the test database
         self.session.close()
+        self.engine.dispose()
         if os.path.exists(self.test_db_path):
             os.remove(self.test_db_path)
     
@@ -115,5 +121,153 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(retrieved.transformed_text, "Transformed Instagram text")
         self.assertIsInstance(retrieved.created_at, datetime)
 
+    def test_unified_transformation_stores_metadata(self):
+        transformation = Transformation(
+            id=str(uuid.uuid4()),
+            platform="Twitter",
+            original_text="Original text",
+            transformed_text="Transformed text",
+            meta={"model": "gpt-4o-mini", "temperature": 0.7}
+        )
+        self.session.add(transformation)
+        self.session.commit()
+
+        retrieved = self.session.query(Transformation).filter(
+            Transformation.platform == "Twitter").first()
+        self.assertEqual(retrieved.meta, {"model": "gpt-4o-mini", "temperature": 0.7})
+        self.assertIsInstance(retrieved.created_at, datetime)
+
+    def test_platform_created_at_indexes(self):
+        for model in (Example, Transformation):
+            columns = [[column.name for column in index.columns][:2]
+                       for index in model.__table__.indexes]
+            self.assertIn(['platform', 'created_at'], columns)
+
+    def test_migrate_legacy_tables(self):
+        self.session.add_all([
+            LinkedInExample(id="ex-1", content="LinkedIn example"),
+            InstagramExample(id="ex-2", content="Instagram example"),
+            TwitterTransformation(id="tr-1", original_text="Original",
+                                  transformed_text="Tweet"),
+        ])
+        self.session.commit()
+
+        moved = migrate_legacy_tables(self.engine)
+        self.assertEqual(moved, {"examples": 2, "transformations": 1})
+
+        examples = {e.id: e for e in self.session.query(Example).all()}
+        self.assertEqual(examples["ex-1"].platform, "LinkedIn")
+        self.assertEqual(examples["ex-2"].content, "Instagram example")
+        transformation = self.session.query(Transformation).one()
+        self.assertEqual((transformation.platform, transformation.transformed_text),
+                         ("Twitter", "Tweet"))
+        self.assertEqual(self.session.query(LinkedInExample).count(), 0)
+
+        # Running it again is a no-op
+        self.assertEqual(migrate_legacy_tables(self.engine),
+                         {"examples": 0, "transformations": 0})
+
+    def test_new_database_has_no_legacy_tables(self):
+        path = "test_no_legacy.db"
+        try:
+            engine = create_session_factory(f"sqlite:///{path}").kw["bind"]
+            tables = set(inspect(engine).get_table_names())
+            self.assertIn("examples", tables)
+            self.assertFalse(tables & set(LegacyBase.metadata.tables))
+            self.assertEqual(migrate_legacy_tables(engine),
+                             {"examples": 0, "transformations": 0})
+            engine.dispose()
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+class TestEngineFactory(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_engine_factory.db"
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.test_db_path + suffix):
+                os.remove(self.test_db_path + suffix)
+
+    def test_sqlite_pragmas(self):
+        engine = create_db_engine(f'sqlite:///{self.test_db_path}', busy_timeout_ms=1234)
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA journal_mode")).scalar(), "wal")
+            # NORMAL
+            self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 1)
+            self.assertEqual(conn.execute(text("PRAGMA busy_timeout")).scalar(), 1234)
+        engine.dispose()
+
+    def test_sqlite_synchronous_is_validated(self):
+        engine = create_db_engine(f'sqlite:///{self.test_db_path}', synchronous="full")
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 2)
+        engine.dispose()
+        engine = create_db_engine(f'sqlite:///{self.test_db_path}', synchronous=0)
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("PRAGMA synchronous")).scalar(), 0)
+        engine.dispose()
+
+        for value in ("FAST", "4", "NORMAL; DROP TABLE examples"):
+            with self.assertRaises(ValueError):
+                create_db_engine(f'sqlite:///{self.test_db_path}', synchronous=value)
+
+    def test_database_url_from_environment(self):
+        os.environ["DATABASE_URL"] = f'sqlite:///{self.test_db_path}'
+        try:
+            engine = create_db_engine()
+        finally:
+            del os.environ["DATABASE_URL"]
+        self.assertEqual(engine.url.database, self.test_db_path)
+        engine.dispose()
+
+    def test_in_memory_database_is_shared_between_threads(self):
+        Session = create_scoped_session('sqlite://')
+        Session.add(Example(id="main", platform="LinkedIn", content="from main thread"))
+        Session.commit()
+
+        seen = []
+        def read():
+            seen.append(Session.query(Example).count())
+            Session.remove()
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, [1])
+        Session.remove()
+
+    def test_scoped_sessions_handle_concurrent_writers(self):
+        Session = create_scoped_session(f'sqlite:///{self.test_db_path}')
+        sessions = []
+        errors = []
+
+        def write(worker):
+            try:
+                sessions.append(Session())
+                for i in range(20):
+                    Session.add(Transformation(
+                        id=f"{worker}-{i}", platform="Twitter",
+                        original_text=f"Original {worker}-{i}", transformed_text="Tweet"))
+                    Session.commit()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                Session.remove()
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        # Every thread had its own session
+        self.assertEqual(len({id(session) for session in sessions}), 8)
+        self.assertEqual(Session.query(Transformation).count(), 160)
+        Session.remove()
+        Session.get_bind().dispose()
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
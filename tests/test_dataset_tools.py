@@ -0,0 +1,215 @@
+import unittest
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+from datasets import Dataset, DatasetDict
+
+from dataset_tools import (FineTuningFilter, arrow_table, compute_platform_stats,
+                           export_fine_tuning_data, parse_metadata, prepare_for_fine_tuning)
+
+
+class TestDatasetStats(unittest.TestCase):
+    def setUp(self):
+        self.dataset = Dataset.from_dict({
+            # The first row is the dummy row that establishes the schema
+            "original_text": ["", "Shipped it", "We hit 1M users today"],
+            "transformed_text": ["", "Shipped 🚀🎉", "1M users! Thank you all 🙏"],
+            "metadata": ["{}",
+                         json.dumps({"model": "gpt-4o-mini", "temperature": 0.5,
+                                     "example_count": 3, "timestamp": "2025-01-01T10:00:00",
+                                     "word_count_original": 2}),
+                         json.dumps({"model": "gpt-4o", "temperature": 0.9,
+                                     "timestamp": "2025-02-01T10:00:00.123456"})],
+        })
+
+    def test_text_distributions(self):
+        stats = compute_platform_stats(arrow_table(self.dataset))
+        self.assertEqual(stats["total_examples"], 3)
+        self.assertEqual(stats["original_length"]["total"], len("Shipped it") + len("We hit 1M users today"))
+        self.assertAlmostEqual(stats["avg_original_length"], 31 / 3)
+        self.assertEqual(stats["original_words"]["total"], 7)
+        self.assertEqual(stats["transformed_emoji"]["total"], 3)
+        self.assertEqual(stats["original_length"]["p50"], 10)
+
+    def test_metadata_summary(self):
+        stats = compute_platform_stats(arrow_table(self.dataset))
+        self.assertEqual(stats["models"], {"gpt-4o-mini": 1, "gpt-4o": 1})
+        self.assertAlmostEqual(stats["avg_temperature"], 0.7)
+        self.assertEqual(stats["first_timestamp"], datetime(2025, 1, 1, 10))
+
+    def test_parse_metadata_is_typed(self):
+        metadata = parse_metadata(arrow_table(self.dataset)["metadata"])
+        self.assertEqual(metadata.num_rows, 3)
+        self.assertEqual(metadata["example_count"].to_pylist(), [None, 3, None])
+        self.assertEqual(str(metadata.schema.field("temperature").type), "double")
+
+    def test_badly_typed_metadata_rows_are_coerced_or_nulled(self):
+        rows = Dataset.from_dict({
+            "original_text": ["a", "b", "c", "d"],
+            "transformed_text": ["A", "B", "C", "D"],
+            "metadata": [json.dumps({"model": "gpt-4o", "temperature": 0.5}),
+                         # An older writer stored numbers as strings
+                         json.dumps({"model": "gpt-4o", "temperature": "0.9",
+                                     "example_count": "many"}),
+                         json.dumps({"model": 4, "timestamp": "yesterday"}),
+                         "not json"],
+        })
+        metadata = parse_metadata(arrow_table(rows)["metadata"])
+        self.assertEqual(metadata.schema, parse_metadata(
+            arrow_table(self.dataset)["metadata"]).schema)
+        self.assertEqual(metadata["temperature"].to_pylist(), [0.5, 0.9, None, None])
+        self.assertEqual(metadata["example_count"].to_pylist(), [None] * 4)
+        self.assertEqual(metadata["model"].to_pylist(), ["gpt-4o", "gpt-4o", None, None])
+
+        stats = compute_platform_stats(arrow_table(rows))
+        self.assertEqual(stats["models"], {"gpt-4o": 2})
+        self.assertAlmostEqual(stats["avg_temperature"], 0.7)
+
+    def test_empty_split(self):
+        empty = Dataset.from_dict({"original_text": [], "transformed_text": [], "metadata": []})
+        stats = compute_platform_stats(arrow_table(empty))
+        self.assertEqual(stats["total_examples"], 0)
+        self.assertEqual(stats["avg_transformed_length"], 0.0)
+        self.assertEqual(stats["models"], {})
+
+
+class TestFineTuningExport(unittest.TestCase):
+    def setUp(self):
+        self.dataset = DatasetDict({
+            "linkedin": Dataset.from_dict({
+                "original_text": ["We hit 1M users", 'She said "ship it"', "Café ☕"],
+                "transformed_text": ["1M users! 🚀", "Shipped.\nFinally.", "Coffee time"],
+                "metadata": ["{}", "{}", "{}"],
+            }),
+            "twitter": Dataset.from_dict({
+                "original_text": ["Launch day"],
+                "transformed_text": ["It's live 🎉"],
+                "metadata": ["{}"],
+            }),
+        })
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lines_match_chat_format(self):
+        output = io.StringIO()
+        summary = export_fine_tuning_data(self.dataset, output, batch_size=2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(summary["examples"], 4)
+        self.assertEqual(summary["platforms"], {"linkedin": 3, "twitter": 1})
+        self.assertEqual(lines[1], json.dumps({"messages": [
+            {"role": "system", "content": "You are a content optimizer for linkedin"},
+            {"role": "user", "content": 'She said "ship it"'},
+            {"role": "assistant", "content": "Shipped.\nFinally."}]}))
+        self.assertEqual(summary["bytes"], len(output.getvalue().encode("utf-8")))
+
+    def test_gzip_shards(self):
+        path = os.path.join(self.temp_dir.name, "export.jsonl.gz")
+        summary = export_fine_tuning_data(self.dataset, path, shard_size=3, batch_size=2)
+        self.assertEqual([os.path.basename(f) for f in summary["files"]],
+                         ["export-00000.jsonl.gz", "export-00001.jsonl.gz"])
+        lines = [line for f in summary["files"] for line in gzip.open(f, "rt").read().splitlines()]
+        self.assertEqual(len(lines), 4)
+        self.assertIn("twitter", json.loads(lines[3])["messages"][0]["content"])
+
+    def test_compressed_binary_file_object(self):
+        output = io.BytesIO()
+        export_fine_tuning_data(self.dataset, output, compress=True)
+        self.assertFalse(output.closed)
+        self.assertEqual(len(gzip.decompress(output.getvalue()).splitlines()), 4)
+
+    def test_shards_need_a_path(self):
+        with self.assertRaises(ValueError):
+            export_fine_tuning_data(self.dataset, io.StringIO(), shard_size=2)
+
+    def test_prepare_for_fine_tuning_writes_the_given_path(self):
+        path = os.path.join(self.temp_dir.name, "fine_tuning_data.jsonl")
+        summary = prepare_for_fine_tuning(self.dataset, output=path)
+        self.assertEqual(summary["files"], [path])
+        with open(path) as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+
+class TestFineTuningFilter(unittest.TestCase):
+    def setUp(self):
+        def metadata(model, temperature, day):
+            return json.dumps({"model": model, "temperature": temperature,
+                               "timestamp": f"2025-01-{day:02d}T12:00:00"})
+
+        self.dataset = DatasetDict({"linkedin": Dataset.from_dict({
+            "original_text": ["", "Post one", "Post two", "Post one", "Post three", "Post four " * 200],
+            "transformed_text": ["", "One!", "Two!", "One!", "Three!", "Four! " * 200],
+            "metadata": ["{}", metadata("gpt-4o-mini", 0.7, 1), metadata("gpt-4o", 0.2, 2),
+                         metadata("gpt-4o-mini", 0.7, 3), metadata("gpt-4o-mini", 0.9, 4),
+                         metadata("gpt-4o-mini", 0.7, 5)],
+        })})
+
+    def export(self, filters, batch_size=2):
+        output = io.StringIO()
+        summary = export_fine_tuning_data(self.dataset, output, batch_size=batch_size,
+                                          filters=filters, val_output=io.StringIO())
+        users = [json.loads(line)["messages"][1]["content"] for line in output.getvalue().splitlines()]
+        return summary, users
+
+    def test_drops_dummy_and_duplicate_rows(self):
+        summary, users = self.export(FineTuningFilter(dedupe=True))
+        self.assertEqual(users[:3], ["Post one", "Post two", "Post three"])
+        self.assertEqual(summary["skipped"]["empty"], 1)
+        self.assertEqual(summary["skipped"]["duplicates"], 1)
+        self.assertEqual(summary["examples"], 4)
+
+    def test_duplicates_are_kept_without_dedupe(self):
+        summary, users = self.export(None)
+        self.assertEqual(users[:4], ["Post one", "Post two", "Post one", "Post three"])
+        self.assertEqual(summary["skipped"]["duplicates"], 0)
+        self.assertEqual(summary["examples"], 5)
+
+    def test_metadata_filters(self):
+        filters = FineTuningFilter(models=["gpt-4o-mini"], max_temperature=0.8,
+                                   since=datetime(2025, 1, 1), until=datetime(2025, 1, 5),
+                                   dedupe=True)
+        summary, users = self.export(filters)
+        self.assertEqual(users, ["Post one"])
+        # The dummy row is dropped as empty, the repeat of "Post one" as a duplicate
+        self.assertEqual(summary["skipped"]["filtered"], 3)
+        self.assertEqual(summary["skipped"]["duplicates"], 1)
+
+    def test_token_limit(self):
+        summary, users = self.export(FineTuningFilter(max_tokens=200))
+        self.assertEqual(summary["skipped"]["too_long"], 1)
+        self.assertNotIn("Post four " * 200, users)
+
+    def test_split_is_deterministic_and_complete(self):
+        rows = [f"Post number {i}" for i in range(400)]
+        self.dataset = DatasetDict({"twitter": Dataset.from_dict({
+            "original_text": rows, "transformed_text": rows, "metadata": ["{}"] * 400})})
+
+        def split(seed, batch_size):
+            train, validation = io.StringIO(), io.StringIO()
+            summary = export_fine_tuning_data(
+                self.dataset, train, batch_size=batch_size, val_output=validation,
+                filters=FineTuningFilter(val_fraction=0.25, seed=seed))
+            return summary, set(validation.getvalue().splitlines()), set(train.getvalue().splitlines())
+
+        summary, validation, train = split("a", 64)
+        self.assertEqual(summary["examples"], 400)
+        self.assertEqual(summary["validation_examples"], len(validation))
+        self.assertTrue(60 < len(validation) < 140)
+        self.assertFalse(validation & train)
+        self.assertEqual(split("a", 7)[1], validation)
+        self.assertNotEqual(split("b", 64)[1], validation)
+
+    def test_validation_file_next_to_output(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "data.jsonl.gz")
+            summary = export_fine_tuning_data(self.dataset, path,
+                                              filters=FineTuningFilter(val_fraction=0.5))
+            self.assertEqual(summary["files"], [path, os.path.join(temp_dir, "data.val.jsonl.gz")])
+
+
+if __name__ == '__main__':
+    unittest.main()
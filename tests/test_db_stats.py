@@ -0,0 +1,87 @@
+import unittest
+import os
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Example, Transformation
+from db_stats import DatabaseStats
+
+
+class TestDatabaseStats(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_db_stats.db"
+        self.engine = create_engine(f'sqlite:///{self.test_db_path}')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.stats = DatabaseStats()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+    def add_examples(self, platform, contents):
+        start = datetime(2025, 1, 1)
+        for i, content in enumerate(contents):
+            self.session.add(Example(id=str(uuid.uuid4()), platform=platform, content=content,
+                                     created_at=start + timedelta(minutes=i)))
+        self.session.commit()
+
+    def test_count(self):
+        self.add_examples("LinkedIn", ["one", "two", "three"])
+        self.add_examples("Twitter", ["four"])
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 3)
+        self.assertEqual(self.stats.count(self.session, Example, platform="Twitter"), 1)
+        self.assertEqual(self.stats.count(self.session, Example), 4)
+
+    def test_recent_previews_are_newest_first_and_truncated(self):
+        self.add_examples("LinkedIn", ["old", "middle", "new " + "x" * 500])
+        self.add_examples("Twitter", ["other platform"])
+        previews = self.stats.recent_previews(self.session, Example, platform="LinkedIn",
+                                              limit=2, chars=10)
+        self.assertEqual(previews, ["new xxxxxx", "middle"])
+
+    def test_cache_is_invalidated_on_write(self):
+        self.add_examples("LinkedIn", ["one"])
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 1)
+
+        # Cached until the table is invalidated
+        self.add_examples("LinkedIn", ["two"])
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 1)
+
+        # Invalidating another table keeps this one cached
+        self.stats.invalidate(Transformation)
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 1)
+
+        self.stats.invalidate(Example)
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 2)
+
+    def test_invalidation_during_compute_is_not_cached(self):
+        self.add_examples("LinkedIn", ["one"])
+        execute = self.session.execute
+
+        def execute_then_write(*args, **kwargs):
+            # A write commits and invalidates while the count is being computed
+            result = execute(*args, **kwargs)
+            self.add_examples("LinkedIn", ["two"])
+            self.stats.invalidate(Example)
+            return result
+
+        self.session.execute = execute_then_write
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 1)
+        self.session.execute = execute
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 2)
+
+    def test_ttl_expiry(self):
+        self.stats.ttl_seconds = 0
+        self.add_examples("LinkedIn", ["one"])
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 1)
+        self.add_examples("LinkedIn", ["two"])
+        self.assertEqual(self.stats.count(self.session, Example, platform="LinkedIn"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine, inspect, text
+
+from database import Example, Transformation, create_session_factory
+from dedupe import dedupe, vacuum
+from langchain_pipeline import PostTransformer
+from search_index import search
+
+
+class TestDedupe(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.db_url = f'sqlite:///{self.work_dir}/test.db'
+
+    def tearDown(self):
+        for name in os.listdir(self.work_dir):
+            os.remove(os.path.join(self.work_dir, name))
+        os.rmdir(self.work_dir)
+
+    def create_old_schema(self):
+        """Tables as they were before content_hash existed, with duplicates"""
+        engine = create_engine(self.db_url)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE examples (id VARCHAR PRIMARY KEY, "
+                              "platform VARCHAR NOT NULL, content TEXT NOT NULL, "
+                              "created_at DATETIME NOT NULL)"))
+            conn.execute(text("CREATE TABLE transformations (id VARCHAR PRIMARY KEY, "
+                              "platform VARCHAR NOT NULL, original_text TEXT NOT NULL, "
+                              "transformed_text TEXT NOT NULL, metadata JSON, "
+                              "created_at DATETIME NOT NULL)"))
+            conn.execute(text(
+                "INSERT INTO examples VALUES "
+                "('e1', 'LinkedIn', 'Same post', '2025-01-01 00:00:00'), "
+                "('e2', 'LinkedIn', 'Same post', '2025-01-02 00:00:00'), "
+                "('e3', 'Twitter', 'Same post', '2025-01-03 00:00:00')"))
+            conn.execute(text(
+                "INSERT INTO transformations VALUES "
+                "('t1', 'Twitter', 'Original', 'Tweet', '{}', '2025-01-01 00:00:00'), "
+                "('t2', 'Twitter', 'Original', 'Tweet', '{}', '2025-01-02 00:00:00'), "
+                "('t3', 'Twitter', 'Original', 'Tweet', '{}', '2025-01-03 00:00:00')"))
+        engine.dispose()
+
+    def test_dedupe_reports_rows_and_bytes(self):
+        self.create_old_schema()
+        engine = create_engine(self.db_url)
+        report = dedupe(engine)
+
+        self.assertEqual(report["examples"],
+                         {"hashed": 3, "removed": 1, "bytes_reclaimed": len("Same post")})
+        self.assertEqual(report["transformations"],
+                         {"hashed": 3, "removed": 2,
+                          "bytes_reclaimed": 2 * len("OriginalTweet")})
+        with engine.connect() as conn:
+            ids = conn.execute(text("SELECT id FROM examples ORDER BY id")).scalars().all()
+            self.assertEqual(ids, ["e1", "e3"])
+            indexes = {index["name"] for index in inspect(conn).get_indexes("examples")}
+        self.assertIn("ux_examples_platform_content_hash", indexes)
+
+        # A second pass finds nothing; vacuuming keeps search working
+        self.assertEqual(dedupe(engine)["transformations"]["removed"], 0)
+        vacuum(engine)
+        session = create_session_factory(self.db_url)()
+        self.assertEqual([r["id"] for r in search(session, "tweet")], ["t1"])
+        session.close()
+        engine.dispose()
+
+    def test_old_database_is_upgraded_on_startup(self):
+        self.create_old_schema()
+        session = create_session_factory(self.db_url)()
+        self.assertEqual(session.query(Example).count(), 2)
+        self.assertEqual(session.query(Transformation).one().id, "t1")
+        self.assertIsNotNone(session.query(Transformation).one().content_hash)
+        session.close()
+
+
+class TestUpsert(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.session = create_session_factory(f'sqlite:///{self.work_dir}/test.db')()
+        self.hf_dataset_manager = MagicMock()
+        self.transformer = PostTransformer(db_session=self.session,
+                                           hf_dataset_manager=self.hf_dataset_manager)
+        self.transformer.set_platform("LinkedIn")
+
+    def tearDown(self):
+        self.session.close()
+        self.session.get_bind().dispose()
+        for name in os.listdir(self.work_dir):
+            os.remove(os.path.join(self.work_dir, name))
+        os.rmdir(self.work_dir)
+
+    def test_add_example_is_idempotent(self):
+        self.assertTrue(self.transformer.add_example("Launch day!"))
+        self.assertFalse(self.transformer.add_example("  Launch day!  "))
+        self.assertEqual(self.session.query(Example).count(), 1)
+        self.assertEqual(self.transformer.example_count, 1)
+
+        # The same text is a separate example on another platform
+        self.transformer.set_platform("Twitter")
+        self.assertTrue(self.transformer.add_example("Launch day!"))
+
+    def test_save_transformation_skips_repeats(self):
+        self.assertTrue(self.transformer.save_transformation("Original", "Post"))
+        self.assertFalse(self.transformer.save_transformation("Original", "Post"))
+        self.assertTrue(self.transformer.save_transformation("Original", "Another post"))
+        self.assertEqual(self.session.query(Transformation).count(), 2)
+        self.assertEqual(self.hf_dataset_manager.add_transformation.call_count, 2)
+
+    def test_examples_written_elsewhere_are_picked_up(self):
+        self.transformer.example_selector.refresh_seconds = 0
+        self.transformer.add_example("Launch day!")
+
+        # e.g. import_examples running in another process
+        other_session = create_session_factory(self.session.get_bind().url)()
+        other_session.add(Example(id="imported", platform="LinkedIn", content="Imported post",
+                                  content_hash="imported-hash"))
+        other_session.commit()
+        other_session.close()
+
+        self.transformer.set_platform("LinkedIn")
+        self.assertEqual(sorted(self.transformer.examples), ["Imported post", "Launch day!"])
+
+    def test_save_transformations_skips_repeats(self):
+        self.transformer.save_transformation("o1", "t1")
+        self.hf_dataset_manager.reset_mock()
+
+        saved = self.transformer.save_transformations([
+            {"platform": "LinkedIn", "original_text": "o1", "transformed_text": "t1"},
+            {"platform": "LinkedIn", "original_text": "o2", "transformed_text": "t2"},
+            {"platform": "LinkedIn", "original_text": "o2", "transformed_text": "t2"},
+            {"platform": "Twitter", "original_text": "o1", "transformed_text": "t1"},
+        ])
+        self.assertEqual(saved, 2)
+        self.assertEqual(self.session.query(Transformation).count(), 3)
+        self.assertEqual(
+            [c.kwargs["original_text"] for c in self.hf_dataset_manager.add_transformation.call_args_list],
+            ["o2", "o1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
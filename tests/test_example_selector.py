@@ -0,0 +1,96 @@
+import unittest
+
+from example_selector import ExampleIndex, ExampleSelector
+
+
+class TestExampleIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ExampleIndex()
+        for text in [
+            "Launching our analytics dashboard for small teams",
+            "We are hiring backend engineers in Berlin",
+            "Team offsite recap: hiking, planning and pizza",
+            "Analytics tip: track retention before growth",
+        ]:
+            self.index.add(text)
+
+    def test_selects_most_similar_examples(self):
+        selected = self.index.select("new analytics dashboard release", k=2)
+        self.assertEqual(selected[0], "Launching our analytics dashboard for small teams")
+        self.assertIn("Analytics tip: track retention before growth", selected)
+
+    def test_no_overlap_selects_nothing(self):
+        self.assertEqual(self.index.select("completely unrelated words"), [])
+
+    def test_token_budget(self):
+        long_example = "analytics " * 400
+        self.index.add(long_example)
+        selected = self.index.select("analytics", k=5, token_budget=50)
+        self.assertNotIn(long_example, selected)
+        self.assertTrue(selected)
+
+    def test_duplicates_are_skipped(self):
+        self.assertFalse(self.index.add("We are hiring backend engineers in Berlin"))
+        self.assertEqual(len(self.index), 4)
+
+
+class TestExampleSelector(unittest.TestCase):
+    def test_loads_once_and_updates_incrementally(self):
+        loads = []
+
+        def load():
+            loads.append(1)
+            return ["Launching our analytics dashboard"]
+
+        selector = ExampleSelector()
+        self.assertEqual(selector.select("Twitter", "analytics"), [])
+        selector.ensure_loaded("Twitter", load)
+        selector.ensure_loaded("Twitter", load)
+        self.assertEqual(len(loads), 1)
+
+        selector.add("Twitter", "Analytics meetup tonight")
+        self.assertEqual(selector.count("Twitter"), 2)
+        self.assertEqual(len(selector.select("Twitter", "analytics meetup")), 2)
+
+        # Adding to a platform that was never loaded is a no-op
+        selector.add("Instagram", "Analytics")
+        self.assertEqual(selector.count("Instagram"), 0)
+
+    def test_refreshes_when_the_store_changes(self):
+        stored = ["Launching our analytics dashboard"]
+        loads = []
+
+        def load():
+            loads.append(1)
+            return list(stored)
+
+        def version():
+            return len(stored)
+
+        selector = ExampleSelector(refresh_seconds=3600)
+        selector.ensure_loaded("Twitter", load, version)
+        # Written by another process; not checked again until the refresh interval passes
+        stored.append("Analytics meetup tonight")
+        selector.ensure_loaded("Twitter", load, version)
+        self.assertEqual(selector.count("Twitter"), 1)
+
+        selector.refresh_seconds = 0
+        selector.ensure_loaded("Twitter", load, version)
+        self.assertEqual(selector.count("Twitter"), 2)
+        selector.ensure_loaded("Twitter", load, version)
+        self.assertEqual(len(loads), 2)
+
+        # An in-place add that reports the new version is not reloaded
+        stored.append("Dashboard tips")
+        selector.add("Twitter", "Dashboard tips", version=version())
+        selector.ensure_loaded("Twitter", load, version)
+        self.assertEqual(len(loads), 2)
+
+        selector.invalidate("Twitter")
+        self.assertFalse(selector.is_loaded("Twitter"))
+        selector.ensure_loaded("Twitter", load, version)
+        self.assertEqual(len(loads), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
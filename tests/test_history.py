@@ -0,0 +1,83 @@
+import unittest
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, Transformation
+from history import history_page, get_transformation
+from search_index import ensure_search_index
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_history.db"
+        self.engine = create_engine(f'sqlite:///{self.test_db_path}')
+        Base.metadata.create_all(self.engine)
+        ensure_search_index(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+        start = datetime(2025, 1, 1)
+        for i in range(25):
+            self.session.add(Transformation(
+                id=f"li-{i:02d}", platform="LinkedIn",
+                original_text=f"Original {i}",
+                transformed_text=f"Post {i} 100% done" if i == 7 else f"Post {i}",
+                # Pairs of rows share a timestamp to exercise the id tie-break
+                created_at=start + timedelta(minutes=i // 2)))
+        self.session.add(Transformation(
+            id="tw-0", platform="Twitter", original_text="Original",
+            transformed_text="x" * 1000, created_at=start))
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        ids = []
+        cursor = None
+        pages = 0
+        while True:
+            page = history_page(self.session, "LinkedIn", cursor=cursor, limit=10)
+            ids.extend(row["id"] for row in page["rows"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, sorted((f"li-{i:02d}" for i in range(25)), reverse=True))
+
+    def test_search(self):
+        page = history_page(self.session, "LinkedIn", search="100%")
+        self.assertEqual([row["id"] for row in page["rows"]], ["li-07"])
+        self.assertIsNone(page["next_cursor"])
+
+        page = history_page(self.session, "LinkedIn", search="ORIGINAL 1")
+        self.assertEqual(len(page["rows"]), 10)
+
+        # Search results page through the full-text index like unfiltered pages do
+        ids = []
+        cursor = None
+        while True:
+            page = history_page(self.session, "LinkedIn", search="original 1", cursor=cursor, limit=4)
+            ids.extend(row["id"] for row in page["rows"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        # li-07 matches through its "100%"
+        self.assertEqual(ids, ["li-19", "li-18", "li-17", "li-16", "li-15", "li-14",
+                               "li-13", "li-12", "li-11", "li-10", "li-07", "li-01"])
+        self.assertEqual(history_page(self.session, "Twitter", search="post")["rows"], [])
+
+    def test_previews_are_truncated_and_full_text_is_loaded_on_demand(self):
+        row = history_page(self.session, "Twitter", preview_chars=50)["rows"][0]
+        self.assertEqual(len(row["transformed_preview"]), 50)
+        self.assertTrue(row["truncated"])
+        self.assertEqual(len(get_transformation(self.session, row["id"]).transformed_text), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,279 @@
+import unittest
+import io
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import pyarrow.parquet as pq
+from datasets import Dataset, DatasetDict
+
+from huggingface_dataset import HuggingFaceDatasetManager, AppendBuffer
+
+
+class TestHuggingFaceDatasetManager(unittest.TestCase):
+    def setUp(self):
+        # Never talk to the real Hub from tests
+        self.login_patcher = patch('huggingface_dataset.login')
+        self.mock_login = self.login_patcher.start()
+        self.load_patcher = patch('datasets.load_dataset',
+                                  side_effect=FileNotFoundError("no dataset"))
+        self.mock_load_dataset = self.load_patcher.start()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, "sync_state.json")
+
+    def tearDown(self):
+        self.login_patcher.stop()
+        self.load_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_eager_mode_loads_on_init(self):
+        manager = HuggingFaceDatasetManager(token="hf-token", repo_name="user/repo")
+
+        self.mock_login.assert_called_once_with(token="hf-token")
+        self.mock_load_dataset.assert_called_once_with("user/repo", verification_mode="no_checks")
+        self.assertTrue(manager.is_loaded)
+
+    def test_lazy_mode_defers_hub_access(self):
+        manager = HuggingFaceDatasetManager(token="hf-token",
+                                            repo_name="user/repo",
+                                            lazy=True)
+
+        # Nothing touches the Hub on construction
+        self.mock_login.assert_not_called()
+        self.mock_load_dataset.assert_not_called()
+        self.assertFalse(manager.is_loaded)
+
+        # The first write loads the dataset exactly once
+        manager.add_transformation("LinkedIn", "original", "transformed")
+        manager.add_transformation("LinkedIn", "original 2", "transformed 2")
+        self.mock_login.assert_called_once_with(token="hf-token")
+        self.mock_load_dataset.assert_called_once_with("user/repo", verification_mode="no_checks")
+        self.assertEqual(len(manager.dataset_dict["linkedin"]), 2)
+
+    def test_lazy_push_loads_dataset(self):
+        manager = HuggingFaceDatasetManager(token="hf-token",
+                                            repo_name="user/repo",
+                                            lazy=True,
+                                            sync_state_path=self.state_path)
+        with patch('huggingface_dataset.DatasetDict.push_to_hub') as mock_push:
+            self.assertTrue(manager.push_to_hub())
+
+        mock_push.assert_called_once()
+        self.mock_load_dataset.assert_called_once_with("user/repo", verification_mode="no_checks")
+
+    def test_add_transformation_records_metadata(self):
+        manager = HuggingFaceDatasetManager(repo_name="user/repo", lazy=True)
+        manager.add_transformation("Twitter", "original", "transformed",
+                                   metadata={"model": "test-model"})
+
+        row = manager.dataset_dict["twitter"][0]
+        self.assertEqual(row["original_text"], "original")
+        metadata = json.loads(row["metadata"])
+        self.assertEqual(metadata["model"], "test-model")
+        self.assertEqual(metadata["platform"], "twitter")
+
+    def test_appends_are_buffered_until_flush(self):
+        manager = HuggingFaceDatasetManager(repo_name="user/repo", lazy=True,
+                                            batch_size=4)
+        for i in range(10):
+            manager.add_transformation("LinkedIn", f"original {i}", f"transformed {i}")
+        self.assertEqual(manager.pending_rows, 10)
+
+        self.assertEqual(manager.flush(), 10)
+        self.assertEqual(manager.pending_rows, 0)
+        linkedin = manager.dataset_dict["linkedin"]
+        self.assertEqual(linkedin["original_text"],
+                         [f"original {i}" for i in range(10)])
+
+        # Later appends are concatenated after the existing rows
+        manager.add_transformation("LinkedIn", "original 10", "transformed 10")
+        linkedin = manager.dataset_dict["linkedin"]
+        self.assertEqual(len(linkedin), 11)
+        self.assertEqual(linkedin[10]["transformed_text"], "transformed 10")
+
+    def test_flush_adds_dummy_rows_to_empty_platforms(self):
+        manager = HuggingFaceDatasetManager(repo_name="user/repo", lazy=True)
+        manager.add_transformation("Instagram", "original", "transformed")
+
+        dataset_dict = manager.dataset_dict
+        self.assertEqual(len(dataset_dict["instagram"]), 1)
+        self.assertEqual(dataset_dict["linkedin"]["original_text"], [""])
+        self.assertEqual(dataset_dict["twitter"]["metadata"], ["{}"])
+
+    def test_append_buffer_seals_batches(self):
+        buffer = AppendBuffer(batch_size=2)
+        for i in range(5):
+            buffer.append(f"o{i}", f"t{i}", "{}")
+        self.assertEqual(len(buffer), 5)
+
+        table = buffer.drain()
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column("original_text").to_pylist(),
+                         ["o0", "o1", "o2", "o3", "o4"])
+        self.assertEqual(len(buffer), 0)
+
+    def test_unknown_platform(self):
+        manager = HuggingFaceDatasetManager(repo_name="user/repo", lazy=True)
+        with self.assertRaises(ValueError):
+            manager.add_transformation("MySpace", "original", "transformed")
+
+
+
+class FakeHfApi:
+    """Local stand-in for HfApi that records uploaded files and bytes"""
+
+    def __init__(self, files=()):
+        self.commits = []
+        self.files = list(files)
+
+    def create_repo(self, repo_id, **kwargs):
+        pass
+
+    def list_repo_files(self, repo_id, **kwargs):
+        return list(self.files)
+
+    def create_commit(self, repo_id, operations, **kwargs):
+        self.commits.append({op.path_in_repo: op.path_or_fileobj for op in operations})
+        self.files.extend(op.path_in_repo for op in operations)
+
+    def rows(self, commit, path):
+        return pq.read_table(io.BytesIO(self.commits[commit][path])).num_rows
+
+
+class TestIncrementalPush(unittest.TestCase):
+    def setUp(self):
+        self.login_patcher = patch('huggingface_dataset.login')
+        self.login_patcher.start()
+        self.load_patcher = patch('datasets.load_dataset',
+                                  side_effect=FileNotFoundError("no dataset"))
+        self.mock_load_dataset = self.load_patcher.start()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, "sync_state.json")
+        self.api = FakeHfApi()
+
+    def tearDown(self):
+        self.login_patcher.stop()
+        self.load_patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def make_manager(self):
+        return HuggingFaceDatasetManager(token="hf-token", repo_name="user/repo",
+                                         lazy=True, incremental=True,
+                                         sync_state_path=self.state_path,
+                                         api=self.api)
+
+    def test_only_new_rows_are_uploaded(self):
+        manager = self.make_manager()
+        for i in range(3):
+            manager.add_transformation("LinkedIn", f"original {i}", f"transformed {i}")
+        self.assertEqual(manager.push_to_hub(),
+                         {"linkedin": 3, "twitter": 1, "instagram": 1})
+
+        manager.add_transformation("LinkedIn", "original 3", "transformed 3")
+        manager.add_transformation("LinkedIn", "original 4", "transformed 4")
+        self.assertEqual(manager.push_to_hub(), {"linkedin": 2})
+
+        self.assertEqual(len(self.api.commits), 2)
+        second = self.api.commits[1]
+        path = "data/linkedin-00000-of-00001-incr-000002.parquet"
+        self.assertEqual(list(second), [path])
+        self.assertEqual(self.api.rows(1, path), 2)
+        self.assertGreater(len(second[path]), 0)
+
+        # Nothing new means no commit at all
+        self.assertEqual(manager.push_to_hub(), {})
+        self.assertEqual(len(self.api.commits), 2)
+
+    def test_high_water_mark_survives_restart(self):
+        manager = self.make_manager()
+        for i in range(3):
+            manager.add_transformation("Twitter", f"original {i}", f"transformed {i}")
+        manager.push_to_hub()
+
+        # After a restart the Hub dataset already contains the pushed rows
+        self.mock_load_dataset.side_effect = None
+        self.mock_load_dataset.return_value = manager.dataset_dict
+        restarted = self.make_manager()
+        restarted.add_transformation("Twitter", "original 3", "transformed 3")
+
+        self.assertEqual(restarted.push_to_hub(), {"twitter": 1})
+        self.assertEqual(
+            self.api.rows(1, "data/twitter-00000-of-00001-incr-000002.parquet"), 1)
+
+    def test_missing_sync_state_does_not_reupload_loaded_rows(self):
+        loaded = Dataset.from_dict({"original_text": ["a", "b", "c"],
+                                    "transformed_text": ["A", "B", "C"],
+                                    "metadata": ["{}", "{}", "{}"]})
+        self.mock_load_dataset.side_effect = None
+        self.mock_load_dataset.return_value = DatasetDict(
+            {"linkedin": loaded, "twitter": loaded, "instagram": loaded})
+        # Shards pushed from another host, whose state file is not here
+        self.api.files = ["data/linkedin-00000-of-00001.parquet",
+                          "data/linkedin-00000-of-00001-incr-000001.parquet",
+                          "data/linkedin-00000-of-00001-incr-000004.parquet"]
+
+        manager = self.make_manager()
+        self.assertEqual(manager.push_to_hub(), {})
+        manager.add_transformation("LinkedIn", "original", "transformed")
+        manager.add_transformation("Twitter", "original", "transformed")
+
+        self.assertEqual(manager.push_to_hub(), {"linkedin": 1, "twitter": 1})
+        self.assertEqual(self.api.rows(0, "data/linkedin-00000-of-00001-incr-000005.parquet"), 1)
+        self.assertEqual(self.api.rows(0, "data/twitter-00000-of-00001-incr-000001.parquet"), 1)
+
+    def test_local_dataset_behind_high_water_mark_raises(self):
+        manager = self.make_manager()
+        for i in range(3):
+            manager.add_transformation("LinkedIn", f"original {i}", f"transformed {i}")
+        manager.push_to_hub()
+
+        # e.g. the Hub dataset failed to load and this process started empty
+        restarted = self.make_manager()
+        restarted.add_transformation("LinkedIn", "original 3", "transformed 3")
+        with self.assertRaises(ValueError):
+            restarted.push_to_hub()
+        self.assertEqual(len(self.api.commits), 1)
+
+    def test_load_errors_other_than_not_found_propagate(self):
+        self.mock_load_dataset.side_effect = ConnectionError("Hub unreachable")
+        with self.assertRaises(ConnectionError):
+            self.make_manager().add_transformation("LinkedIn", "original", "transformed")
+
+    def test_incremental_shards_load_despite_card_split_sizes(self):
+        # A full push records split sizes in the dataset card; incremental
+        # shards added later make the real sizes larger
+        self.load_patcher.stop()
+        try:
+            repo = os.path.join(self.tmp_dir.name, "repo")
+            os.makedirs(os.path.join(repo, "data"))
+            rows = Dataset.from_dict({"original_text": ["a"], "transformed_text": ["b"],
+                                      "metadata": ["{}"]})
+            rows.to_parquet(os.path.join(repo, "data", "linkedin-00000-of-00001.parquet"))
+            rows.to_parquet(os.path.join(repo, "data", "linkedin-00000-of-00001-incr-000001.parquet"))
+            with open(os.path.join(repo, "README.md"), "w") as f:
+                f.write("---\ndataset_info:\n  features:\n"
+                        "  - name: original_text\n    dtype: string\n"
+                        "  - name: transformed_text\n    dtype: string\n"
+                        "  - name: metadata\n    dtype: string\n"
+                        "  splits:\n  - name: linkedin\n    num_examples: 1\n"
+                        "configs:\n- config_name: default\n  data_files:\n"
+                        "  - split: linkedin\n    path: data/linkedin-*\n---\n")
+            manager = HuggingFaceDatasetManager(repo_name=repo, sync_state_path=self.state_path)
+            self.assertEqual(len(manager.dataset_dict["linkedin"]), 2)
+        finally:
+            self.load_patcher.start()
+
+    def test_failed_commit_keeps_high_water_mark(self):
+        manager = self.make_manager()
+        manager.add_transformation("LinkedIn", "original", "transformed")
+        with patch.object(self.api, 'create_commit', side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                manager.push_to_hub()
+
+        # The rows are uploaded again on the next attempt
+        self.assertEqual(manager.push_to_hub()["linkedin"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import json
+import os
+import tempfile
+from sqlalchemy import text
+
+from database import Example, create_session_factory
+from import_examples import import_examples, read_examples
+from search_index import search
+
+
+class TestImportExamples(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.Session = create_session_factory(f'sqlite:///{self.work_dir}/test.db')
+        self.engine = self.Session.kw["bind"]
+        self.session = self.Session()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+        for name in os.listdir(self.work_dir):
+            os.remove(os.path.join(self.work_dir, name))
+        os.rmdir(self.work_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.work_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_read_text_paragraphs(self):
+        path = self.write("examples.txt", "First post\nline two\n\n\nSecond post\n\nThird post")
+        self.assertEqual(list(read_examples(path, "Twitter")), [
+            ("Twitter", "First post\nline two"), ("Twitter", "Second post"),
+            ("Twitter", "Third post")])
+
+    def test_read_jsonl_and_csv(self):
+        path = self.write("examples.jsonl", "\n".join([
+            json.dumps({"platform": "Instagram", "content": "Photo dump"}),
+            json.dumps({"text": "No platform"}),
+            json.dumps({"content": "  "})]))
+        self.assertEqual(list(read_examples(path, "LinkedIn")), [
+            ("Instagram", "Photo dump"), ("LinkedIn", "No platform")])
+
+        path = self.write("examples.csv", "platform,content\nTwitter,Hot take\n,Fallback\n")
+        self.assertEqual(list(read_examples(path, "LinkedIn")), [
+            ("Twitter", "Hot take"), ("LinkedIn", "Fallback")])
+
+    def test_import_dedupes_and_batches(self):
+        self.session.add(Example(id="existing", platform="LinkedIn", content="Already stored"))
+        self.session.commit()
+
+        progress = []
+        summary = import_examples(self.engine, [
+            ("LinkedIn", "Already stored"),
+            ("LinkedIn", "New one"),
+            ("LinkedIn", "New one"),
+            # Same text on another platform is a different example
+            ("Twitter", "New one"),
+            ("MySpace", "Unknown platform"),
+            ("Twitter", "Another"),
+        ], batch_size=2, progress=progress.append)
+
+        self.assertEqual((summary["read"], summary["inserted"], summary["duplicates"],
+                          summary["invalid"]), (6, 3, 2, 1))
+        # Stored duplicates are skipped by the insert, so they take part in batching
+        self.assertEqual(len(progress), 3)
+        self.assertEqual(self.session.query(Example).count(), 4)
+
+    def test_imported_examples_are_searchable_and_trigger_is_restored(self):
+        import_examples(self.engine, [("LinkedIn", "Quarterly roadmap review")])
+        self.assertEqual(len(search(self.session, "roadmap", kind="examples")), 1)
+
+        trigger = self.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'examples_fts_ai'")).first()
+        self.assertIsNotNone(trigger)
+        self.session.add(Example(id="later", platform="LinkedIn", content="Roadmap follow-up"))
+        self.session.commit()
+        self.assertEqual(len(search(self.session, "roadmap", kind="examples")), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from langchain_core.messages import HumanMessage
+
+from llm_clients import LLMClientRegistry
+from mock_openai_server import MockOpenAIServer
+
+
+class TestLLMClientRegistry(unittest.TestCase):
+    def setUp(self):
+        self.server = MockOpenAIServer().start()
+        self.registry = LLMClientRegistry(base_url=self.server.base_url)
+
+    def tearDown(self):
+        self.registry.close()
+        self.server.stop()
+
+    def test_same_settings_same_model(self):
+        llm = self.registry.get("key", 0.5)
+        self.assertIs(self.registry.get("key", 0.5), llm)
+        self.assertIsNot(self.registry.get("key", 0.9), llm)
+        self.assertIsNot(self.registry.get("key", 0.5, model="gpt-4o"), llm)
+        self.assertEqual(len(self.registry), 3)
+
+    def test_requests_reuse_one_connection(self):
+        for temperature in (0.1, 0.5, 0.9, 0.1):
+            reply = self.registry.get("key", temperature).invoke([HumanMessage("Shipped it")])
+            self.assertEqual(reply.content, "Mock post: Shipped it")
+        streamed = "".join(chunk.content for chunk in
+                           self.registry.get("key", 0.5).stream([HumanMessage("We hit 1M users")]))
+        self.assertEqual(streamed, "Mock post: We hit 1M users")
+        # Another key (another session's user) shares the same pool
+        self.registry.get("other-key", 0.5).invoke([HumanMessage("Launch day")])
+
+        self.assertEqual(self.server.requests, 6)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_close_drops_clients(self):
+        llm = self.registry.get("key", 0.5)
+        llm.invoke([HumanMessage("Hello")])
+        self.registry.close()
+        self.assertEqual(len(self.registry), 0)
+        self.assertIsNot(self.registry.get("key", 0.5), llm)
+        self.registry.get("key", 0.5).invoke([HumanMessage("Hello again")])
+        self.assertEqual(self.server.connections, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
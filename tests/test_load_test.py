@@ -0,0 +1,90 @@
+import unittest
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from langchain_pipeline import FakeChatModel, FakeLLMError
+from load_test import percentile, run_load_test
+
+
+class TestFakeChatModel(unittest.TestCase):
+    def setUp(self):
+        self.messages = [SystemMessage("You write LinkedIn posts"),
+                         HumanMessage("We hit 1M users. Thank you all")]
+
+    def test_reply_is_deterministic(self):
+        first = FakeChatModel().invoke(self.messages)
+        second = FakeChatModel(seed=7).invoke(self.messages)
+        self.assertEqual(first.content, second.content)
+        self.assertTrue(first.content.startswith("We hit 1M users\n\nThank you all"))
+        self.assertEqual(first.usage_metadata["output_tokens"], len(first.content.split(" ")))
+
+    def test_stream_matches_invoke(self):
+        llm = FakeChatModel()
+        chunks = list(llm.stream(self.messages))
+        self.assertEqual("".join(chunk.content for chunk in chunks), llm.invoke(self.messages).content)
+        self.assertGreater(len(chunks), 3)
+        self.assertIsNotNone(chunks[-1].usage_metadata)
+
+    def test_astream(self):
+        async def collect():
+            return "".join([chunk.content async for chunk in FakeChatModel().astream(self.messages)])
+
+        self.assertEqual(asyncio.run(collect()), FakeChatModel().invoke(self.messages).content)
+
+    def test_latency_and_token_rate(self):
+        llm = FakeChatModel(latency=0.1, tokens_per_second=200)
+        tokens = llm.invoke(self.messages).usage_metadata["output_tokens"]
+        started = time.perf_counter()
+        llm.invoke(self.messages)
+        self.assertGreaterEqual(time.perf_counter() - started, 0.1 + tokens / 200)
+
+    def test_error_injection_is_seeded(self):
+        def outcomes(seed):
+            llm = FakeChatModel(error_rate=0.5, seed=seed)
+            results = []
+            for _ in range(20):
+                try:
+                    llm.invoke(self.messages)
+                    results.append(True)
+                except FakeLLMError:
+                    results.append(False)
+            return results
+
+        self.assertEqual(outcomes(3), outcomes(3))
+        self.assertIn(False, outcomes(3))
+        self.assertIn(True, outcomes(3))
+
+
+class TestLoadTest(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertIsNone(percentile([], 50))
+
+    def test_users_complete_every_stage(self):
+        report = run_load_test(users=4, requests=3, llm=FakeChatModel(latency=0.01),
+                               debounce_seconds=0.05)
+        self.assertEqual(report["completed"], 12)
+        self.assertEqual(report["errors"], 0)
+        self.assertGreater(report["throughput"], 0)
+        for stage in ("first_token", "transform", "save", "request"):
+            latency = report["latency"][stage]
+            self.assertLessEqual(latency["p50"], latency["p95"])
+            self.assertLessEqual(latency["p95"], latency["p99"])
+        self.assertGreaterEqual(report["latency"]["first_token"]["p50"], 0.01)
+        # Every save asked for a sync; the worker pushed them in fewer rounds
+        self.assertEqual(report["sync"]["pushes_requested"], 12)
+        self.assertGreaterEqual(report["sync"]["pushes_done"], 1)
+
+    def test_injected_errors_are_counted(self):
+        report = run_load_test(users=2, requests=3, llm=FakeChatModel(error_rate=1.0))
+        self.assertEqual(report["completed"], 0)
+        self.assertEqual(report["errors"], 6)
+        self.assertIn("FakeLLMError", report["error_samples"][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
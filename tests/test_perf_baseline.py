@@ -0,0 +1,51 @@
+import unittest
+import importlib.util
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+BASELINE_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'perf', 'baseline.py')
+spec = importlib.util.spec_from_file_location("perf_baseline", BASELINE_SCRIPT)
+perf_baseline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(perf_baseline)
+
+
+class TestPerfBaseline(unittest.TestCase):
+    def test_compare_results_flags_regressions_beyond_threshold(self):
+        baseline = {"a": 1.0, "b": 1.0, "c": 1.0, "gone": 1.0}
+        candidate = {"a": 1.1, "b": 1.5, "c": 0.5, "added": 1.0}
+        rows = {row[0]: row for row in perf_baseline.compare_results(baseline, candidate, 0.15)}
+
+        self.assertEqual(rows["a"][4], "ok")
+        self.assertAlmostEqual(rows["a"][3], 0.1)
+        self.assertEqual(rows["b"][4], "regression")
+        self.assertEqual(rows["c"][4], "improved")
+        self.assertEqual(rows["gone"][4], "missing")
+        self.assertEqual(rows["added"][4], "new")
+
+    def test_load_results_reads_pytest_benchmark_json(self):
+        data = {"benchmarks": [
+            {"fullname": "test_perf_database.py::test_add_example[100]",
+             "stats": {"min": 0.001, "median": 0.002, "mean": 0.003}}]}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "main.json")
+            with open(path, "w") as f:
+                json.dump(data, f)
+            self.assertEqual(perf_baseline.load_results(path, "min"),
+                             {"test_perf_database.py::test_add_example[100]": 0.001})
+            self.assertEqual(perf_baseline.baseline_path(path), path)
+        self.assertTrue(perf_baseline.baseline_path("main").endswith(os.path.join("baselines", "main.json")))
+
+    def test_compare_with_missing_baseline_exits_before_running_the_suite(self):
+        with patch.object(perf_baseline, "run_suite") as run_suite, \
+                patch("sys.argv", ["baseline.py", "compare", "no-such-baseline"]), \
+                patch("sys.stderr"):
+            with self.assertRaises(SystemExit) as raised:
+                perf_baseline.main()
+        self.assertEqual(raised.exception.code, 2)
+        run_suite.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
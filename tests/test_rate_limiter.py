@@ -0,0 +1,73 @@
+import unittest
+
+from rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Manual clock; sleeping just advances time"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_unlimited_never_sleeps(self):
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+        for _ in range(100):
+            limiter.acquire(tokens=1000)
+        self.assertEqual(clock.slept, [])
+
+    def test_requests_per_minute(self):
+        clock = FakeClock()
+        limiter = RateLimiter(requests_per_minute=60, clock=clock, sleep=clock.sleep)
+
+        # A minute's allowance can be used as a burst
+        for _ in range(60):
+            limiter.acquire()
+        self.assertEqual(clock.now, 0.0)
+
+        # After that requests are spaced one second apart
+        limiter.acquire()
+        limiter.acquire()
+        self.assertAlmostEqual(clock.now, 2.0)
+
+    def test_tokens_per_minute(self):
+        clock = FakeClock()
+        limiter = RateLimiter(tokens_per_minute=600, clock=clock, sleep=clock.sleep)
+        limiter.acquire(tokens=600)
+        limiter.acquire(tokens=300)
+        self.assertAlmostEqual(clock.now, 30.0)
+
+    def test_reconcile_refunds_and_charges_the_difference(self):
+        clock = FakeClock()
+        limiter = RateLimiter(tokens_per_minute=600, clock=clock, sleep=clock.sleep)
+        reserved = limiter.acquire(tokens=600)
+        self.assertEqual(reserved, 600)
+        # Only half the reservation was used, so the next request needs no wait
+        limiter.reconcile(reserved, 300)
+        limiter.acquire(tokens=300)
+        self.assertEqual(clock.now, 0.0)
+
+        # Going 300 over the reservation is paid for by the next request
+        limiter.reconcile(0, 300)
+        limiter.acquire(tokens=300)
+        self.assertAlmostEqual(clock.now, 60.0)
+
+    def test_oversized_request_is_capped(self):
+        clock = FakeClock()
+        limiter = RateLimiter(tokens_per_minute=100, clock=clock, sleep=clock.sleep)
+        limiter.acquire(tokens=10000)
+        self.assertEqual(clock.now, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache.db")
+        self.cache = ResponseCache(path=self.path)
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_prompt_and_params(self):
+        messages = [SystemMessage(content="system"), HumanMessage(content="hello")]
+        key = ResponseCache.make_key(messages, model="m", temperature=0.5)
+        self.assertEqual(key, ResponseCache.make_key(list(messages), model="m", temperature=0.5))
+        self.assertNotEqual(key, ResponseCache.make_key(messages, model="m", temperature=0.6))
+        self.assertNotEqual(key, ResponseCache.make_key(
+            [SystemMessage(content="system"), HumanMessage(content="hello!")],
+            model="m", temperature=0.5))
+
+    def test_hits_misses_and_saved_latency(self):
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.put("key", "value", latency=2.0)
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.cache.get("key"), "value")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 1)
+        self.assertAlmostEqual(stats["hit_ratio"], 2 / 3)
+        self.assertAlmostEqual(stats["saved_seconds"], 4.0)
+
+    def test_disk_tier_survives_reopen(self):
+        self.cache.put("key", "value", latency=1.0)
+        self.cache.close()
+
+        self.cache = ResponseCache(path=self.path)
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.cache.stats()["disk_hits"], 1)
+
+        # The disk hit was promoted into memory
+        self.assertEqual(self.cache.get("key"), "value")
+        self.assertEqual(self.cache.stats()["memory_hits"], 1)
+
+    def test_ttl_expiry(self):
+        self.cache.ttl_seconds = 10
+        with patch('response_cache.time.time', return_value=1000.0):
+            self.cache.put("key", "value")
+        with patch('response_cache.time.time', return_value=1005.0):
+            self.assertEqual(self.cache.get("key"), "value")
+        with patch('response_cache.time.time', return_value=1011.0):
+            self.assertIsNone(self.cache.get("key"))
+
+    def test_size_bound_eviction(self):
+        cache = ResponseCache(path=None, max_memory_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+
+        self.cache.max_disk_entries = 3
+        self.cache.max_memory_entries = 0
+        for i in range(5):
+            self.cache.put(f"key{i}", str(i))
+        self.assertIsNone(self.cache.get("key0"))
+        self.assertEqual(self.cache.get("key4"), "4")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+from datetime import datetime
+from sqlalchemy import text
+
+from database import Example, Transformation, create_session_factory
+from search_index import rebuild_search_index, search, to_match_query
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_search_index.db"
+        self.Session = create_session_factory(f'sqlite:///{self.test_db_path}')
+        self.session = self.Session()
+        self.session.add_all([
+            Transformation(id="t1", platform="LinkedIn", original_text="Quarterly results",
+                           transformed_text="Our quarterly revenue grew again"),
+            Transformation(id="t2", platform="Twitter", original_text="Launch day",
+                           transformed_text="Launch day! Revenue, revenue, revenue"),
+            Transformation(id="t3", platform="LinkedIn", original_text="Hiring",
+                           transformed_text="We are hiring engineers"),
+            Example(id="e1", platform="Instagram", content="Café opening this weekend"),
+        ])
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.Session.kw["bind"].dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.test_db_path + suffix):
+                os.remove(self.test_db_path + suffix)
+
+    def test_ranked_results_are_indexed_on_insert(self):
+        results = search(self.session, "revenue")
+        self.assertEqual([r["id"] for r in results], ["t2", "t1"])
+        self.assertIn("[revenue]", results[1]["snippet"])
+        self.assertIsInstance(results[0]["created_at"], datetime)
+
+    def test_platform_filter_and_prefix(self):
+        results = search(self.session, "rev*", platform="LinkedIn")
+        self.assertEqual([r["id"] for r in results], ["t1"])
+
+    def test_examples_and_diacritics(self):
+        results = search(self.session, "cafe", kind="examples")
+        self.assertEqual([r["id"] for r in results], ["e1"])
+
+    def test_updates_and_deletes_are_reflected(self):
+        transformation = self.session.get(Transformation, "t3")
+        transformation.transformed_text = "We are hiring designers"
+        self.session.commit()
+        self.assertEqual(search(self.session, "engineers"), [])
+        self.assertEqual([r["id"] for r in search(self.session, "designers")], ["t3"])
+
+        self.session.delete(transformation)
+        self.session.commit()
+        self.assertEqual(search(self.session, "designers"), [])
+
+    def test_rebuild_indexes_rows_written_without_triggers(self):
+        self.session.execute(text("DROP TRIGGER transformations_fts_ai"))
+        self.session.add(Transformation(id="t4", platform="Twitter", original_text="x",
+                                        transformed_text="Conference recap"))
+        self.session.commit()
+        self.assertEqual(search(self.session, "conference"), [])
+
+        rebuild_search_index(self.Session.kw["bind"])
+        self.assertEqual([r["id"] for r in search(self.session, "conference")], ["t4"])
+
+    def test_match_query_escapes_operators(self):
+        self.assertEqual(to_match_query('hiring OR "NEAR(x" grow*'),
+                         '"hiring" "OR" "NEAR" "x" "grow"*')
+        self.assertEqual(to_match_query("hiring grow*", prefix=True), '"hiring"* "grow"*')
+        self.assertEqual(search(self.session, "  ( ) "), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import threading
+
+from sync_worker import SyncWorker
+
+
+class FakePush:
+    """Records pushes and optionally fails the first few"""
+
+    def __init__(self, failures=0, error=RuntimeError):
+        self.calls = 0
+        self.failures = failures
+        self.error = error
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise self.error("push failed")
+
+
+class TestSyncWorker(unittest.TestCase):
+    def test_requests_are_coalesced(self):
+        push = FakePush()
+        worker = SyncWorker(push, debounce_seconds=0.2, dirty_threshold=1000)
+        for _ in range(10):
+            worker.request_sync()
+        self.assertEqual(worker.queue_depth, 10)
+
+        self.assertTrue(worker.flush(timeout=5))
+        worker.shutdown()
+
+        self.assertEqual(push.calls, 1)
+        stats = worker.stats()
+        self.assertEqual(stats["pushes_requested"], 10)
+        self.assertEqual(stats["pushes_done"], 1)
+        self.assertEqual(stats["pushes_avoided"], 9)
+        self.assertEqual(stats["queue_depth"], 0)
+
+    def test_debounce_interval_triggers_push(self):
+        push = FakePush()
+        worker = SyncWorker(push, debounce_seconds=0.05, dirty_threshold=1000)
+        worker.request_sync()
+
+        # Wait for the debounce window without calling flush
+        with worker._cond:
+            worker._cond.wait_for(lambda: worker.pushes_done == 1, timeout=5)
+        worker.shutdown()
+        self.assertEqual(push.calls, 1)
+
+    def test_dirty_threshold_triggers_push(self):
+        push = FakePush()
+        worker = SyncWorker(push, debounce_seconds=3600, dirty_threshold=3)
+        worker.request_sync(dirty_rows=2)
+        worker.request_sync(dirty_rows=1)
+
+        with worker._cond:
+            worker._cond.wait_for(lambda: worker.pushes_done == 1, timeout=5)
+        self.assertEqual(push.calls, 1)
+        worker.shutdown(flush=False)
+
+    def test_retries_with_backoff(self):
+        push = FakePush(failures=2)
+        worker = SyncWorker(push, debounce_seconds=0, dirty_threshold=1,
+                            max_retries=3, backoff_seconds=0.01)
+        worker.request_sync()
+
+        self.assertTrue(worker.flush(timeout=5))
+        worker.shutdown()
+        self.assertEqual(push.calls, 3)
+        self.assertEqual(worker.pushes_done, 1)
+        self.assertEqual(worker.pushes_failed, 0)
+
+    def test_configuration_error_is_not_retried(self):
+        push = FakePush(failures=1, error=ValueError)
+        worker = SyncWorker(push, debounce_seconds=0, dirty_threshold=1,
+                            backoff_seconds=0.01)
+        worker.request_sync()
+
+        self.assertFalse(worker.flush(timeout=5))
+        worker.shutdown()
+        self.assertEqual(push.calls, 1)
+        self.assertEqual(worker.pushes_failed, 1)
+        self.assertEqual(worker.queue_depth, 0)
+
+    def test_shutdown_flushes_pending_rows(self):
+        push = FakePush()
+        worker = SyncWorker(push, debounce_seconds=3600, dirty_threshold=1000)
+        worker.request_sync()
+        worker.request_sync()
+
+        worker.shutdown(timeout=5)
+        self.assertEqual(push.calls, 1)
+        with self.assertRaises(RuntimeError):
+            worker.request_sync()
+
+
+if __name__ == '__main__':
+    unittest.main()
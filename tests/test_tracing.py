@@ -0,0 +1,249 @@
+import unittest
+import contextvars
+import logging
+import os
+import tempfile
+import threading
+from unittest.mock import MagicMock
+
+from langchain_core.messages import AIMessage
+
+from database import create_session_factory
+from huggingface_dataset import HuggingFaceDatasetManager
+from langchain_pipeline import FakeChatModel, FakeLLMError, PostTransformer, token_usage
+from response_cache import ResponseCache
+from sync_worker import SyncWorker
+from tracing import (NULL_SPAN, LogSink, OpenTelemetrySink, RingBufferSink, Tracer, tracer,
+                     walk_trace)
+
+try:
+    import opentelemetry.sdk.trace  # noqa: F401
+    HAS_OTEL = True
+except ImportError:
+    HAS_OTEL = False
+
+
+class TestTracer(unittest.TestCase):
+    def setUp(self):
+        self.tracer = Tracer()
+        self.buffer = self.tracer.add_sink(RingBufferSink())
+
+    def test_spans_nest_and_carry_attributes(self):
+        with self.tracer.span("request", platform="LinkedIn") as root:
+            with self.tracer.span("stage", skipped=None) as stage:
+                stage.set(rows=3)
+        self.assertEqual([span.name for span in self.buffer.spans()], ["stage", "request"])
+        self.assertEqual(stage.parent_id, root.span_id)
+        self.assertEqual(stage.trace_id, root.trace_id)
+        self.assertEqual(stage.attributes, {"rows": 3})
+        self.assertEqual(root.attributes, {"platform": "LinkedIn"})
+        self.assertGreaterEqual(root.duration, stage.duration)
+        self.assertIsNone(self.tracer.current_span)
+
+    def test_error_is_recorded_and_reraised(self):
+        with self.assertRaises(KeyError):
+            with self.tracer.span("failing"):
+                raise KeyError("missing")
+        self.assertEqual(self.buffer.spans()[0].error, "KeyError: 'missing'")
+        self.assertEqual(self.buffer.summary()["failing"]["errors"], 1)
+
+    def test_no_sinks_yields_null_span(self):
+        tracer = Tracer()
+        with tracer.span("ignored", rows=1) as span:
+            span.set(more=2)
+        self.assertIs(span, NULL_SPAN)
+        self.assertIs(tracer.start_span("ignored"), NULL_SPAN)
+        tracer.end_span(NULL_SPAN)
+
+    def _traced(self, name):
+        with self.tracer.span(name):
+            pass
+
+    def test_threads_need_the_callers_context_to_join_its_trace(self):
+        with self.tracer.span("request"):
+            plain = threading.Thread(target=self._traced, args=("plain",))
+            joined = threading.Thread(target=contextvars.copy_context().run,
+                                      args=(self._traced, "joined"))
+            for thread in (plain, joined):
+                thread.start()
+                thread.join()
+        spans = {span.name: span for span in self.buffer.spans()}
+        self.assertIsNone(spans["plain"].parent_id)
+        self.assertEqual(spans["joined"].parent_id, spans["request"].span_id)
+        self.assertEqual(spans["joined"].trace_id, spans["request"].trace_id)
+
+    def test_summary_and_traces(self):
+        for tokens in (10, 20):
+            with self.tracer.span("request"):
+                with self.tracer.span("llm_call", total_tokens=tokens):
+                    pass
+        summary = self.buffer.summary()
+        self.assertEqual(summary["llm_call"]["count"], 2)
+        self.assertEqual(summary["llm_call"]["total_tokens"], 30)
+        self.assertNotIn("total_tokens", summary["request"])
+        traces = self.buffer.traces()
+        self.assertEqual(len(traces), 2)
+        self.assertEqual([span.name for span in traces[0]], ["request", "llm_call"])
+
+    def test_walk_trace_keeps_concurrent_branches_apart(self):
+        with self.tracer.span("transform_all") as root:
+            # Two platforms running at once: their stages start interleaved
+            first = self.tracer.start_span("transform_post", platform="LinkedIn")
+            second = self.tracer.start_span("transform_post", platform="Twitter")
+            first_call = self.tracer.start_span("llm_call", parent=first)
+            second_call = self.tracer.start_span("llm_call", parent=second)
+            for span in (second_call, first_call, second, first):
+                self.tracer.end_span(span)
+        walked = [(depth, span.span_id) for depth, span in walk_trace(self.buffer.spans())]
+        self.assertEqual(walked, [(0, root.span_id), (1, first.span_id), (2, first_call.span_id),
+                                  (1, second.span_id), (2, second_call.span_id)])
+
+    def test_ring_buffer_keeps_latest_spans(self):
+        buffer = RingBufferSink(capacity=3)
+        tracer = Tracer([buffer])
+        for i in range(5):
+            with tracer.span(f"span{i}"):
+                pass
+        self.assertEqual([span.name for span in buffer.spans()], ["span2", "span3", "span4"])
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+
+    def test_log_sink(self):
+        logger = logging.getLogger("test_tracing")
+        tracer = Tracer([LogSink(logger)])
+        with self.assertLogs(logger, level="INFO") as logs:
+            with tracer.span("db_commit", rows=2):
+                pass
+        self.assertIn("db_commit", logs.output[0])
+        self.assertIn("rows=2", logs.output[0])
+
+    def test_failing_sink_does_not_break_the_request(self):
+        self.tracer.add_sink(MagicMock(export=MagicMock(side_effect=RuntimeError("down"))))
+        with self.tracer.span("request"):
+            pass
+        self.assertEqual(len(self.buffer), 1)
+
+    @unittest.skipUnless(HAS_OTEL, "opentelemetry-sdk is not installed")
+    def test_opentelemetry_sink_replays_the_trace(self):
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        self.tracer.add_sink(OpenTelemetrySink(tracer_provider=provider))
+        with self.tracer.span("request"):
+            with self.tracer.span("llm_call", total_tokens=5):
+                pass
+        exported = {span.name: span for span in exporter.get_finished_spans()}
+        self.assertEqual(exported["llm_call"].parent.span_id, exported["request"].context.span_id)
+        self.assertEqual(exported["llm_call"].attributes["total_tokens"], 5)
+
+
+class TestPipelineTracing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.session_factory = create_session_factory(
+            f"sqlite:///{os.path.join(self.temp_dir.name, 'test.db')}")
+        self.session = self.session_factory()
+        self.manager = HuggingFaceDatasetManager(token="", repo_name="", lazy=True)
+        self.manager.dataset_dict = HuggingFaceDatasetManager._empty_dataset_dict()
+        self.transformer = PostTransformer(db_session=self.session, hf_dataset_manager=self.manager,
+                                           response_cache=ResponseCache(path=None))
+        self.transformer.llm = FakeChatModel()
+        self.transformer.set_platform("LinkedIn")
+        self.buffer = tracer.add_sink(RingBufferSink())
+
+    def tearDown(self):
+        tracer.remove_sink(self.buffer)
+        self.session.close()
+        self.session_factory.kw["bind"].dispose()
+        self.temp_dir.cleanup()
+
+    def trace_of(self, root_name):
+        root = self.buffer.spans(root_name)[-1]
+        return root, {span.name: span for span in self.buffer.spans()
+                      if span.trace_id == root.trace_id}
+
+    def test_transform_post_stages_and_token_usage(self):
+        self.transformer.transform_post("We shipped it. Try it out", "LinkedIn")
+        root, spans = self.trace_of("transform_post")
+        self.assertEqual(set(spans), {"transform_post", "build_prompt", "cache_lookup",
+                                      "llm_call", "cache_store"})
+        self.assertFalse(root.attributes["cached"])
+        self.assertGreater(spans["llm_call"].attributes["output_tokens"], 0)
+        self.assertEqual(spans["llm_call"].attributes["model"], "fake-chat")
+
+        self.transformer.transform_post("We shipped it. Try it out", "LinkedIn")
+        root, spans = self.trace_of("transform_post")
+        self.assertTrue(root.attributes["cached"])
+        self.assertTrue(spans["cache_lookup"].attributes["hit"])
+        self.assertNotIn("llm_call", spans)
+
+    def test_stream_records_usage_and_time_to_first_token(self):
+        post = "".join(self.transformer.transform_post_stream("We shipped it", "LinkedIn"))
+        root, spans = self.trace_of("transform_post_stream")
+        llm_span = spans["llm_stream"]
+        self.assertEqual(llm_span.parent_id, root.span_id)
+        self.assertEqual(llm_span.attributes["chunks"], len(post.split(" ")))
+        self.assertIsNotNone(llm_span.attributes["time_to_first_token"])
+        self.assertEqual(llm_span.attributes["output_tokens"],
+                         self.transformer.last_generation_stats["usage"]["output_tokens"])
+        self.assertFalse(root.attributes["cancelled"])
+
+    def test_stream_closed_early_is_cancelled_not_failed(self):
+        stream = self.transformer.transform_post_stream("One. Two. Three. Four", "LinkedIn")
+        next(stream)
+        stream.close()
+        root = self.buffer.spans("transform_post_stream")[-1]
+        self.assertTrue(root.attributes["cancelled"])
+        self.assertIsNone(root.error)
+
+    def test_failed_stream_records_the_error(self):
+        self.transformer.llm = FakeChatModel(error_rate=1.0)
+        with self.assertRaises(FakeLLMError):
+            list(self.transformer.transform_post_stream("We shipped it", "LinkedIn"))
+        root, spans = self.trace_of("transform_post_stream")
+        self.assertEqual(spans["llm_stream"].error, "FakeLLMError: Injected LLM failure")
+        self.assertIsNotNone(root.error)
+
+    def test_save_transformation_stages(self):
+        self.assertTrue(self.transformer.save_transformation("original", "transformed"))
+        root, spans = self.trace_of("save_transformation")
+        self.assertEqual(spans["db_commit"].parent_id, root.span_id)
+        self.assertEqual(spans["hf_add"].parent_id, root.span_id)
+
+        self.assertFalse(self.transformer.save_transformation("original", "transformed"))
+        root, spans = self.trace_of("save_transformation")
+        self.assertTrue(root.attributes["duplicate"])
+        self.assertNotIn("hf_add", spans)
+
+    def test_transform_all_joins_worker_spans_to_one_trace(self):
+        posts = self.transformer.transform_all("We shipped it")
+        root, _ = self.trace_of("transform_all")
+        children = [span for span in self.buffer.spans("transform_post")
+                    if span.parent_id == root.span_id]
+        self.assertEqual(len(children), len(posts))
+
+    def test_dataset_flush_and_sync_push(self):
+        self.transformer.save_transformation("original", "transformed")
+        worker = SyncWorker(self.manager.flush, debounce_seconds=0)
+        worker.request_sync()
+        worker.shutdown(flush=True)
+        sync_span = self.buffer.spans("sync_push")[-1]
+        flush_span = self.buffer.spans("hf_flush")[-1]
+        self.assertEqual(flush_span.trace_id, sync_span.trace_id)
+        self.assertEqual(flush_span.attributes["rows"], 1)
+        self.assertTrue(sync_span.attributes["succeeded"])
+
+    def test_token_usage_from_openai_response_metadata(self):
+        message = AIMessage(content="hi", response_metadata={"token_usage": {
+            "prompt_tokens": 4, "completion_tokens": 7, "total_tokens": 11}})
+        self.assertEqual(token_usage(message),
+                         {"input_tokens": 4, "output_tokens": 7, "total_tokens": 11})
+        self.assertEqual(token_usage(AIMessage(content="hi")), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,16 @@
 import unittest
+import asyncio
 import os
+import threading
+import time
 from unittest.mock import patch, MagicMock
-import uuid
 
-from langchain_pipeline import PostTransformer
-from database import (
-    LinkedInExample, TwitterExample, InstagramExample,
-    LinkedInTransformation, TwitterTransformation, InstagramTransformation
-)
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from langchain_pipeline import EXPECTED_COMPLETION_TOKENS, FakeChatModel, PostTransformer
+from response_cache import ResponseCache
+from database import Example, Transformation
 
 class TestPostTransformer(unittest.TestCase):
     def setUp(self):
@@ -35,7 +38,7 @@ class TestPostTransformer(unittest.TestCase):
         self.assertEqual(self.transformer.current_platform, "LinkedIn")
         
         # Verify _load_examples was called
-        self.mock_session.query.assert_called_once()
+        self.mock_session.query.return_value.filter.return_value.yield_per.assert_called_once()
     
     def test_add_example_linkedin(self):
         # Test adding a LinkedIn example
@@ -45,13 +48,45 @@ class TestPostTransformer(unittest.TestCase):
         # Verify the example was added to the session
         self.mock_session.add.assert_called_once()
         added_example = self.mock_session.add.call_args[0][0]
-        self.assertIsInstance(added_example, LinkedInExample)
+        self.assertIsInstance(added_example, Example)
+        self.assertEqual(added_example.platform, "LinkedIn")
         self.assertEqual(added_example.content, "Test LinkedIn example")
         self.assertEqual(added_example.id, "test-uuid")
         
         # Verify commit was called
         self.mock_session.commit.assert_called_once()
     
+    def test_add_example_updates_index_without_reload(self):
+        self.transformer.set_platform("LinkedIn")
+        self.mock_session.query.reset_mock()
+
+        self.transformer.add_example("Shipping our new analytics dashboard today")
+        self.transformer.set_platform("LinkedIn")
+        self.mock_session.query.return_value.filter.return_value.yield_per.assert_not_called()
+        self.assertEqual(self.transformer.examples,
+                         ["Shipping our new analytics dashboard today"])
+        self.assertEqual(self.transformer.example_count, 1)
+
+    def test_relevant_examples_are_injected_into_prompt(self):
+        self.transformer.set_platform("LinkedIn")
+        self.transformer.add_example("Our analytics dashboard launch went great")
+        self.transformer.add_example("Hiring two backend engineers this quarter")
+        mock_response = MagicMock()
+        mock_response.content = "Transformed"
+        self.transformer.llm = MagicMock(return_value=mock_response)
+
+        self.transformer.transform_post("New analytics dashboard features", "LinkedIn")
+        messages = self.transformer.llm.call_args[0][0]
+        self.assertEqual(len(messages), 3)
+        self.assertIn("Our analytics dashboard launch went great", messages[1].content)
+        self.assertNotIn("Hiring", messages[1].content)
+
+    def test_add_example_invalidates_stats(self):
+        self.transformer.db_stats = MagicMock()
+        self.transformer.set_platform("Twitter")
+        self.transformer.add_example("Test Twitter example")
+        self.transformer.db_stats.invalidate.assert_called_once_with(Example)
+
     def test_add_example_twitter(self):
         # Test adding a Twitter example
         self.transformer.set_platform("Twitter")
@@ -60,7 +95,8 @@ class TestPostTransformer(unittest.TestCase):
         # Verify the example was added to the session
         self.mock_session.add.assert_called_once()
         added_example = self.mock_session.add.call_args[0][0]
-        self.assertIsInstance(added_example, TwitterExample)
+        self.assertIsInstance(added_example, Example)
+        self.assertEqual(added_example.platform, "Twitter")
         self.assertEqual(added_example.content, "Test Twitter example")
     
     def test_add_example_instagram(self):
@@ -71,7 +107,8 @@ class TestPostTransformer(unittest.TestCase):
         # Verify the example was added to the session
         self.mock_session.add.assert_called_once()
         added_example = self.mock_session.add.call_args[0][0]
-        self.assertIsInstance(added_example, InstagramExample)
+        self.assertIsInstance(added_example, Example)
+        self.assertEqual(added_example.platform, "Instagram")
         self.assertEqual(added_example.content, "Test Instagram example")
     
     def test_add_example_empty_content(self):
@@ -94,9 +131,12 @@ class TestPostTransformer(unittest.TestCase):
         # Verify the transformation was added to the session
         self.mock_session.add.assert_called_once()
         added_transformation = self.mock_session.add.call_args[0][0]
-        self.assertIsInstance(added_transformation, LinkedInTransformation)
+        self.assertIsInstance(added_transformation, Transformation)
+        self.assertEqual(added_transformation.platform, "LinkedIn")
         self.assertEqual(added_transformation.original_text, "Original text")
         self.assertEqual(added_transformation.transformed_text, "Transformed text")
+        self.assertEqual(added_transformation.meta["id"], "test-uuid")
+        self.assertEqual(added_transformation.meta["prompt_id"], "linkedin-v2")
         
         # Verify commit was called
         self.mock_session.commit.assert_called_once()
@@ -105,26 +145,315 @@ class TestPostTransformer(unittest.TestCase):
         # Test setting the API key
         with patch.dict(os.environ, {}, clear=True):
             self.transformer.set_api_key("test-api-key", 0.5)
-            self.assertEqual(os.environ.get("OPENAI_API_KEY"), "test-api-key")
+            # The key goes to the client, not into the process environment
+            self.assertNotIn("OPENAI_API_KEY", os.environ)
             self.assertIsNotNone(self.transformer.llm)
+            self.assertEqual(self.transformer.llm.openai_api_key, "test-api-key")
     
-    @patch('langchain_pipeline.ChatOpenAI')
-    def test_transform_post(self, mock_chat_openai):
+    def test_set_api_key_reuses_client(self):
+        # Reruns with the same settings should not rebuild the LLM client
+        self.transformer.set_api_key("test-api-key", 0.5)
+        first_llm = self.transformer.llm
+        other = PostTransformer(db_session=self.mock_session,
+                                hf_dataset_manager=MagicMock())
+        other.set_api_key("test-api-key", 0.5)
+        self.assertIs(other.llm, first_llm)
+
+        # A different temperature gets its own client
+        other.set_api_key("test-api-key", 0.9)
+        self.assertIsNot(other.llm, first_llm)
+
+    def test_set_api_key_selects_backend(self):
+        self.transformer.set_api_key("unused", 0.3, backend="fake", latency=0.0)
+        self.assertIsInstance(self.transformer.llm, FakeChatModel)
+        self.assertEqual(self.transformer.llm.temperature, 0.3)
+
+        with patch.dict(os.environ, {"LLM_BACKEND": "fake"}):
+            self.transformer.set_api_key("unused", 0.5)
+        self.assertIsInstance(self.transformer.llm, FakeChatModel)
+
+        with self.assertRaises(ValueError):
+            self.transformer.set_api_key("key", 0.5, backend="carrier-pigeon")
+
+    def test_transform_post_with_fake_backend(self):
+        self.transformer.set_api_key("unused", 0.5, backend="fake")
+        post = self.transformer.transform_post("Shipped the editor. It works offline", "LinkedIn")
+        self.assertTrue(post.startswith("Shipped the editor\n\nIt works offline"))
+
+    @patch('langchain_pipeline.resources.get_llm')
+    def test_transform_post(self, mock_get_llm):
         # Mock the LLM response
         mock_response = MagicMock()
         mock_response.content = "Transformed post content"
         mock_llm_instance = MagicMock()
         mock_llm_instance.return_value = mock_response
-        mock_chat_openai.return_value = mock_llm_instance
+        mock_get_llm.return_value = mock_llm_instance
         
-        # Set up the transformer
+        # Set up the transformer; the openai backend takes its client from the registry
         self.transformer.set_platform("LinkedIn")
-        self.transformer.llm = mock_llm_instance
+        with patch.dict(os.environ, {"LLM_BACKEND": "openai"}):
+            self.transformer.set_api_key("test-api-key", 0.5)
+        mock_get_llm.assert_called_once_with("test-api-key", 0.5)
+        self.assertIs(self.transformer.llm, mock_llm_instance)
         
         # Test transforming a post
         result = self.transformer.transform_post("Original post", "LinkedIn")
         self.assertEqual(result, "Transformed post content")
+        mock_llm_instance.assert_called_once()
     
+    def test_transform_post_stream(self):
+        # A fake chat model that streams the reply word by word
+        self.transformer.llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="Streamed post content")]))
+
+        chunks = list(self.transformer.transform_post_stream("Original post", "LinkedIn"))
+        self.assertEqual("".join(chunks), "Streamed post content")
+        self.assertGreater(len(chunks), 1)
+
+        stats = self.transformer.last_generation_stats
+        self.assertEqual(stats["chunks"], len(chunks))
+        self.assertIsNotNone(stats["time_to_first_token"])
+        self.assertGreaterEqual(stats["total_time"], stats["time_to_first_token"])
+        self.assertFalse(stats["cancelled"])
+
+    def test_transform_post_stream_cancel(self):
+        self.transformer.llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="one two three four")]))
+        cancel_event = threading.Event()
+
+        chunks = []
+        for chunk in self.transformer.transform_post_stream(
+                "Original post", "LinkedIn", cancel_event=cancel_event):
+            chunks.append(chunk)
+            cancel_event.set()
+
+        self.assertEqual(chunks, ["one"])
+        self.assertTrue(self.transformer.last_generation_stats["cancelled"])
+
+    def test_transform_post_stream_abandoned(self):
+        self.transformer.llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="one two three four")]))
+
+        stream = self.transformer.transform_post_stream("Original post", "LinkedIn")
+        next(stream)
+        stream.close()
+        self.assertTrue(self.transformer.last_generation_stats["cancelled"])
+
+    def test_atransform_post_stream(self):
+        self.transformer.llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="Async streamed post")]))
+
+        async def collect():
+            return [chunk async for chunk in
+                    self.transformer.atransform_post_stream("Original post", "LinkedIn")]
+
+        chunks = asyncio.run(collect())
+        self.assertEqual("".join(chunks), "Async streamed post")
+        self.assertIsNotNone(self.transformer.last_generation_stats["time_to_first_token"])
+
+    def test_transform_post_uses_response_cache(self):
+        mock_response = MagicMock()
+        mock_response.content = "Transformed post content"
+        self.transformer.llm = MagicMock(return_value=mock_response)
+        self.transformer.llm.model_name = "gpt-4o-mini"
+        self.transformer.llm.temperature = 0.5
+        self.transformer.response_cache = ResponseCache(path=None)
+
+        first = self.transformer.transform_post("Original post", "LinkedIn")
+        second = self.transformer.transform_post("Original post", "LinkedIn")
+        self.assertEqual(first, second)
+        self.assertEqual(self.transformer.llm.call_count, 1)
+
+        # Bypassing the cache resamples
+        self.transformer.transform_post("Original post", "LinkedIn", bypass_cache=True)
+        self.assertEqual(self.transformer.llm.call_count, 2)
+
+        # A different temperature is a different cache entry
+        self.transformer.llm.temperature = 0.9
+        self.transformer.transform_post("Original post", "LinkedIn")
+        self.assertEqual(self.transformer.llm.call_count, 3)
+        self.assertEqual(self.transformer.response_cache.stats()["hits"], 1)
+
+    def test_transform_post_stream_uses_response_cache(self):
+        self.transformer.llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="Streamed post content")]))
+        self.transformer.response_cache = ResponseCache(path=None)
+
+        first = "".join(self.transformer.transform_post_stream("Original post", "LinkedIn"))
+        # The fake model has no second reply, so this must come from the cache
+        second = list(self.transformer.transform_post_stream("Original post", "LinkedIn"))
+        self.assertEqual(second, [first])
+        self.assertTrue(self.transformer.last_generation_stats["cached"])
+
+    def test_atransform_post_stream_uses_response_cache(self):
+        self.transformer.llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="Async streamed post"),
+                           AIMessage(content="Fresh sample")]))
+        self.transformer.response_cache = ResponseCache(path=None)
+
+        async def collect(**kwargs):
+            return [chunk async for chunk in
+                    self.transformer.atransform_post_stream("Original post", "LinkedIn", **kwargs)]
+
+        first = "".join(asyncio.run(collect()))
+        self.assertEqual(asyncio.run(collect()), [first])
+        self.assertTrue(self.transformer.last_generation_stats["cached"])
+
+        # Bypassing the cache resamples and replaces the cached response
+        self.assertEqual("".join(asyncio.run(collect(bypass_cache=True))), "Fresh sample")
+        self.assertEqual(asyncio.run(collect()), ["Fresh sample"])
+
+    def test_transform_many(self):
+        # Track how many LLM calls run at the same time
+        lock = threading.Lock()
+        active = {"now": 0, "max": 0}
+
+        def fake_llm(messages):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.01)
+            with lock:
+                active["now"] -= 1
+            response = MagicMock()
+            response.content = messages[-1].content.upper()
+            return response
+
+        self.transformer.llm = MagicMock(side_effect=fake_llm)
+        jobs = [(f"post {i}", "Twitter") for i in range(12)] + [("post", "MySpace")]
+        results = list(self.transformer.transform_many(jobs, concurrency=3))
+
+        self.assertEqual(len(results), 13)
+        self.assertLessEqual(active["max"], 3)
+        by_index = {result["index"]: result for result in results}
+        self.assertEqual(by_index[5]["transformed_text"], "POST 5")
+        self.assertIsNone(by_index[5]["error"])
+        self.assertIn("Unknown platform", by_index[12]["error"])
+
+    def test_transform_many_uses_rate_limiter(self):
+        mock_response = MagicMock()
+        mock_response.content = "Transformed"
+        self.transformer.llm = MagicMock(return_value=mock_response)
+        rate_limiter = MagicMock()
+
+        list(self.transformer.transform_many([("a", "LinkedIn"), ("b", "LinkedIn")],
+                                             rate_limiter=rate_limiter))
+        self.assertEqual(rate_limiter.acquire.call_count, 2)
+        self.assertGreater(rate_limiter.acquire.call_args[0][0], 0)
+
+    def test_rate_limiter_reserves_completion_tokens_and_reconciles(self):
+        response = AIMessage(content="Transformed", usage_metadata={
+            "input_tokens": 40, "output_tokens": 60, "total_tokens": 100})
+        self.transformer.llm = MagicMock(return_value=response)
+        rate_limiter = MagicMock()
+        rate_limiter.acquire.return_value = 700
+
+        self.transformer.transform_post("Original post", "LinkedIn", rate_limiter=rate_limiter)
+        self.assertGreater(rate_limiter.acquire.call_args[0][0], EXPECTED_COMPLETION_TOKENS)
+        rate_limiter.reconcile.assert_called_once_with(700, 100)
+
+    def test_rate_limited_jobs_render_the_prompt_once(self):
+        mock_response = MagicMock()
+        mock_response.content = "Transformed"
+        self.transformer.llm = MagicMock(return_value=mock_response)
+        rate_limiter = MagicMock()
+
+        with patch.object(self.transformer, "_build_messages",
+                          wraps=self.transformer._build_messages) as build_messages:
+            list(self.transformer.transform_many([("a", "LinkedIn"), ("b", "Twitter")],
+                                                 rate_limiter=rate_limiter))
+        self.assertEqual(build_messages.call_count, 2)
+        self.assertEqual(rate_limiter.acquire.call_count, 2)
+
+    def test_transform_all_runs_platforms_concurrently(self):
+        def slow_llm(messages):
+            time.sleep(0.2)
+            response = MagicMock()
+            response.content = [platform for platform in PostTransformer.PLATFORMS
+                                if f"posts for {platform}" in messages[0].content][0]
+            return response
+
+        self.transformer.llm = MagicMock(side_effect=slow_llm)
+        started = time.perf_counter()
+        posts = self.transformer.transform_all("We hit 1M users")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(list(posts), ["LinkedIn", "Twitter", "Instagram"])
+        self.assertEqual(list(posts.values()), ["LinkedIn", "Twitter", "Instagram"])
+        # Three 0.2s calls, overlapped
+        self.assertLess(elapsed, 0.5)
+
+    def test_transform_all_reports_failed_platforms(self):
+        def flaky_llm(messages):
+            if "posts for Twitter" in messages[0].content:
+                raise RuntimeError("rate limited")
+            response = MagicMock()
+            response.content = "post"
+            return response
+
+        self.transformer.llm = MagicMock(side_effect=flaky_llm)
+        with self.assertRaises(Exception) as context:
+            self.transformer.transform_all("Launch day")
+        self.assertIn("Twitter: rate limited", str(context.exception))
+
+    def test_save_all_uses_one_transaction(self):
+        posts = {"LinkedIn": "Long post", "Twitter": "Short post", "Instagram": "Post 📸"}
+        self.assertEqual(self.transformer.save_all("Original", posts, {"session_id": "s1"}), 3)
+
+        self.assertEqual(self.mock_session.execute.call_count, 1)
+        self.mock_session.commit.assert_called_once()
+        values = self.mock_session.execute.call_args[0][1]
+        self.assertEqual([v["platform"] for v in values], ["LinkedIn", "Twitter", "Instagram"])
+        self.assertEqual(values[2]["transformed_text"], "Post 📸")
+        self.assertEqual(values[1]["meta"]["platform"], "Twitter")
+        self.assertEqual(values[1]["meta"]["session_id"], "s1")
+
+    def test_save_all_records_each_platforms_example_count(self):
+        self.transformer.example_selector.ensure_loaded("LinkedIn", lambda: ["one", "two"])
+        self.transformer.example_selector.ensure_loaded("Twitter", lambda: ["three"])
+        self.transformer.example_selector.ensure_loaded("Instagram", lambda: [])
+        self.transformer.set_platform("LinkedIn")
+
+        posts = {"LinkedIn": "Long post", "Twitter": "Short post", "Instagram": "Post 📸"}
+        self.transformer.save_all("Original", posts)
+        values = self.mock_session.execute.call_args[0][1]
+        self.assertEqual([v["meta"]["example_count"] for v in values], [2, 1, 0])
+
+    def test_save_transformations_bulk(self):
+        rows = [
+            {"platform": "LinkedIn", "original_text": "o1", "transformed_text": "t1"},
+            {"platform": "Twitter", "original_text": "o2", "transformed_text": "t2"},
+            {"platform": "LinkedIn", "original_text": "o3", "transformed_text": "t3"},
+        ]
+        self.assertEqual(self.transformer.save_transformations(rows), 3)
+
+        # One executemany into the unified table and a single commit
+        self.assertEqual(self.mock_session.execute.call_count, 1)
+        self.mock_session.commit.assert_called_once()
+        values = self.mock_session.execute.call_args[0][1]
+        self.assertEqual([v["platform"] for v in values], ["LinkedIn", "Twitter", "LinkedIn"])
+        self.assertEqual(values[1]["meta"]["prompt_id"], "twitter-v2")
+
+    def test_transform_post_with_braces_in_text(self):
+        mock_response = MagicMock()
+        mock_response.content = "Transformed"
+        self.transformer.llm = MagicMock(return_value=mock_response)
+
+        # User text is a variable, not part of the template
+        self.transformer.transform_post("Use {curly} braces and {0}", "Twitter")
+        messages = self.transformer.llm.call_args[0][0]
+        self.assertEqual(messages[1].content, "Use {curly} braces and {0}")
+        self.assertIn("posts for Twitter", messages[0].content)
+        self.assertNotIn("{platform}", messages[0].content)
+
+    def test_save_transformation_records_prompt_id(self):
+        self.transformer.set_platform("Instagram")
+        self.transformer.hf_dataset_manager = MagicMock()
+        self.transformer.save_transformation("Original text", "Transformed text")
+
+        metadata = self.transformer.hf_dataset_manager.add_transformation.call_args[1]["metadata"]
+        self.assertEqual(metadata["prompt_id"], "instagram-v2")
+
     def test_transform_post_no_llm(self):
         # Test transforming a post without setting the LLM
         self.transformer.set_platform("LinkedIn")
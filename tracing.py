@@ -0,0 +1,314 @@
+"""Lightweight per-request tracing for the transform pipeline.
+
+Code wraps each stage in `with tracer.span("name", key=value) as span:`.
+Spans nest through a context variable, so every stage of one request
+(prompt building, the LLM call, the database commit, the dataset append)
+ends up in the same trace with its duration and attributes, such as token
+usage. Finished spans go to pluggable sinks: LogSink writes them to the
+`tracing` logger, RingBufferSink keeps the most recent ones in memory (the
+app's diagnostics panel reads it) and OpenTelemetrySink exports them to an
+OpenTelemetry tracer provider. With no sink attached, span() does nothing
+beyond yielding a shared no-op span, so tracing costs close to nothing when
+it is off.
+"""
+import contextvars
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_BUFFER_SIZE = 2000
+
+_ids = itertools.count(1)
+
+
+def percentile(values, q):
+    """q-th percentile (0-100) of values, by linear interpolation"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def walk_trace(spans):
+    """(depth, span) pairs for one trace, depth-first from each root
+
+    Children follow their parent in start order, so concurrent branches
+    (e.g. transform_all's platforms) do not interleave. Spans whose parent
+    is not among spans are treated as roots.
+    """
+    span_ids = {span.span_id for span in spans}
+    children = {}
+    for span in sorted(spans, key=lambda span: span.start):
+        parent_id = span.parent_id if span.parent_id in span_ids else None
+        children.setdefault(parent_id, []).append(span)
+    pending = [(0, span) for span in reversed(children.get(None, []))]
+    while pending:
+        depth, span = pending.pop()
+        yield depth, span
+        pending.extend((depth + 1, child) for child in reversed(children.get(span.span_id, [])))
+
+
+class Span:
+    """One timed stage of a request
+
+    start is wall-clock seconds since the epoch; duration is measured with
+    a monotonic clock and is None until the span ends. error holds
+    "ExceptionType: message" when the stage raised.
+    """
+
+    def __init__(self, name, trace_id=None, parent_id=None, attributes=None):
+        self.name = name
+        self.span_id = f"{os.getpid():x}-{next(_ids):x}"
+        self.trace_id = trace_id or self.span_id
+        self.parent_id = parent_id
+        self.attributes = {}
+        self.set(**(attributes or {}))
+        self.error = None
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.duration = None
+        self._started = time.perf_counter()
+
+    @property
+    def end(self):
+        return None if self.duration is None else self.start + self.duration
+
+    def set(self, **attributes):
+        """Add or overwrite attributes (None values are dropped)"""
+        self.attributes.update((key, value) for key, value in attributes.items() if value is not None)
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self):
+        return {"name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+                "parent_id": self.parent_id, "start": self.start, "duration": self.duration,
+                "thread": self.thread, "error": self.error, "attributes": dict(self.attributes)}
+
+    def __repr__(self):
+        duration = "open" if self.duration is None else f"{self.duration * 1000:.2f}ms"
+        return f"<Span {self.name} {duration}>"
+
+
+class _NullSpan:
+    """Yielded by a tracer without sinks; setting attributes on it is a no-op"""
+    name = None
+    span_id = None
+    trace_id = None
+    attributes = {}
+
+    def set(self, **attributes):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, sinks=()):
+        self._sinks = list(sinks)
+        self._lock = threading.Lock()
+        self._current = contextvars.ContextVar(f"current_span_{id(self)}", default=None)
+
+    @property
+    def enabled(self):
+        return bool(self._sinks)
+
+    @property
+    def sinks(self):
+        return list(self._sinks)
+
+    def add_sink(self, sink):
+        """Send finished spans to sink.export(span) from now on"""
+        with self._lock:
+            if sink not in self._sinks:
+                self._sinks = self._sinks + [sink]
+        return sink
+
+    def remove_sink(self, sink):
+        with self._lock:
+            self._sinks = [existing for existing in self._sinks if existing is not sink]
+
+    def clear_sinks(self):
+        with self._lock:
+            self._sinks = []
+
+    @property
+    def current_span(self):
+        return self._current.get()
+
+    def start_span(self, name, parent=None, **attributes):
+        """Open a span without making it current; the caller must end_span() it
+
+        Used for stages that straddle a yield (streaming generators), where a
+        context variable cannot be set and reset around the whole stage.
+        parent defaults to the current span.
+        """
+        if not self._sinks:
+            return NULL_SPAN
+        parent = parent if parent is not None else self._current.get()
+        if parent is NULL_SPAN:
+            parent = None
+        span = Span(name, trace_id=parent.trace_id if parent else None,
+                    parent_id=parent.span_id if parent else None, attributes=attributes)
+        return span
+
+    def end_span(self, span, error=None):
+        """Finish a span from start_span() and hand it to the sinks"""
+        if span is NULL_SPAN:
+            return
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        span.finish()
+        for sink in self._sinks:
+            try:
+                sink.export(span)
+            except Exception as e:
+                print(f"Warning: Trace sink {type(sink).__name__} failed: {str(e)}")
+
+    @contextmanager
+    def span(self, name, parent=None, **attributes):
+        """Time the enclosed block as a child of the current span (or parent)"""
+        if not self._sinks:
+            yield NULL_SPAN
+            return
+        span = self.start_span(name, parent=parent, **attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            self._current.reset(token)
+            self.end_span(span, error=e)
+            raise
+        self._current.reset(token)
+        self.end_span(span)
+
+
+class LogSink:
+    """Write one line per finished span to a logger (INFO, or WARNING on errors)"""
+
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger("tracing")
+        self.level = level
+
+    def export(self, span):
+        attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+        error = f" error={span.error!r}" if span.error else ""
+        self.logger.log(logging.WARNING if span.error else self.level,
+                        "%s %.2fms trace=%s%s %s", span.name, span.duration * 1000,
+                        span.trace_id, error, attributes)
+
+
+class RingBufferSink:
+    """Keep the last `capacity` finished spans in memory"""
+
+    def __init__(self, capacity=DEFAULT_BUFFER_SIZE):
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._spans)
+
+    def export(self, span):
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, name=None):
+        """Buffered spans, oldest first, optionally only those called name"""
+        with self._lock:
+            spans = list(self._spans)
+        return [span for span in spans if name is None or span.name == name]
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def traces(self, limit=10):
+        """The most recent traces, newest first, each a list of spans in start order"""
+        grouped = {}
+        for span in self.spans():
+            grouped.setdefault(span.trace_id, []).append(span)
+        traces = sorted(grouped.values(), key=lambda spans: min(span.start for span in spans),
+                        reverse=True)
+        return [sorted(spans, key=lambda span: span.start) for spans in traces[:limit]]
+
+    def summary(self):
+        """{span name: count, errors, p50/p95/max seconds and summed token counts}"""
+        grouped = {}
+        for span in self.spans():
+            grouped.setdefault(span.name, []).append(span)
+        summary = {}
+        for name, spans in grouped.items():
+            durations = [span.duration for span in spans]
+            summary[name] = {
+                "count": len(spans),
+                "errors": sum(1 for span in spans if span.error),
+                "p50": percentile(durations, 50),
+                "p95": percentile(durations, 95),
+                "max": max(durations),
+            }
+            for key in ("input_tokens", "output_tokens", "total_tokens"):
+                tokens = [span.attributes[key] for span in spans if key in span.attributes]
+                if tokens:
+                    summary[name][key] = sum(tokens)
+        return summary
+
+
+class OpenTelemetrySink:
+    """Export spans through an OpenTelemetry tracer provider (needs opentelemetry-api)
+
+    Spans are replayed once their root span ends, parents before children,
+    with their original start and end times, so the exported trace has the
+    same shape as the local one. Configure exporters on the provider (the
+    global one by default).
+    """
+
+    def __init__(self, tracer_provider=None, instrumentation_name="social-sculptor"):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetrySink needs the opentelemetry-api package "
+                              "(and opentelemetry-sdk plus an exporter to send spans anywhere)") from e
+        self._trace = trace
+        self._tracer = trace.get_tracer(instrumentation_name, tracer_provider=tracer_provider)
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def export(self, span):
+        with self._lock:
+            self._pending.setdefault(span.trace_id, []).append(span)
+            if span.parent_id is not None:
+                return
+            spans = self._pending.pop(span.trace_id)
+        children = {}
+        for child in spans:
+            children.setdefault(child.parent_id, []).append(child)
+        self._replay(span, None, children)
+
+    def _replay(self, span, context, children):
+        attributes = {key: value if isinstance(value, (bool, int, float, str)) else str(value)
+                      for key, value in span.attributes.items()}
+        attributes["thread.name"] = span.thread
+        otel_span = self._tracer.start_span(span.name, context=context, attributes=attributes,
+                                            start_time=int(span.start * 1e9))
+        if span.error:
+            from opentelemetry.trace import Status, StatusCode
+            otel_span.set_status(Status(StatusCode.ERROR, span.error))
+        child_context = self._trace.set_span_in_context(otel_span)
+        for child in sorted(children.get(span.span_id, []), key=lambda child: child.start):
+            self._replay(child, child_context, children)
+        otel_span.end(end_time=int(span.end * 1e9))
+
+
+# The process-wide tracer every module records into
+tracer = Tracer()